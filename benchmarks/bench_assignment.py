@@ -0,0 +1,107 @@
+"""Microbenchmark for the truck to station assignment algorithms
+
+Usage:
+    python -m benchmarks.bench_assignment [--repeat N] [--max-legacy-work N]
+"""
+
+import argparse
+import bisect
+import random
+import time
+
+from mining_sim.simulator import MiningSimulator
+from mining_sim.utility.assignment import StationAssigner
+
+STATION_COUNTS = [10, 100, 1000, 10000]
+BURST_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def legacy_assign(new_trucks: list[int], station_infos: list[dict]) -> list[dict]:
+    """Original sort + pop(0) + insort assignment loop, for comparison"""
+    station_infos.sort(key=lambda x: x["wait_time"] + len(x["q_trucks"]))
+    while new_trucks:
+        min_wait_time = station_infos[0]["wait_time"] + len(station_infos[0]["q_trucks"])
+        stations_with_min_wait = []
+        while station_infos and (station_infos[0]["wait_time"] + len(station_infos[0]["q_trucks"])) == min_wait_time:
+            stations_with_min_wait.append(station_infos.pop(0))
+        for station in stations_with_min_wait:
+            if new_trucks:
+                station["q_trucks"].append(new_trucks.pop(0))
+            else:
+                break
+        for station in stations_with_min_wait:
+            bisect.insort(station_infos, station, key=lambda x: x["wait_time"] + len(x["q_trucks"]))
+
+    station_infos.sort(key=lambda x: x["station_id"])
+    return station_infos
+
+
+def _station_infos(wait_times: list[int]) -> list[dict]:
+    return [{"station_id": idx, "wait_time": wait_time, "q_trucks": []} for idx, wait_time in enumerate(wait_times)]
+
+
+def _best_of(repeat: int, setup, func) -> float:
+    """Best wall time (seconds) of `repeat` calls of func(setup())"""
+    best = float("inf")
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(repeat: int = 5, max_legacy_work: int = 10**7) -> list[dict]:
+    """Time each assignment algorithm for all station counts and burst sizes
+
+    Args:
+        repeat (int): Number of repeats per measurement (best time is reported)
+        max_legacy_work (int): Skip the legacy loop when stations x trucks is above this value
+
+    Returns:
+        list[dict]: One result dict per (stations, trucks) combination, times in microseconds
+    """
+    rng = random.Random(0)
+    results = []
+    for m_stations in STATION_COUNTS:
+        sim = MiningSimulator(n_trucks=0, m_stations=m_stations)
+        wait_times = [rng.randint(0, 3) for _ in range(m_stations)]
+        for n_trucks in BURST_SIZES:
+            trucks = list(range(n_trucks))
+            result = {"stations": m_stations, "trucks": n_trucks, "legacy_us": None}
+            if m_stations * n_trucks <= max_legacy_work:
+                result["legacy_us"] = 1e6 * _best_of(
+                    repeat, lambda: (trucks[:], _station_infos(wait_times)), legacy_assign
+                )
+            result["per_call_heap_us"] = 1e6 * _best_of(
+                repeat, lambda: (trucks[:], _station_infos(wait_times)), sim.assign_stations_algo
+            )
+            result["persistent_heap_us"] = 1e6 * _best_of(
+                repeat,
+                lambda: (StationAssigner.from_wait_times(wait_times, current_tick=0), trucks),
+                lambda assigner, new_trucks: assigner.assign(1, new_trucks),
+            )
+            results.append(result)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark truck to station assignment")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats per measurement (best time is reported)")
+    parser.add_argument(
+        "--max-legacy-work", type=int, default=10**7, help="Skip the legacy loop above stations x trucks"
+    )
+    args = parser.parse_args()
+
+    print(f"{'stations':>8} {'trucks':>8} {'legacy (us)':>14} {'per-call heap (us)':>20} {'persistent (us)':>16}")
+    for result in run_benchmark(args.repeat, args.max_legacy_work):
+        legacy = "skipped" if result["legacy_us"] is None else f"{result['legacy_us']:.1f}"
+        print(
+            f"{result['stations']:>8} {result['trucks']:>8} {legacy:>14} "
+            f"{result['per_call_heap_us']:>20.1f} {result['persistent_heap_us']:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
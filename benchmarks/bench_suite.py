@@ -0,0 +1,362 @@
+"""Benchmark suite for the simulation and analysis phases, with scaling exponents and stored baselines
+
+Phases:
+    sim_tick                 MiningSimulator.tick() for each engine (log metrics)
+    online_metrics           Tick engine run with online metrics, then summarize()
+    log_metrics              Tick engine run with log metrics, then summarize() (analysis of the logs)
+    station_assigner         StationAssigner.assign() (used by all engines) for a burst of n_trucks arrivals
+    station_tick             UnloadingStation.tick() for m_stations stations (one arrival per station per tick on avg.)
+    convert_log_to_df        convert_log_to_df() for all truck and station logs
+    compute_truck_metrics    compute_truck_metrics() on the truck logs
+    compute_station_metrics  compute_station_metrics() on the station logs
+
+Each case runs in a fresh process, so the reported peak RSS belongs to that case only.
+
+Usage:
+    python -m benchmarks.bench_suite [--preset quick|full] [--repeat N] [--save-baseline FILE] [--compare FILE]
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from mining_sim.nodes.unloadstation import UnloadingStation
+from mining_sim.simulator import MiningSimulator
+from mining_sim.utility.analysis import convert_log_to_df, compute_truck_metrics, compute_station_metrics
+from mining_sim.utility.assignment import StationAssigner
+from mining_sim.utility.log_store import LogStore
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+PRESETS = {
+    "quick": {"trucks": [10, 100, 1000], "stations": [5, 50], "hours": [6, 24], "engines": ["tick", "event", "vector"]},
+    "full": {
+        "trucks": [10, 100, 1000, 10000, 100000],
+        "stations": [5, 50, 500],
+        "hours": [24, 72],
+        "engines": ["tick", "event", "vector"],
+    },
+}
+"""Benchmark grids: truck counts, station counts, horizons (hours) and engines"""
+
+CASE_KEYS = ["phase", "engine", "n_trucks", "m_stations", "hours"]
+"""Fields identifying a benchmark result (missing fields are None)"""
+
+TICKS_PER_HOUR = 12
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process (MB), None if not available"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes on Linux
+    return max_rss / 2**20 if sys.platform == "darwin" else max_rss / 2**10
+
+
+def _result(case: dict, phase: str, seconds: float, ticks: int | None = None, truck_ticks: int | None = None) -> dict:
+    """Result row of one timed phase"""
+    return {
+        **{key: case.get(key) for key in CASE_KEYS},
+        "phase": phase,
+        "seconds": seconds,
+        "ticks_per_s": ticks / seconds if ticks and seconds > 0 else None,
+        "truck_ticks_per_s": truck_ticks / seconds if truck_ticks and seconds > 0 else None,
+    }
+
+
+def bench_sim_tick(case: dict) -> list[dict]:
+    """Time MiningSimulator.tick() over the full horizon"""
+    ticks = case["hours"] * TICKS_PER_HOUR
+    sim = MiningSimulator(case["n_trucks"], case["m_stations"], stop_time_hr=case["hours"], engine=case["engine"])
+    start = time.perf_counter()
+    for _ in range(ticks):
+        sim.tick()
+    sim.sync_nodes()
+    seconds = time.perf_counter() - start
+    return [_result(case, "sim_tick", seconds, ticks, ticks * case["n_trucks"])]
+
+
+def bench_metrics(case: dict) -> list[dict]:
+    """Time a tick engine run followed by summarize() with online metrics and with log metrics
+
+    Online metrics are only worth their per node updates if they cost no more than logging and analyzing the logs.
+    """
+    ticks = case["hours"] * TICKS_PER_HOUR
+    results = []
+    for metrics in ["online", "log"]:
+        sim = MiningSimulator(case["n_trucks"], case["m_stations"], stop_time_hr=case["hours"], metrics=metrics)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            sim.tick()
+        sim.summarize()
+        seconds = time.perf_counter() - start
+        results.append(_result(case, f"{metrics}_metrics", seconds, ticks, ticks * case["n_trucks"]))
+    return results
+
+
+def bench_assignment(case: dict, repeat: int = 5) -> list[dict]:
+    """Time StationAssigner.assign() for n_trucks trucks arriving on the same tick at stations with queues"""
+    rng = np.random.default_rng(0)
+    wait_times = rng.integers(0, 4, size=case["m_stations"]).tolist()
+    best = float("inf")
+    for _ in range(repeat):
+        assigner = StationAssigner.from_wait_times(wait_times, current_tick=0)
+        new_trucks = list(range(case["n_trucks"]))
+        start = time.perf_counter()
+        assigner.assign(1, new_trucks)
+        best = min(best, time.perf_counter() - start)
+    return [_result(case, "station_assigner", best)]
+
+
+def bench_station_tick(case: dict) -> list[dict]:
+    """Time UnloadingStation.tick() for all stations over the full horizon"""
+    ticks, m_stations = case["hours"] * TICKS_PER_HOUR, case["m_stations"]
+    log_store = LogStore(m_stations, UnloadingStation.log_columns, capacity=ticks + 1)
+    stations = [UnloadingStation(idx, log_store=log_store) for idx in range(m_stations)]
+    arrivals = np.random.default_rng(0).poisson(1.0, size=(ticks, m_stations))
+    trucks = [[[0] * x for x in row] for row in arrivals.tolist()]
+
+    start = time.perf_counter()
+    for tick_trucks in trucks:
+        for station, station_trucks in zip(stations, tick_trucks):
+            station.tick(trucks=station_trucks)
+    seconds = time.perf_counter() - start
+    return [_result(case, "station_tick", seconds, ticks)]
+
+
+def bench_analysis(case: dict) -> list[dict]:
+    """Time the analysis functions on the logs of a simulation (logs are created with the vector engine)"""
+    ticks = case["hours"] * TICKS_PER_HOUR
+    truck_ticks = ticks * case["n_trucks"]
+    sim = MiningSimulator(case["n_trucks"], case["m_stations"], stop_time_hr=case["hours"], engine="vector")
+    for _ in range(ticks):
+        sim.tick()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        truck_df_list = convert_log_to_df(sim.mining_trucks)
+        station_df_list = convert_log_to_df(sim.unloading_stations)
+        results.append(_result(case, "convert_log_to_df", time.perf_counter() - start, ticks, truck_ticks))
+
+        start = time.perf_counter()
+        compute_truck_metrics(truck_df_list)
+        results.append(_result(case, "compute_truck_metrics", time.perf_counter() - start, ticks, truck_ticks))
+
+        start = time.perf_counter()
+        compute_station_metrics(station_df_list, output_file=os.path.join(tmp_dir, "station_stats.json"))
+        results.append(_result(case, "compute_station_metrics", time.perf_counter() - start, ticks))
+    return results
+
+
+BENCHMARKS = {
+    "sim_tick": bench_sim_tick,
+    "metrics": bench_metrics,
+    "station_assigner": bench_assignment,
+    "station_tick": bench_station_tick,
+    "analysis": bench_analysis,
+}
+"""Benchmark function for each case type"""
+
+
+def run_case(case: dict, repeat: int = 3) -> list[dict]:
+    """Run one benchmark case `repeat` times, keep the best time of each phase and add the peak RSS of the process"""
+    best = {}
+    for _ in range(repeat):
+        for result in BENCHMARKS[case["phase"]](case):
+            if result["phase"] not in best or result["seconds"] < best[result["phase"]]["seconds"]:
+                best[result["phase"]] = result
+    rss = peak_rss_mb()
+    for result in best.values():
+        result["peak_rss_mb"] = rss
+    return list(best.values())
+
+
+def make_cases(grid: dict, max_truck_ticks: float = 2e7) -> list[dict]:
+    """Create the benchmark cases for a grid
+
+    Args:
+        grid (dict): Lists of "trucks", "stations", "hours" and "engines" (see PRESETS)
+        max_truck_ticks (float): Skip simulation and analysis cases with more truck ticks than this value
+
+    Returns:
+        list[dict]: Benchmark cases
+    """
+    cases = []
+    for n_trucks, m_stations, hours in itertools.product(grid["trucks"], grid["stations"], grid["hours"]):
+        if n_trucks * hours * TICKS_PER_HOUR > max_truck_ticks:
+            continue
+        for engine in grid["engines"]:
+            cases.append(
+                {"phase": "sim_tick", "engine": engine, "n_trucks": n_trucks, "m_stations": m_stations, "hours": hours}
+            )
+        cases.append({"phase": "metrics", "n_trucks": n_trucks, "m_stations": m_stations, "hours": hours})
+        cases.append({"phase": "analysis", "n_trucks": n_trucks, "m_stations": m_stations, "hours": hours})
+    for n_trucks, m_stations in itertools.product(grid["trucks"], grid["stations"]):
+        cases.append({"phase": "station_assigner", "n_trucks": n_trucks, "m_stations": m_stations})
+    for m_stations, hours in itertools.product(grid["stations"], grid["hours"]):
+        cases.append({"phase": "station_tick", "m_stations": m_stations, "hours": hours})
+    return cases
+
+
+def run_suite(cases: list[dict], isolate: bool = True, repeat: int = 3) -> pd.DataFrame:
+    """Run benchmark cases
+
+    Args:
+        cases (list[dict]): Benchmark cases from make_cases()
+        isolate (bool): Run each case in a fresh process (needed for per-case peak RSS)
+        repeat (int): Number of repeats per case (best time is reported)
+
+    Returns:
+        pd.DataFrame: One row per timed phase
+    """
+    results = []
+    if isolate:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx, max_tasks_per_child=1) as executor:
+            for case_results in executor.map(run_case, cases, itertools.repeat(repeat)):
+                results.extend(case_results)
+    else:
+        for case in cases:
+            results.extend(run_case(case, repeat))
+    return pd.DataFrame(results, columns=CASE_KEYS + ["seconds", "ticks_per_s", "truck_ticks_per_s", "peak_rss_mb"])
+
+
+def fit_scaling_exponents(results_df: pd.DataFrame) -> dict:
+    """Fit seconds ~ n_trucks^a * m_stations^b * hours^c for each phase (and engine) by least squares in log space
+
+    Args:
+        results_df (pd.DataFrame): Results from run_suite()
+
+    Returns:
+        dict: {"phase[/engine]": {parameter: exponent}} for the parameters that vary within the phase
+    """
+    exponents = {}
+    for (phase, engine), df in results_df.groupby(["phase", results_df["engine"].fillna("")], sort=False):
+        df = df[df["seconds"] > 0]
+        params = [x for x in ["n_trucks", "m_stations", "hours"] if df[x].notna().all() and df[x].nunique() > 1]
+        if not params or len(df) <= len(params):
+            continue
+        design = np.column_stack([np.ones(len(df))] + [np.log(df[x].to_numpy(dtype=float)) for x in params])
+        coefficients, *_ = np.linalg.lstsq(design, np.log(df["seconds"].to_numpy(dtype=float)), rcond=None)
+        name = f"{phase}/{engine}" if engine else phase
+        exponents[name] = {x: float(c) for x, c in zip(params, coefficients[1:])}
+    return exponents
+
+
+def compare_metrics_modes(results_df: pd.DataFrame) -> pd.DataFrame:
+    """Online metrics time relative to log metrics (run and analysis) for each metrics case
+
+    Args:
+        results_df (pd.DataFrame): Results from run_suite()
+
+    Returns:
+        pd.DataFrame: n_trucks, m_stations, hours, online and log seconds and ratio (online / log)
+    """
+    keys = ["n_trucks", "m_stations", "hours"]
+    online_df = results_df.loc[results_df["phase"] == "online_metrics", keys + ["seconds"]]
+    log_df = results_df.loc[results_df["phase"] == "log_metrics", keys + ["seconds"]]
+    merged = online_df.merge(log_df, on=keys, suffixes=("_online", "_log"))
+    merged["ratio"] = merged["seconds_online"] / merged["seconds_log"]
+    return merged.reset_index(drop=True)
+
+
+def save_baseline(results_df: pd.DataFrame, path: str, preset: str | None = None):
+    """Save benchmark results, scaling exponents and machine info as a JSON baseline"""
+    baseline = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "preset": preset,
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "scaling": fit_scaling_exponents(results_df),
+        "results": json.loads(results_df.to_json(orient="records")),
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def compare_to_baseline(
+    results_df: pd.DataFrame, baseline: dict, tolerance: float = 0.3, min_seconds: float = 1e-2
+) -> pd.DataFrame:
+    """Compare results with a stored baseline
+
+    Args:
+        results_df (pd.DataFrame): Results from run_suite()
+        baseline (dict): Baseline loaded from a file written by save_baseline()
+        tolerance (float): Allowed slowdown (0.3 = 30% slower than the baseline)
+        min_seconds (float): Ignore cases faster than this in both runs (timer noise)
+
+    Returns:
+        pd.DataFrame: Cases found in both runs with baseline seconds, ratio (current / baseline) and regression flag
+    """
+    baseline_df = pd.DataFrame(baseline["results"], columns=CASE_KEYS + ["seconds"])
+    merged = results_df.merge(baseline_df, on=CASE_KEYS, suffixes=("", "_baseline"))
+    merged["ratio"] = merged["seconds"] / merged["seconds_baseline"]
+    merged["regression"] = (merged["ratio"] > 1 + tolerance) & (
+        merged[["seconds", "seconds_baseline"]].max(axis=1) >= min_seconds
+    )
+    return merged[CASE_KEYS + ["seconds", "seconds_baseline", "ratio", "regression"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for the simulation and analysis phases")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick", help="Benchmark grid")
+    parser.add_argument("--max-truck-ticks", type=float, default=2e7, help="Skip cases above this many truck ticks")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeats per case (best time is reported)")
+    parser.add_argument("--in-process", action="store_true", help="Run all cases in this process (no peak RSS)")
+    parser.add_argument("--save-baseline", help="Write results as a JSON baseline to this file")
+    parser.add_argument("--compare", help="Compare results with a JSON baseline, exit with 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed slowdown when comparing (0.3 = 30%%)")
+    args = parser.parse_args()
+
+    cases = make_cases(PRESETS[args.preset], args.max_truck_ticks)
+    print(f"Running {len(cases)} benchmark cases (preset: {args.preset})")
+    results_df = run_suite(cases, isolate=not args.in_process, repeat=args.repeat)
+
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(results_df.to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+        print("\nScaling exponents (seconds ~ parameter^exponent):")
+        for name, exponents in fit_scaling_exponents(results_df).items():
+            print(f"  {name}: " + ", ".join(f"{param}={value:.2f}" for param, value in exponents.items()))
+        print("\nOnline metrics vs. log metrics and analysis (ratio <= 1: online is cheaper):")
+        print(compare_metrics_modes(results_df).to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+
+    if args.save_baseline:
+        save_baseline(results_df, args.save_baseline, preset=args.preset)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            comparison_df = compare_to_baseline(results_df, json.load(f), tolerance=args.tolerance)
+        regressions = comparison_df[comparison_df["regression"]]
+        print(f"\nCompared {len(comparison_df)} cases with {args.compare}: {len(regressions)} regressions")
+        if len(regressions):
+            print(regressions.to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Microbenchmark for the per tick overhead of unloading stations with each unload queue backend
+
+Usage:
+    python -m benchmarks.bench_unload_queue [--ticks N] [--repeat N]
+"""
+
+import argparse
+import threading
+import time
+from queue import SimpleQueue
+
+from mining_sim.nodes.unloadstation import UnloadingStation, UNLOAD_QUEUE_BACKENDS
+from mining_sim.utility.metrics import StationMetrics
+
+QUEUE_LENGTHS = [0, 1, 10, 100]
+
+
+class LegacyUnloadQueue(SimpleQueue):
+    """Original SimpleQueue + lock unload queue, for comparison"""
+
+    def __init__(self, station_id: int):
+        super().__init__()
+        self._lock = threading.Lock()
+        self.station_id: int = station_id
+
+    def put_truck(self, item):
+        with self._lock:
+            self.put(item)
+
+    def put_trucks(self, items):
+        for item in items:
+            self.put_truck(item)
+
+    def queue_size(self):
+        with self._lock:
+            return self.qsize()
+
+    def get_truck(self):
+        with self._lock:
+            if self.empty():
+                return None
+            return self.get()
+
+
+QUEUE_FACTORIES = {"legacy": LegacyUnloadQueue, **UNLOAD_QUEUE_BACKENDS}
+"""Queue implementations to compare"""
+
+
+def _make_station(backend: str, queue_length: int) -> UnloadingStation:
+    """Station with online metrics (no log writes) and `queue_length` trucks queued"""
+    station = UnloadingStation(0, metrics=StationMetrics(1))
+    station.unload_queue = QUEUE_FACTORIES[backend](0)
+    station.unload_queue.put_trucks(range(queue_length))
+    return station
+
+
+def time_station_ticks(backend: str, queue_length: int, n_ticks: int) -> float:
+    """Seconds per station tick, with one truck arriving and one leaving on every tick
+
+    The simulator also reads the wait time of every station once per tick, which is included.
+    """
+    station = _make_station(backend, queue_length)
+    trucks = [[queue_length + i] for i in range(n_ticks)]
+    start = time.perf_counter()
+    for new_trucks in trucks:
+        station.tick(trucks=new_trucks)
+        station.get_wait_time()
+    return (time.perf_counter() - start) / n_ticks
+
+
+def run_benchmark(n_ticks: int = 100000, repeat: int = 5) -> list[dict]:
+    """Time a station tick for all queue backends and queue lengths
+
+    Args:
+        n_ticks (int): Number of ticks per measurement
+        repeat (int): Number of repeats per measurement (best time is reported)
+
+    Returns:
+        list[dict]: One result dict per queue length, times in nanoseconds per tick
+    """
+    results = []
+    for queue_length in QUEUE_LENGTHS:
+        result = {"queue_length": queue_length}
+        for backend in QUEUE_FACTORIES:
+            result[f"{backend}_ns"] = 1e9 * min(
+                time_station_ticks(backend, queue_length, n_ticks) for _ in range(repeat)
+            )
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per tick overhead of unloading stations")
+    parser.add_argument("--ticks", type=int, default=100000, help="Station ticks per measurement")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats per measurement (best time is reported)")
+    args = parser.parse_args()
+
+    header = " ".join(f"{backend + ' (ns)':>14}" for backend in QUEUE_FACTORIES)
+    print(f"{'queue length':>12} {header}")
+    for result in run_benchmark(args.ticks, args.repeat):
+        times = " ".join(f"{result[f'{backend}_ns']:>14.0f}" for backend in QUEUE_FACTORIES)
+        print(f"{result['queue_length']:>12} {times}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Checkpoints of a running MiningSimulator: snapshot, resume and what-if branching
+
+A snapshot holds the full simulator state: current tick, trucks (state, remaining time, assigned
+station), station queues, station assigner, engine state, the random generator and the position
+in the block of mining durations, and optionally the logs. A restored simulation continues exactly
+like the uninterrupted run.
+
+Usage:
+    data = snapshot(sim)
+    sim = restore(data)
+
+    save_checkpoint(sim, "sim.ckpt")
+    sim = load_checkpoint("sim.ckpt")
+
+    results = fork_branches(sim, [branch_a, branch_b])
+"""
+
+import io
+import logging
+import multiprocessing
+import os
+import pickle
+import traceback
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import wait
+from typing import Any, Callable
+
+from mining_sim.utility.log_store import LogStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"MSIMCKPT"
+"""Header of a simulation snapshot"""
+SNAPSHOT_VERSION = 1
+"""Version of the snapshot format"""
+
+_FLAG_COMPRESSED = 1
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Pickler that replaces in-memory log stores by empty stores of the same shape"""
+
+    def reducer_override(self, obj):
+        # Memory mapped log stores only save their path, they are mapped again on restore
+        if isinstance(obj, LogStore) and obj.path is None:
+            dtypes = {name: column.dtype.str for name, column in obj.columns.items()}
+            return LogStore, (len(obj.lengths), dtypes, obj.capacity)
+        return NotImplemented
+
+
+def snapshot(sim, include_logs: bool = True, compress: bool = True) -> bytes:
+    """Binary snapshot of the full simulator state
+
+    Args:
+        sim (MiningSimulator): Simulator to snapshot (any engine and metrics mode)
+        include_logs (bool): Include the per tick logs. Without logs, the restored simulation
+            only logs the ticks after the snapshot (online metrics are always included). Logs of
+            runs with a log_dir stay in their files, which the restored simulation maps and resumes
+            from the snapshot tick.
+        compress (bool): Compress the snapshot with zlib
+
+    Returns:
+        bytes: Snapshot that can be passed to restore()
+    """
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, pickle.HIGHEST_PROTOCOL)
+    if not include_logs:
+        pickler = _SnapshotPickler(buffer, pickle.HIGHEST_PROTOCOL)
+    pickler.dump(sim)
+
+    payload = buffer.getvalue()
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 1)
+        flags |= _FLAG_COMPRESSED
+    logger.debug(f"Simulation snapshot: {len(payload)} bytes")
+    return SNAPSHOT_MAGIC + bytes([SNAPSHOT_VERSION, flags]) + payload
+
+
+def restore(data: bytes):
+    """Restore a simulator from a snapshot
+
+    Args:
+        data (bytes): Snapshot created by snapshot()
+
+    Returns:
+        MiningSimulator: Simulator in the same state as when the snapshot was taken
+    """
+    header_size = len(SNAPSHOT_MAGIC) + 2
+    if data[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError("Data is not a simulation snapshot")
+    version, flags = data[len(SNAPSHOT_MAGIC)], data[len(SNAPSHOT_MAGIC) + 1]
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}. Expected {SNAPSHOT_VERSION}")
+
+    payload = data[header_size:]
+    if flags & _FLAG_COMPRESSED:
+        payload = zlib.decompress(payload)
+    return pickle.loads(payload)
+
+
+def save_checkpoint(sim, path: str, include_logs: bool = True):
+    """Write a snapshot of the simulator to a file
+
+    The file is replaced atomically, so an interrupted write leaves the previous checkpoint intact.
+
+    Args:
+        sim (MiningSimulator): Simulator to save
+        path (str): Checkpoint file path
+        include_logs (bool): Include the per tick logs
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(snapshot(sim, include_logs=include_logs))
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str):
+    """Restore a simulator from a checkpoint file
+
+    Args:
+        path (str): Checkpoint file written by save_checkpoint()
+
+    Returns:
+        MiningSimulator: Restored simulator, call run() to resume it
+    """
+    with open(path, "rb") as f:
+        return restore(f.read())
+
+
+def _run_forked_branch(sim, branch: Callable, conn):
+    """Run one branch in a forked process and send the result (or the error) to the parent"""
+    try:
+        conn.send((True, branch(sim)))
+    except Exception:
+        conn.send((False, traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def _run_restored_branch(data: bytes, branch: Callable):
+    """Run one branch on a simulator restored from a snapshot"""
+    return branch(restore(data))
+
+
+def fork_branches(sim, branches: list[Callable[..., Any]], max_workers: int | None = None) -> list:
+    """Run what-if branches from the current state of a simulation, each in its own process
+
+    Each branch is called with its own copy of the simulator, which it can modify and run further.
+    Where the `fork` start method is available, each branch runs in a process forked from this one,
+    so the warm simulator state is shared copy-on-write and does not need to be serialized.
+    Otherwise, branches are run in a process pool on simulators restored from a snapshot, in which
+    case the branches must be picklable (module level functions).
+
+    Args:
+        sim (MiningSimulator): Warm simulator to branch from (not modified)
+        branches (list[Callable]): Functions called as branch(sim), returning a picklable result
+        max_workers (int): Maximum number of branches running at a time. Defaults to the CPU count.
+
+    Returns:
+        list: Result of each branch, in the order of `branches`
+    """
+    if getattr(sim, "log_dir", None) is not None:
+        raise ValueError("Cannot fork a simulation with a log_dir: all branches would write to the same log files")
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+    if "fork" not in multiprocessing.get_all_start_methods():
+        logger.info("fork is not available, running branches from a snapshot")
+        data = snapshot(sim)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_run_restored_branch, data, branch) for branch in branches]
+            results = []
+            for idx, future in enumerate(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    for other_future in futures:
+                        other_future.cancel()
+                    raise RuntimeError(f"Branch {idx} failed: {e!r}") from e
+            return results
+
+    ctx = multiprocessing.get_context("fork")
+    results = [None] * len(branches)
+    running = {}  # Parent end of the result pipe -> (branch index, process)
+    pending = list(enumerate(branches))[::-1]
+    while pending or running:
+        while pending and len(running) < max_workers:
+            idx, branch = pending.pop()
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            process = ctx.Process(target=_run_forked_branch, args=(sim, branch, child_conn), daemon=True)
+            process.start()
+            child_conn.close()
+            running[parent_conn] = (idx, process)
+
+        for conn in wait(list(running)):
+            idx, process = running.pop(conn)
+            try:
+                ok, result = conn.recv()
+            except EOFError:
+                ok, result = False, f"Branch process exited with code {process.exitcode}"
+            conn.close()
+            process.join()
+            if not ok:
+                for _, other_process in running.values():
+                    other_process.terminate()
+                raise RuntimeError(f"Branch {idx} failed:\n{result}")
+            results[idx] = result
+
+    return results
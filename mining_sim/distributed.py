@@ -0,0 +1,562 @@
+"""Distributed sweeps: a coordinator hands out sweep tasks to worker processes on any number of hosts
+
+The coordinator owns the task list (see sweep.make_sweep_configs) and answers small JSON messages:
+    get: the next task for a worker, "wait" while the remaining tasks are leased, or "done"
+    result: the summary of a finished task (see sweep.run_config)
+    error: a task that raised, retried until max_attempts
+    heartbeat: a worker is still running a task, which extends its lease
+
+Each task is identified by a hash of its config, so duplicate tasks run once and duplicate results (e.g. from a
+worker whose lease expired but finished anyway) are ignored. A leased task whose worker stops sending heartbeats
+(crash, lost host) is handed out again once its lease expires. Runs are seeded by their config, so a retried task
+gives the same result wherever it runs.
+
+Messages go through a Transport. SocketTransport sends one JSON line per message over TCP to Coordinator.serve(),
+LocalTransport calls the coordinator in the same process; other transports (e.g. a message queue) only need
+request().
+
+The protocol is not authenticated beyond an optional shared token: serve on a trusted network.
+
+Usage:
+    python -m mining_sim.distributed coordinator --trucks 500 --stations 5:50:5 --replicates 4 --port 5555
+    python -m mining_sim.distributed worker --host coordinator-host --port 5555 --processes 8
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import socketserver
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import TYPE_CHECKING
+
+from mining_sim.sweep import make_sweep_configs, parse_int_values, run_config
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_BYTES = 1 << 20
+"""Largest message accepted by the coordinator (bytes)"""
+
+TOKEN_ENV = "MINING_SIM_TOKEN"
+"""Environment variable with the default shared token of the command line"""
+
+
+def task_id(config: dict) -> str:
+    """Identifier of a sweep task: hash of its config, the same on every host
+
+    Args:
+        config (dict): Sweep task (JSON serializable)
+
+    Returns:
+        str: Hex digest identifying the task
+    """
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:20]
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class Coordinator:
+    """Hands out sweep tasks to workers and collects their results, retrying failed and lost tasks"""
+
+    def __init__(
+        self,
+        configs: list[dict],
+        lease_s: float = 60.0,
+        max_attempts: int = 3,
+        poll_s: float = 1.0,
+        token: str | None = None,
+    ):
+        """Constructor for the coordinator
+
+        Args:
+            configs (list[dict]): Sweep tasks (see sweep.make_sweep_configs), identical tasks run once
+            lease_s (float): Time a worker has to finish a task or send a heartbeat before it is handed out again
+            max_attempts (int): Attempts (errors or expired leases) before a task is given up
+            poll_s (float): Longest time a worker waits before asking again while all tasks are leased
+            token (str): Shared token that workers must send (None to accept any worker)
+        """
+        if lease_s <= 0:
+            raise ValueError(f"lease_s must be positive, got {lease_s}")
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+        self.configs = list(configs)
+        """Sweep tasks, in order"""
+        self.task_ids = [task_id(x) for x in self.configs]
+        """Identifier of each sweep task"""
+        self.lease_s = lease_s
+        """Time before a silent task is handed out again (seconds)"""
+        self.max_attempts = max_attempts
+        """Attempts before a task is given up"""
+        self.poll_s = poll_s
+        """Longest wait of a worker between requests while all tasks are leased (seconds)"""
+        self.token = token
+        """Shared token of the workers"""
+        self.failed: dict[str, str] = {}
+        """Last error of each task that was given up"""
+        self.address: tuple[str, int] | None = None
+        """Host and port served (None until serve())"""
+        self._tasks = dict(zip(self.task_ids, self.configs))
+        self._pending = deque(self._tasks)
+        self._leases: dict[str, dict] = {}
+        self._attempts = dict.fromkeys(self._tasks, 0)
+        self._results: dict[str, dict] = {}
+        self._condition = threading.Condition()
+        self._server: _Server | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether every task has a result or was given up"""
+        return len(self._results) + len(self.failed) == len(self._tasks)
+
+    def handle(self, message: dict) -> dict:
+        """Answer a worker message (called by the transports, thread safe)
+
+        Args:
+            message (dict): Message with type (get, result, error or heartbeat), worker and, except for get,
+                task_id
+
+        Returns:
+            dict: Reply with type task (task_id, config and lease_s), wait (retry_s), done, ack or error
+        """
+        if self.token is not None and not hmac.compare_digest(str(message.get("token", "")), self.token):
+            return {"type": "error", "error": "Invalid token"}
+        handlers = {"get": self._get, "result": self._result, "error": self._error, "heartbeat": self._heartbeat}
+        kind = message.get("type")
+        if kind not in handlers:
+            return {"type": "error", "error": f"Unknown message type {kind!r}"}
+        if kind != "get" and message.get("task_id") not in self._tasks:
+            return {"type": "error", "error": f"Unknown task {message.get('task_id')!r}"}
+        with self._condition:
+            self._expire_leases(time.monotonic())
+            reply = handlers[kind](message)
+            if self.finished:
+                self._condition.notify_all()
+        return reply
+
+    def _get(self, message: dict) -> dict:
+        if self._pending:
+            key = self._pending.popleft()
+            self._attempts[key] += 1
+            self._leases[key] = {"worker": message.get("worker"), "deadline": time.monotonic() + self.lease_s}
+            return {"type": "task", "task_id": key, "config": self._tasks[key], "lease_s": self.lease_s}
+        if self._leases:
+            next_deadline = min(x["deadline"] for x in self._leases.values())
+            return {"type": "wait", "retry_s": min(self.poll_s, max(0.01, next_deadline - time.monotonic()))}
+        return {"type": "done"}
+
+    def _result(self, message: dict) -> dict:
+        key = message["task_id"]
+        if key in self._results:
+            return {"type": "ack", "duplicate": True}
+        self._results[key] = message["result"]
+        self._leases.pop(key, None)
+        self.failed.pop(key, None)
+        if key in self._pending:
+            self._pending.remove(key)
+        logger.debug(f"Task {key} finished by {message.get('worker')}")
+        return {"type": "ack", "duplicate": False}
+
+    def _error(self, message: dict) -> dict:
+        key = message["task_id"]
+        lease = self._leases.get(key)
+        # Ignore errors of tasks already finished or handed out again to another worker
+        if key in self._results or lease is None or lease["worker"] != message.get("worker"):
+            return {"type": "ack"}
+        del self._leases[key]
+        self._retry(key, message.get("error", "Unknown error"))
+        return {"type": "ack"}
+
+    def _heartbeat(self, message: dict) -> dict:
+        lease = self._leases.get(message["task_id"])
+        if lease is not None and lease["worker"] == message.get("worker"):
+            lease["deadline"] = time.monotonic() + self.lease_s
+        return {"type": "ack"}
+
+    def _expire_leases(self, now: float):
+        for key in [x for x, lease in self._leases.items() if lease["deadline"] < now]:
+            worker = self._leases.pop(key)["worker"]
+            self._retry(key, f"Lease expired on worker {worker}")
+
+    def _retry(self, key: str, error: str):
+        if self._attempts[key] >= self.max_attempts:
+            self.failed[key] = error
+            logger.error(f"Task {key} given up after {self._attempts[key]} attempts: {error}")
+        else:
+            self._pending.append(key)
+            logger.warning(f"Task {key} will be retried: {error}")
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> tuple[str, int]:
+        """Serve SocketTransport workers from a background thread
+
+        Args:
+            host (str): Interface to listen on ("0.0.0.0" for workers on other hosts)
+            port (int): TCP port (0 for any free port)
+
+        Returns:
+            tuple[str, int]: Host and port served
+        """
+        coordinator = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    line = self.rfile.readline(MAX_MESSAGE_BYTES)
+                    if not line:
+                        break
+                    if not line.endswith(b"\n"):
+                        # The rest of a cut-off line would be read as another message: reply once and hang up
+                        error = f"Message longer than {MAX_MESSAGE_BYTES} bytes or not newline terminated"
+                        self.wfile.write(json.dumps({"type": "error", "error": error}).encode() + b"\n")
+                        break
+                    try:
+                        reply = coordinator.handle(json.loads(line))
+                    except (ValueError, TypeError, KeyError, AttributeError) as error:
+                        reply = {"type": "error", "error": f"Invalid message: {error}"}
+                    self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+        self._server = _Server((host, port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        self.address = self._server.server_address[:2]
+        logger.info(f"Coordinator serving {len(self._tasks)} tasks on {self.address[0]}:{self.address[1]}")
+        return self.address
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until every task has a result or was given up
+
+        Args:
+            timeout (float): Longest wait (seconds), None to wait forever
+
+        Returns:
+            bool: True if finished
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while not self.finished:
+                # Wake up regularly so that leases expire even when no worker is asking for tasks
+                remaining = self.poll_s if deadline is None else min(self.poll_s, deadline - time.monotonic())
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+                self._expire_leases(time.monotonic())
+        return True
+
+    def results(self) -> list[dict]:
+        """Results of the finished tasks, in task order (one per config, tasks given up are left out)"""
+        with self._condition:
+            return [self._results[x] for x in self.task_ids if x in self._results]
+
+    def close(self):
+        """Stop serving"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+
+class Transport(ABC):
+    """Carries worker messages to a coordinator and returns its replies"""
+
+    @abstractmethod
+    def request(self, message: dict) -> dict:
+        """Send a message and wait for the reply
+
+        Raises:
+            ConnectionError: If the coordinator cannot be reached
+        """
+        pass
+
+    def close(self):
+        """Release the resources of the calling thread"""
+
+
+class LocalTransport(Transport):
+    """Transport to a coordinator in the same process (threads), with the same JSON encoding as the socket"""
+
+    def __init__(self, coordinator: Coordinator):
+        """Constructor for the local transport
+
+        Args:
+            coordinator (Coordinator): Coordinator receiving the messages
+        """
+        self.coordinator = coordinator
+        """Coordinator receiving the messages"""
+
+    def request(self, message: dict) -> dict:
+        return json.loads(json.dumps(self.coordinator.handle(json.loads(json.dumps(message)))))
+
+
+class SocketTransport(Transport):
+    """Transport over TCP: one JSON line per message to Coordinator.serve(), reconnecting on failures"""
+
+    def __init__(self, host: str, port: int, timeout: float = 30.0, retries: int = 5, retry_s: float = 1.0):
+        """Constructor for the socket transport
+
+        Args:
+            host (str): Coordinator host
+            port (int): Coordinator port
+            timeout (float): Socket timeout (seconds)
+            retries (int): Attempts of each request before raising ConnectionError
+            retry_s (float): Wait between attempts (seconds)
+        """
+        self.address = (host, port)
+        """Coordinator host and port"""
+        self.timeout = timeout
+        """Socket timeout (seconds)"""
+        self.retries = retries
+        """Attempts of each request"""
+        self.retry_s = retry_s
+        """Wait between attempts (seconds)"""
+        self._local = threading.local()
+
+    def request(self, message: dict) -> dict:
+        data = json.dumps(message).encode() + b"\n"
+        for attempt in range(self.retries):
+            try:
+                stream = self._stream()
+                stream.write(data)
+                stream.flush()
+                line = stream.readline(MAX_MESSAGE_BYTES)
+                if not line:
+                    raise ConnectionResetError("Connection closed by the coordinator")
+                if not line.endswith(b"\n"):
+                    raise ValueError(f"Reply longer than {MAX_MESSAGE_BYTES} bytes")
+                return json.loads(line)
+            except (OSError, ValueError) as error:
+                # The stream may be out of sync with the replies: reconnect
+                self.close()
+                logger.debug(f"Request to {self.address} failed ({error}), attempt {attempt + 1}/{self.retries}")
+                if attempt + 1 < self.retries:
+                    time.sleep(self.retry_s)
+        raise ConnectionError(f"Coordinator {self.address[0]}:{self.address[1]} unreachable")
+
+    def _stream(self):
+        # One connection per thread (the worker and its heartbeat thread)
+        if getattr(self._local, "stream", None) is None:
+            connection = socket.create_connection(self.address, timeout=self.timeout)
+            self._local.stream = connection.makefile("rwb")
+            connection.close()  # The file object keeps the socket open
+        return self._local.stream
+
+    def close(self):
+        """Close the connection of the calling thread"""
+        stream = getattr(self._local, "stream", None)
+        if stream is not None:
+            try:
+                stream.close()
+            except OSError:
+                pass
+            self._local.stream = None
+
+
+def run_worker(transport: Transport, worker_id: str | None = None, token: str | None = None) -> int:
+    """Run tasks from a coordinator until it has none left
+
+    A heartbeat thread extends the lease of the running task every third of the lease time.
+
+    Args:
+        transport (Transport): Transport to the coordinator
+        worker_id (str): Name of the worker (defaults to host name and process id)
+        token (str): Shared token of the coordinator
+
+    Returns:
+        int: Number of tasks run
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    header = {"worker": worker_id} if token is None else {"worker": worker_id, "token": token}
+    n_tasks = 0
+    while True:
+        try:
+            reply = transport.request({"type": "get", **header})
+        except ConnectionError as error:
+            logger.warning(f"Worker {worker_id} stopping: {error}")
+            break
+        if reply["type"] == "done":
+            break
+        if reply["type"] == "wait":
+            time.sleep(reply["retry_s"])
+            continue
+        if reply["type"] != "task":
+            raise RuntimeError(f"Coordinator rejected worker {worker_id}: {reply.get('error')}")
+
+        task = {**header, "task_id": reply["task_id"]}
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=_send_heartbeats, args=(transport, task, reply["lease_s"] / 3, stop_heartbeat), daemon=True
+        )
+        heartbeat.start()
+        try:
+            message = {"type": "result", **task, "result": run_config(reply["config"])}
+        except Exception as error:
+            logger.exception(f"Task {reply['task_id']} failed on worker {worker_id}")
+            message = {"type": "error", **task, "error": f"{type(error).__name__}: {error}"}
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+        n_tasks += 1
+        try:
+            transport.request(message)
+        except ConnectionError as error:
+            logger.warning(f"Worker {worker_id} stopping: {error}")
+            break
+    logger.info(f"Worker {worker_id} ran {n_tasks} tasks")
+    return n_tasks
+
+
+def _send_heartbeats(transport: Transport, task: dict, interval_s: float, stop: threading.Event):
+    try:
+        while not stop.wait(interval_s):
+            transport.request({"type": "heartbeat", **task})
+    except ConnectionError:
+        pass
+    finally:
+        transport.close()
+
+
+def _worker_process(host: str, port: int, token: str | None):
+    """Worker process entry point"""
+    run_worker(SocketTransport(host, port), token=token)
+
+
+def start_workers(host: str, port: int, n_processes: int, token: str | None = None) -> list:
+    """Start worker processes on this host
+
+    Args:
+        host (str): Coordinator host
+        port (int): Coordinator port
+        n_processes (int): Number of worker processes
+        token (str): Shared token of the coordinator
+
+    Returns:
+        list[multiprocessing.Process]: Started processes, which exit when the coordinator has no tasks left
+    """
+    processes = [
+        multiprocessing.Process(target=_worker_process, args=(host, port, token), daemon=True)
+        for _ in range(n_processes)
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def run_distributed_sweep(
+    configs: list[dict],
+    host: str = "127.0.0.1",
+    port: int = 0,
+    local_workers: int = 0,
+    lease_s: float = 60.0,
+    max_attempts: int = 3,
+    token: str | None = None,
+    timeout: float | None = None,
+) -> "pd.DataFrame":
+    """Run sweep tasks on the workers that connect to a coordinator served from this process
+
+    Args:
+        configs (list[dict]): Sweep tasks from make_sweep_configs
+        host (str): Interface to listen on ("0.0.0.0" for workers on other hosts)
+        port (int): TCP port (0 for any free port, only useful with local workers)
+        local_workers (int): Worker processes started on this host
+        lease_s (float): Time a worker has to send a heartbeat before its task is handed out again
+        max_attempts (int): Attempts before a task is given up
+        token (str): Shared token that workers must send
+        timeout (float): Longest time to wait for the results (seconds), None to wait forever
+
+    Returns:
+        pd.DataFrame: One row per finished task with config and summary metrics, in task order. Tasks given
+            up (see the log) are left out.
+    """
+    import pandas as pd
+
+    start_time = time.perf_counter()
+    coordinator = Coordinator(configs, lease_s=lease_s, max_attempts=max_attempts, token=token)
+    host, port = coordinator.serve(host, port)
+    processes = start_workers(host, port, local_workers, token) if local_workers else []
+    try:
+        if coordinator.wait(timeout):
+            # Keep serving while the waiting workers ask again, so they get "done"
+            time.sleep(2 * coordinator.poll_s)
+        else:
+            logger.error(f"Sweep timed out after {timeout} s")
+        for process in processes:
+            process.join(coordinator.poll_s + 5)
+    finally:
+        coordinator.close()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    if coordinator.failed:
+        logger.error(f"{len(coordinator.failed)} tasks given up: {coordinator.failed}")
+    results = coordinator.results()
+    logger.info(f"Distributed sweep of {len(results)} tasks finished in {time.perf_counter() - start_time:.1f} s")
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a MiningSimulator sweep on workers across hosts")
+    subparsers = parser.add_subparsers(dest="role", required=True)
+    coordinator = subparsers.add_parser("coordinator", help="Serve the sweep tasks and collect the results")
+    coordinator.add_argument("--trucks", nargs="+", required=True, help="Truck counts (values or start:stop[:step])")
+    coordinator.add_argument("--stations", nargs="+", required=True, help="Station counts (start:stop[:step])")
+    coordinator.add_argument("--replicates", type=int, default=1, help="Independent seeds per configuration")
+    coordinator.add_argument("--seed", type=int, default=0, help="Base seed for the replicate seeds")
+    coordinator.add_argument("--hours", type=int, default=72, help="Simulation stop time in hours")
+    coordinator.add_argument("--engine", default="vector", help="Simulation engine (tick, event or vector)")
+    coordinator.add_argument("--host", default="0.0.0.0", help="Interface to listen on")
+    coordinator.add_argument("--port", type=int, default=5555, help="TCP port")
+    coordinator.add_argument("--local-workers", type=int, default=0, help="Worker processes on this host")
+    coordinator.add_argument("--lease", type=float, default=60.0, help="Seconds before a silent task is retried")
+    coordinator.add_argument("--max-attempts", type=int, default=3, help="Attempts before a task is given up")
+    coordinator.add_argument("--output", default="./results/sweep_results.csv", help="Output CSV for all runs")
+    worker = subparsers.add_parser("worker", help="Run tasks from a coordinator")
+    worker.add_argument("--host", required=True, help="Coordinator host")
+    worker.add_argument("--port", type=int, default=5555, help="Coordinator port")
+    worker.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    for subparser in (coordinator, worker):
+        subparser.add_argument("--token", default=os.environ.get(TOKEN_ENV), help=f"Shared token (or ${TOKEN_ENV})")
+    args = parser.parse_args()
+
+    if args.role == "worker":
+        for process in start_workers(args.host, args.port, args.processes, args.token):
+            process.join()
+        return
+
+    configs = make_sweep_configs(
+        parse_int_values(args.trucks),
+        parse_int_values(args.stations),
+        n_replicates=args.replicates,
+        base_seed=args.seed,
+        stop_time_hr=args.hours,
+        engine=args.engine,
+    )
+    print(f"Serving {len(configs)} simulations on port {args.port}...")
+    results_df = run_distributed_sweep(
+        configs,
+        host=args.host,
+        port=args.port,
+        local_workers=args.local_workers,
+        lease_s=args.lease,
+        max_attempts=args.max_attempts,
+        token=args.token,
+    )
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    results_df.to_csv(args.output, index=False)
+    print(f"{len(results_df)} of {len(configs)} results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Next-event simulation engine for the MiningSimulator"""
+
+import heapq
+import logging
+
+from mining_sim.enums.sim_enums import TruckState
+from mining_sim.utility.tracing import TraceEvent
+
+logger = logging.getLogger(__name__)
+
+_UNLOADING = TruckState.Unloading.value
+
+
+class EventEngine:
+    """Heap based discrete-event engine
+
+    Instead of ticking every truck and station on every clock tick, the engine keeps a
+    min-heap of (tick, truck_id) entries holding the tick at which each truck completes
+    its current activity. On each tick only the following nodes are touched:
+    - Trucks whose activity completes on this tick
+    - Trucks that arrived at the unloading site on the previous tick (need assignment)
+    - Stations that have a non-empty unload queue or receive new trucks
+    - Trucks dequeued by a station on this tick
+
+    All other nodes are left behind and caught up (see `MiningTruck.advance()` and
+    `UnloadingStation.advance()`) when they are touched again or when `sync_nodes()` is
+    called. Truck events on the same tick are processed in truck ID order, which keeps the
+    order of random draws identical to the tick engine.
+    """
+
+    def __init__(self, sim):
+        """Constructor for the event engine
+
+        Args:
+            sim (MiningSimulator): Simulator whose trucks and stations are advanced by this engine
+        """
+        self.sim = sim
+        """Simulator that owns the nodes"""
+        self._events: list[tuple[int, int]] = []
+        """Min-heap of (completion tick, truck ID) for trucks that are not unloading"""
+        self._arrived: list[int] = []
+        """Truck IDs that arrived at the unloading site on the previous tick"""
+        self._busy_stations: set[int] = set()
+        """Station IDs with a non-empty unload queue"""
+
+        for truck in sim.mining_trucks:
+            self._schedule(truck)
+
+    def _schedule(self, truck):
+        """Schedule the next event for a truck that just completed a tick"""
+        if truck._state == _UNLOADING:
+            self._arrived.append(truck.idx)
+        else:
+            heapq.heappush(self._events, (truck.current_tick + truck._remaining_time_in_state, truck.idx))
+
+    def tick(self, current_tick: int):
+        """Process all events for the given simulation tick
+
+        Args:
+            current_tick (int): Simulation tick to process. Must be one more than the last processed tick.
+        """
+        trucks = self.sim.mining_trucks
+        stations = self.sim.unloading_stations
+
+        # 1. Assign trucks that arrived at the unloading site on the previous tick
+        station_trucks: dict[int, list[int]] = {}
+        if self._arrived:
+            new_trucks, self._arrived = self._arrived, []
+            station_trucks = self.sim.station_assigner.assign(current_tick, new_trucks)
+
+        # 2. Move trucks that complete their current activity on this tick
+        while self._events and self._events[0][0] <= current_tick:
+            _, truck_idx = heapq.heappop(self._events)
+            truck = trucks[truck_idx]
+            truck.advance(current_tick - 1 - truck.current_tick)
+            truck.tick()
+            self._schedule(truck)
+
+        # 3. Move stations with queued or newly assigned trucks
+        trucks_unload_complete = []
+        for station_idx in sorted(self._busy_stations.union(station_trucks)):
+            station = stations[station_idx]
+            station.advance(current_tick - 1 - station.current_tick)
+            _get_truck = station.tick(trucks=station_trucks.get(station_idx, []))
+            if _get_truck is not None:
+                trucks_unload_complete.append(_get_truck)
+
+            if station.get_wait_time() > 0:
+                self._busy_stations.add(station_idx)
+            else:
+                self._busy_stations.discard(station_idx)
+
+        # 4. Tick newly assigned trucks and trucks that completed unloading
+        trucks_unload_complete = set(trucks_unload_complete)
+        for station_idx, q_trucks in station_trucks.items():
+            for truck_idx in q_trucks:
+                truck = trucks[truck_idx]
+                truck.assign_unload_site(station_idx)
+                if self.sim.tracer is not None:
+                    self.sim.tracer.emit(current_tick, TraceEvent.Assignment, truck_idx, station_idx)
+                if truck_idx not in trucks_unload_complete:
+                    truck.advance(current_tick - 1 - truck.current_tick)
+                    truck.tick(unloading_complete=False)
+
+        for truck_idx in sorted(trucks_unload_complete):
+            truck = trucks[truck_idx]
+            truck.advance(current_tick - 1 - truck.current_tick)
+            truck.tick(unloading_complete=True)
+            self._schedule(truck)
+
+    def sync_nodes(self):
+        """Catch up all trucks and stations to the current simulation tick"""
+        current_tick = self.sim.current_tick
+        for truck in self.sim.mining_trucks:
+            truck.advance(current_tick - truck.current_tick)
+        for station in self.sim.unloading_stations:
+            station.advance(current_tick - station.current_tick)
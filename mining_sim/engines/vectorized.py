@@ -0,0 +1,292 @@
+"""Vectorized (NumPy) fleet engine for the MiningSimulator"""
+
+import itertools
+import logging
+
+import numpy as np
+
+from mining_sim.enums.sim_enums import TruckState, UnloadStationState as StationState
+from mining_sim.nodes.truck import MiningTruck, TRAVEL_TIME_UNLOAD_SITE_TO_MINE, TIME_TO_UNLOAD
+from mining_sim.nodes.unloadstation import UnloadingStation, UnloadQueue
+from mining_sim.utility.tracing import TraceEvent
+
+logger = logging.getLogger(__name__)
+
+_ON_ROAD_TO_MINE = TruckState.OnRoad_ToMine.value
+_AT_MINE = TruckState.AtMine.value
+_ON_ROAD_TO_UNLOAD = TruckState.OnRoad_ToUnload.value
+_UNLOADING = TruckState.Unloading.value
+
+
+class VectorEngine:
+    """Struct-of-arrays engine that moves the whole fleet forward with NumPy array operations
+
+    Truck state is held in arrays indexed by truck ID (state code, remaining ticks, assigned
+    station, queued flag). Stations are represented by the next tick at which they can unload
+    a truck, so the tick at which each queued truck gets unloaded is known when it is assigned.
+    `FleetTruck` and `FleetStation` provide per-node views on top of these arrays so that
+    `MiningSimulator.mining_trucks` and `MiningSimulator.unloading_stations` keep working.
+    """
+
+    def __init__(self, sim):
+        """Constructor for the vector engine
+
+        Args:
+            sim (MiningSimulator): Simulator for which the fleet is created
+        """
+        self.sim = sim
+        """Simulator that owns the fleet"""
+        n_trucks, m_stations = sim.num_trucks, sim.num_stations
+        self.current_tick = 0
+        """Last tick processed by the engine"""
+
+        # Truck arrays - all trucks start at the mine
+        self.state = np.full(n_trucks, _AT_MINE, dtype=np.int8)
+        """Truck state codes (TruckState values)"""
+        self.remaining = self._mining_durations(n_trucks)
+        """Ticks remaining in current truck state"""
+        self.station = np.full(n_trucks, -1, dtype=np.int32)
+        """Station ID where each truck is queued/docked (-1 for none)"""
+        self.queued = np.zeros(n_trucks, dtype=bool)
+        """Flag to indicate whether each truck is in an unload queue"""
+        self.unload_tick = np.zeros(n_trucks, dtype=np.int64)
+        """Tick at which each queued truck is unloaded by its station"""
+
+        # Station arrays
+        self.next_free = np.zeros(m_stations, dtype=np.int64)
+        """Next tick at which each station can unload a newly queued truck"""
+
+        self.trucks = [FleetTruck(self, idx) for idx in range(n_trucks)]
+        """Per truck views of the fleet"""
+        self.stations = [FleetStation(self, idx) for idx in range(m_stations)]
+        """Per station views of the fleet"""
+
+    def _mining_durations(self, size: int) -> np.ndarray:
+        """Draw mining durations (1 to 5 hours in 30-minute steps) for `size` trucks, in truck ID order"""
+        return self.sim.duration_sampler.take(size).astype(np.int32)
+
+    def get_wait_times(self) -> np.ndarray:
+        """Current wait time (number of queued trucks) at each station"""
+        return np.maximum(self.next_free - self.current_tick - 1, 0)
+
+    def assign(self, station_assignments: dict[int, list[int]]):
+        """Queue trucks at stations based on assignments from StationAssigner.assign()
+
+        Args:
+            station_assignments (dict[int, list[int]]): Truck IDs assigned to each station ID, in queue order
+        """
+        group_size = np.fromiter((len(x) for x in station_assignments.values()), dtype=np.int64)
+        station_ids = np.repeat(np.fromiter(station_assignments.keys(), dtype=np.int64), group_size)
+        truck_ids = np.fromiter(itertools.chain.from_iterable(station_assignments.values()), dtype=np.int64)
+
+        # Position of each truck within the trucks newly assigned to the same station
+        group_start = np.cumsum(group_size) - group_size
+        position = np.arange(len(station_ids)) - np.repeat(group_start, group_size)
+
+        # New trucks are unloaded one per tick, after the trucks already queued at the station
+        start_tick = np.maximum(self.current_tick + 1, self.next_free[station_ids])
+        self.next_free[station_ids[group_start]] = start_tick[group_start] + group_size
+        self.station[truck_ids] = station_ids
+        self.queued[truck_ids] = True
+        self.unload_tick[truck_ids] = start_tick + position
+
+        tracer = self.sim.tracer
+        if tracer is not None:
+            tick = self.current_tick + 1
+            tracer.emit_many(tick, TraceEvent.Enqueue, truck_ids, station_ids, start_tick + position - tick + 1)
+            tracer.emit_many(tick, TraceEvent.Assignment, truck_ids, station_ids)
+
+    def tick(self, current_tick: int):
+        """Move the fleet forward by one tick
+
+        Args:
+            current_tick (int): Simulation tick to process. Must be one more than the last processed tick.
+        """
+        # Queue trucks that arrived on the previous tick, then log state before any transition (same as node tick())
+        new_trucks = self.new_trucks()
+        if new_trucks:
+            self.assign(self.sim.station_assigner.assign(current_tick, new_trucks))
+        truck_log = self.sim.truck_log
+        if truck_log is not None:
+            position = truck_log.reserve_all(current_tick - 1)
+            truck_log.columns["state"][:, position] = self.state
+            truck_log.columns["assigned_station"][:, position] = self.station
+        if self.sim.truck_metrics is not None:
+            self.sim.truck_metrics.record_all(current_tick - 1, self.state)
+
+        # Trucks travelling or mining
+        moving = self.state != _UNLOADING
+        self.remaining[moving] = np.maximum(self.remaining[moving] - 1, 0)
+        done = np.flatnonzero(moving & (self.remaining == 0))
+        if done.size:
+            new_state = self.state[done] + 1
+            self.state[done] = new_state
+            self.remaining[done[new_state == _AT_MINE]] = self._mining_durations(
+                np.count_nonzero(new_state == _AT_MINE)
+            )
+            self.remaining[done[new_state == _ON_ROAD_TO_UNLOAD]] = TRAVEL_TIME_UNLOAD_SITE_TO_MINE
+            self.remaining[done[new_state == _UNLOADING]] = TIME_TO_UNLOAD
+            if self.sim.tracer is not None:
+                self.sim.tracer.emit_many(
+                    current_tick, TraceEvent.StateTransition, done, self.station[done], new_state - 1, new_state
+                )
+
+        # Stations unload the truck at the front of their queue
+        docked = self.queued & (self.state == _UNLOADING)
+        unloaded = np.flatnonzero(docked & (self.unload_tick == current_tick))
+        wait_time = np.maximum(self.next_free - current_tick - 1, 0)
+        station_log = self.sim.station_log
+        if station_log is not None:
+            position = station_log.reserve_all(current_tick)
+            station_log.columns["truck_unloading"][:, position] = -1
+            station_log.columns["truck_unloading"][self.station[unloaded], position] = unloaded
+            station_log.columns["wait_time"][:, position] = wait_time
+        if self.sim.station_metrics is not None:
+            self.sim.station_metrics.record_all(wait_time)
+
+        tracer = self.sim.tracer
+        if tracer is not None and unloaded.size:
+            stations = self.station[unloaded]
+            tracer.emit_many(current_tick, TraceEvent.Dequeue, unloaded, stations, wait_time[stations])
+            tracer.emit_many(current_tick, TraceEvent.StateTransition, unloaded, stations, _UNLOADING, _ON_ROAD_TO_MINE)
+
+        # Queued trucks
+        self.remaining[docked] = np.maximum(self.remaining[docked] - 1, 0)
+        self.state[unloaded] = _ON_ROAD_TO_MINE
+        self.remaining[unloaded] = TRAVEL_TIME_UNLOAD_SITE_TO_MINE
+        self.station[unloaded] = -1
+        self.queued[unloaded] = False
+
+        self.current_tick = current_tick
+
+    def new_trucks(self) -> list[int]:
+        """Truck IDs waiting at the unloading site to be assigned to a station"""
+        return np.flatnonzero((self.state == _UNLOADING) & ~self.queued).tolist()
+
+    def queued_trucks(self, station_idx: int) -> list[int]:
+        """Truck IDs queued at a station in unload order"""
+        trucks = np.flatnonzero(self.queued & (self.station == station_idx))
+        return trucks[np.argsort(self.unload_tick[trucks], kind="stable")].tolist()
+
+    def sync_nodes(self):
+        """Nodes are views into the fleet arrays and are always up to date"""
+        pass
+
+
+class _FleetView:
+    """Pickling of fleet views: only the fields stored on the view are saved, the others are fleet arrays"""
+
+    __slots__ = ()
+
+    _view_fields: tuple[str, ...] = ()
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self._view_fields}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class FleetTruck(_FleetView, MiningTruck):
+    """Per truck view into the arrays of a VectorEngine"""
+
+    __slots__ = ("_fleet",)
+
+    _view_fields = ("_fleet", "idx", "_tracer", "_log_store", "_metrics", "_log_row")
+
+    def __init__(self, fleet: VectorEngine, truck_id: int):
+        """Constructor for a fleet truck view
+
+        Args:
+            fleet (VectorEngine): Engine holding the truck arrays
+            truck_id (int): Truck ID (index into fleet arrays)
+        """
+        self._fleet = fleet
+        self.idx = truck_id
+        self._tracer = None
+        self._log_store = fleet.sim.truck_log
+        self._metrics = fleet.sim.truck_metrics
+        self._log_row = truck_id
+
+    @property
+    def current_tick(self) -> int:
+        return self._fleet.current_tick
+
+    @property
+    def _state(self) -> int:
+        return int(self._fleet.state[self.idx])
+
+    @_state.setter
+    def _state(self, state: int):
+        self._fleet.state[self.idx] = state
+
+    @property
+    def _remaining_time_in_state(self) -> int:
+        return int(self._fleet.remaining[self.idx])
+
+    @_remaining_time_in_state.setter
+    def _remaining_time_in_state(self, remaining: int):
+        self._fleet.remaining[self.idx] = remaining
+
+    @property
+    def unload_site_id(self) -> int:
+        return int(self._fleet.station[self.idx])
+
+    @unload_site_id.setter
+    def unload_site_id(self, unload_site_id: int):
+        self._fleet.station[self.idx] = unload_site_id
+
+    @property
+    def unload_queued(self) -> bool:
+        return bool(self._fleet.queued[self.idx])
+
+    @unload_queued.setter
+    def unload_queued(self, unload_queued: bool):
+        self._fleet.queued[self.idx] = unload_queued
+
+    def tick(self, unloading_complete: bool = False):
+        """Not supported: fleet trucks are moved forward in batch by VectorEngine.tick()"""
+        raise RuntimeError("Fleet trucks are views of the vector engine arrays, only VectorEngine.tick() moves them")
+
+
+class FleetStation(_FleetView, UnloadingStation):
+    """Per station view into the arrays of a VectorEngine"""
+
+    __slots__ = ("_fleet",)
+
+    _view_fields = ("_fleet", "idx", "_tracer", "_log_store", "_metrics", "_log_row", "_state", "unloading_truck_id")
+
+    def __init__(self, fleet: VectorEngine, station_id: int):
+        """Constructor for a fleet station view
+
+        Args:
+            fleet (VectorEngine): Engine holding the station arrays
+            station_id (int): Station ID (index into fleet arrays)
+        """
+        self._fleet = fleet
+        self.idx = station_id
+        self._tracer = None
+        self._log_store = fleet.sim.station_log
+        self._metrics = fleet.sim.station_metrics
+        self._log_row = station_id
+        self._state = StationState.Unoccupied.value
+        self.unloading_truck_id: int = None
+
+    @property
+    def current_tick(self) -> int:
+        return self._fleet.current_tick
+
+    @property
+    def unload_queue(self) -> UnloadQueue:
+        """Snapshot of the trucks currently queued at the station"""
+        unload_queue = UnloadQueue(self.idx)
+        unload_queue.put_trucks(self._fleet.queued_trucks(self.idx))
+        return unload_queue
+
+    def get_wait_time(self) -> int:
+        return int(max(self._fleet.next_free[self.idx] - self._fleet.current_tick - 1, 0))
+
+    def tick(self, trucks: list[int] | None = None) -> int:
+        """Not supported: fleet stations are moved forward in batch by VectorEngine.tick()"""
+        raise RuntimeError("Fleet stations are views of the vector engine arrays, only VectorEngine.tick() moves them")
@@ -1,25 +1,52 @@
 from abc import ABC, abstractmethod
 import logging
 
+from mining_sim.utility.log_store import LogStore
+from mining_sim.utility.tracing import Tracer
+
 logger = logging.getLogger(__name__)
 
 
 class SimulationNode(ABC):
-    """Base class for a simulation node in our system"""
+    """Base class for a simulation node in our system
+
+    Nodes are slotted (no instance `__dict__`), so large fleets only pay for the attributes below.
+    """
+
+    __slots__ = ("idx", "current_tick", "_state", "_log_store", "_metrics", "_log_row", "_tracer")
+
+    log_columns: dict[str, str] = {}
+    """Log column names and numpy dtypes for the node class"""
+    node_type: str = "Node"
+    """Simulation Node Type (shared by all nodes of a class)"""
 
-    def __init__(self, idx: int, node_type: str):
-        """Constructor for base simulation node class"""
-        logger.debug("Initializing base class")
+    def __init__(self, idx: int, node_type: str | None = None, log_store: LogStore | None = None, metrics=None):
+        """Constructor for base simulation node class
+
+        Args:
+            idx (int): Identifier for the simulation node
+            node_type (str): Simulation node type. Must match the node_type of the class if passed.
+            log_store (LogStore): Shared log store where row `idx` belongs to this node.
+            metrics (TruckMetrics | StationMetrics): Shared online metrics where row `idx` belongs to this node.
+                If neither log_store or metrics is passed, the node logs into its own store.
+        """
+        if node_type is not None and node_type != self.node_type:
+            raise ValueError(f"Node type {node_type} does not match {type(self).__name__} ({self.node_type})")
         self.idx = idx
         """Idenitifier for particular simulation node"""
-        self.node_type = node_type
-        """Simulation Node Type """
         self.current_tick = 0
         """Track the current clock tick from the simulation"""
         self._state = None
         """Represents state of the simulation node"""
-        self._data_log_list = []
-        """Log data list for Node Class"""
+        shared = log_store is not None or metrics is not None
+        self._log_store = log_store if shared else LogStore(1, self.log_columns)
+        """Columnar log store for Node Class (None when only online metrics are recorded)"""
+        self._metrics = metrics
+        """Online metrics for Node Class (None when metrics are computed from the logs)"""
+        self._log_row = idx if shared else 0
+        """Row of this node in the log store and online metrics"""
+        self._tracer: Tracer | None = None
+        """Tracer receiving the events of this node (None when tracing is disabled)"""
 
     def __str__(self):
         return f"{self.node_type}-ID-{self.idx}"
@@ -38,6 +65,11 @@ class SimulationNode(ABC):
         """Abstract method for data logging"""
         pass
 
+    @abstractmethod
+    def get_log_columns(self) -> dict:
+        """Abstract method returning the logged data as columns (one array per log field)"""
+        pass
+
     @abstractmethod
     def tick(self):
         """Abstract method for moving simulation node by one tick"""
@@ -1,44 +1,93 @@
 import logging
-import random
+
+import numpy as np
 
 from mining_sim.nodes.base import SimulationNode
 from mining_sim.enums.sim_enums import TruckState
+from mining_sim.utility.log_store import LogStore
+from mining_sim.utility.metrics import TruckMetrics
+from mining_sim.utility.rng import MiningDurationSampler, DEFAULT_SAMPLER
+from mining_sim.utility.tracing import TraceEvent
 
 logger = logging.getLogger(__name__)
 
 # Define some global values
 TRAVEL_TIME_UNLOAD_SITE_TO_MINE = 6  # Represented in ticks, 1 tick = 5 min, so 6 ticks = 30 minutes
 TIME_TO_UNLOAD = 1  # Represented in ticks, 1 tick = 5 min
+TRUCK_STATE_NAMES = [state.name for state in TruckState]  # Indexed by state value
+TRUCK_STATES = tuple(TruckState)  # Indexed by state value
+TRUCK_MEMORY_BUDGET = 200  # Bytes per MiningTruck object, excluding its rows in the shared log store
+
+# State codes used internally, the TruckState enum is only built at the API boundary (get_state)
+_ON_ROAD_TO_MINE = TruckState.OnRoad_ToMine.value
+_AT_MINE = TruckState.AtMine.value
+_ON_ROAD_TO_UNLOAD = TruckState.OnRoad_ToUnload.value
+_UNLOADING = TruckState.Unloading.value
 
 
 class MiningTruck(SimulationNode):
-    """Class for simulating a mining truck"""
-
-    def __init__(self, truck_id: int):
-        """Constructor for truck_id"""
-        super().__init__(idx=truck_id, node_type="Truck")
-        self._state: TruckState = TruckState.AtMine  # Truck starts at the mine
-        """Current status of the truck."""
-        self._remaining_time_in_state: int = 6 * random.randint(2, 10)  # Assign the mining time for first iteration
+    """Class for simulating a mining truck
+
+    The state is stored as a TruckState value (`_state`), get_state() returns the TruckState.
+    """
+
+    __slots__ = ("_sampler", "_remaining_time_in_state", "unload_site_id", "unload_queued")
+
+    log_columns = {"state": "int8", "assigned_station": "int32"}
+    node_type = "Truck"
+
+    def __init__(
+        self,
+        truck_id: int,
+        log_store: LogStore | None = None,
+        metrics: TruckMetrics | None = None,
+        sampler: MiningDurationSampler | None = None,
+    ):
+        """Constructor for truck_id
+
+        Args:
+            truck_id (int): Truck ID
+            log_store (LogStore): Shared truck log store (row `truck_id` belongs to this truck)
+            metrics (TruckMetrics): Shared online truck metrics (row `truck_id` belongs to this truck)
+            sampler (MiningDurationSampler): Random stream for mining durations (shared by the simulator's trucks).
+                Defaults to an unseeded stream.
+        """
+        super().__init__(idx=truck_id, log_store=log_store, metrics=metrics)
+        self._sampler = sampler if sampler is not None else DEFAULT_SAMPLER
+        """Random stream for mining durations"""
+        self._state: int = _AT_MINE  # Truck starts at the mine
+        """Current status of the truck (TruckState value)"""
+        self._remaining_time_in_state: int = self._sampler.next()  # Assign the mining time for first iteration
         """Time remaining in current state, before transition to next state"""
         self.unload_site_id: int = -1  # -1 indicates no station assigned
         """Unloading State ID where mining truck is currently queued/docked"""
         self.unload_queued: bool = False
         """Flag to indicate whether the truck is in a queue at the Unloading station"""
 
+    def get_state(self) -> TruckState:
+        """Returns the current state of the truck"""
+        return TRUCK_STATES[self._state]
+
     @staticmethod
-    def _state_duration(state: TruckState):
-        """Total duration to complete the activity in current state"""
-        if state in [TruckState.OnRoad_ToMine, TruckState.OnRoad_ToUnload]:
+    def _state_duration(state: TruckState | int, sampler: MiningDurationSampler | None = None):
+        """Total duration to complete the activity in current state
+
+        Args:
+            state (TruckState | int): Truck state or its value
+            sampler (MiningDurationSampler): Random stream for mining durations. Defaults to an unseeded stream.
+        """
+        if isinstance(state, TruckState):
+            state = state.value
+        if state == _ON_ROAD_TO_MINE or state == _ON_ROAD_TO_UNLOAD:
             # Each trip on the road between mining site and unloading site
             # takes 30 minutes or 6 ticks
             return TRAVEL_TIME_UNLOAD_SITE_TO_MINE
-        elif state == TruckState.AtMine:
+        elif state == _AT_MINE:
             # Each mining activity can take any random time between 1 hour
             # and 5 hours. Randomizing this in 30-minute steps.
             # 6 ticks = 30 minutes
-            return 6 * random.randint(2, 10)
-        elif state == TruckState.Unloading:
+            return (sampler if sampler is not None else DEFAULT_SAMPLER).next()
+        elif state == _UNLOADING:
             # Return 1 tick for unload activity
             return TIME_TO_UNLOAD
         else:
@@ -48,14 +97,15 @@ class MiningTruck(SimulationNode):
     def _next_state(self):
         """Function to evaluate the next state of mining truck"""
         # NOTE: Keeping this verbose to make it more readable
-        if self.get_state() == TruckState.OnRoad_ToMine:
-            self._state = TruckState.AtMine
-        elif self.get_state() == TruckState.AtMine:
-            self._state = TruckState.OnRoad_ToUnload
-        elif self.get_state() == TruckState.OnRoad_ToUnload:
-            self._state = TruckState.Unloading
+        state = self._state
+        if state == _ON_ROAD_TO_MINE:
+            self._state = _AT_MINE
+        elif state == _AT_MINE:
+            self._state = _ON_ROAD_TO_UNLOAD
+        elif state == _ON_ROAD_TO_UNLOAD:
+            self._state = _UNLOADING
         else:
-            self._state = TruckState.OnRoad_ToMine
+            self._state = _ON_ROAD_TO_MINE
             self.unload_site_id = -1  # Indicate not a valid site ID
             self.unload_queued = False
 
@@ -65,21 +115,72 @@ class MiningTruck(SimulationNode):
         Args:
             unload_site_id (int): Unloading Site ID where the truck is routed to
         """
-        logger.debug(f"{self} - Unload Site ID: {unload_site_id} - Queued: True")
         self.unload_site_id = unload_site_id
         self.unload_queued = True
 
     def log_data(self):
         """Log data for the truck class"""
-        _state: TruckState = self.get_state()
-        _data = {
-            "tick": self.current_tick,
-            "id": self.idx,
-            "state": _state.name,
-            "assigned_station": self.unload_site_id,
+        store, row = self._log_store, self._log_row
+        if store is not None:
+            position = store.reserve(row, self.current_tick)
+            store.columns["state"][row, position] = self._state
+            store.columns["assigned_station"][row, position] = self.unload_site_id
+        if self._metrics is not None:
+            self._metrics.record(row, self.current_tick, self._state)
+
+    def get_log_columns(self) -> dict:
+        """Logged truck data as columns: tick, id, state (categorical of state names), assigned_station"""
+        import pandas as pd
+
+        store, row = self._log_store, self._log_row
+        if store is None:
+            raise ValueError(f"{self}: No log data recorded, only online metrics are available")
+        state_codes = store.get_column("state", row)
+        return {
+            "tick": store.get_ticks(row),
+            "id": np.full(len(state_codes), self.idx),
+            "state": pd.Categorical.from_codes(state_codes, categories=TRUCK_STATE_NAMES),
+            "assigned_station": store.get_column("assigned_station", row),
         }
 
-        self._data_log_list.append(_data)
+    @property
+    def _data_log_list(self) -> list[dict]:
+        """Logged truck data as a list of dicts (one per tick)"""
+        store, row = self._log_store, self._log_row
+        if store is None:
+            return []
+        return [
+            {"tick": tick, "id": self.idx, "state": TRUCK_STATE_NAMES[state], "assigned_station": station}
+            for tick, state, station in zip(
+                store.get_ticks(row).tolist(),
+                store.get_column("state", row).tolist(),
+                store.get_column("assigned_station", row).tolist(),
+            )
+        ]
+
+    def advance(self, n_ticks: int):
+        """Move the truck forward by n_ticks in which no state transition takes place.
+
+        Used by the event engine to catch up a truck that has been idle in its current
+        state. Equivalent to calling tick() n_ticks times as long as the truck does not
+        complete its current activity in that window.
+
+        Args:
+            n_ticks (int): Number of ticks to move forward
+        """
+        if n_ticks <= 0:
+            return
+
+        store, row = self._log_store, self._log_row
+        if store is not None:
+            position = store.reserve(row, self.current_tick, n_ticks)
+            store.columns["state"][row, position : position + n_ticks] = self._state
+            store.columns["assigned_station"][row, position : position + n_ticks] = self.unload_site_id
+        if self._metrics is not None:
+            self._metrics.record(row, self.current_tick, self._state, n_ticks)
+        self.current_tick += n_ticks
+
+        self._remaining_time_in_state = max(0, self._remaining_time_in_state - n_ticks)
 
     def tick(self, unloading_complete: bool = False):
         """Function for performing required operations during one clock tick
@@ -97,19 +198,26 @@ class MiningTruck(SimulationNode):
             # Spend one tick in current state
             self._remaining_time_in_state -= 1
 
-        _current_state = self.get_state()
+        _current_state = self._state
 
         # Handle case where we are actively queued at an unload site
-        if _current_state == TruckState.Unloading and not unloading_complete:
+        if _current_state == _UNLOADING and not unloading_complete:
             return True
 
         if self._remaining_time_in_state == 0:
             # Move to next state
+            unload_site_id = self.unload_site_id
             self._next_state()
-            logger.debug(
-                f"{str(self)}: At T={self.current_tick}: transitioned from {_current_state.name} to {self.get_state()}"
-            )
+            if self._tracer is not None:
+                self._tracer.emit(
+                    self.current_tick,
+                    TraceEvent.StateTransition,
+                    self.idx,
+                    unload_site_id,
+                    _current_state,
+                    self._state,
+                )
             # Reset remaining time in state to completion time for new state
-            self._remaining_time_in_state = self._state_duration(self.get_state())
+            self._remaining_time_in_state = self._state_duration(self._state, self._sampler)
 
         return True
@@ -1,62 +1,178 @@
-from queue import SimpleQueue
+from collections import deque
 import logging
 import threading
 
+import numpy as np
+
 from mining_sim.nodes.base import SimulationNode
 from mining_sim.enums.sim_enums import UnloadStationState as StationState
-
+from mining_sim.utility.log_store import LogStore
+from mining_sim.utility.metrics import StationMetrics
+from mining_sim.utility.tracing import TraceEvent
 
 logger = logging.getLogger(__name__)
 
+STATION_STATES = tuple(StationState)  # Indexed by state value
+STATION_MEMORY_BUDGET = 256  # Bytes per idle UnloadingStation object, excluding its rows in the shared log store
+
+_NO_TRUCKS = ()
+"""Shared empty queue of stations that never had a truck queued (a deque is allocated on the first put)"""
+
 
-class UnloadQueue(SimpleQueue):
-    """Unload queue class"""
+class UnloadQueue:
+    """Unload queue class (FIFO of truck IDs)
+
+    Backed by a `collections.deque` without locking, for the single-threaded simulator.
+    Use `LockedUnloadQueue` when the queue is shared between threads.
+    """
+
+    __slots__ = ("_trucks", "station_id")
 
     def __init__(self, station_id: int):
         """Constructor for UnloadQueue class"""
-        super().__init__()
-        self._lock = threading.Lock()
+        self._trucks: deque[int] | tuple = _NO_TRUCKS
+        """Queued truck IDs, left-most truck is unloaded first"""
         self.station_id: int = station_id
 
     def __str__(self):
         return f"Q-Station-ID-{self.station_id}"
 
+    def __len__(self):
+        return len(self._trucks)
+
+    def __iter__(self):
+        """Iterate over the queued trucks in unload order"""
+        return iter(self._trucks)
+
     def put_truck(self, item):
         """Put an item into the queue"""
-        with self._lock:
-            self.put(item)
+        if self._trucks is _NO_TRUCKS:
+            self._trucks = deque()
+        self._trucks.append(item)
+
+    def put_trucks(self, items):
+        """Put several items into the queue (in order)"""
+        if self._trucks is _NO_TRUCKS:
+            self._trucks = deque()
+        self._trucks.extend(items)
 
     def queue_size(self):
         """Get the current queue size"""
-        with self._lock:
-            return self.qsize()
+        return len(self._trucks)
+
+    def empty(self) -> bool:
+        """True if no trucks are queued"""
+        return not self._trucks
+
+    def peek(self):
+        """Get the next item without removing it from the queue"""
+        return self._trucks[0] if self._trucks else None
 
     def get_truck(self):
         """Get an item from the queue"""
+        return self._trucks.popleft() if self._trucks else None
+
+
+class LockedUnloadQueue(UnloadQueue):
+    """Unload queue guarded by a lock, for drivers that access stations from several threads"""
+
+    __slots__ = ("_lock",)
+
+    def __init__(self, station_id: int):
+        """Constructor for LockedUnloadQueue class"""
+        super().__init__(station_id)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be pickled, a new lock is created on restore
+        return {"_trucks": self._trucks, "station_id": self.station_id}
+
+    def __setstate__(self, state):
+        self._trucks = state["_trucks"]
+        self.station_id = state["station_id"]
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        """Iterate over a snapshot of the queued trucks in unload order"""
         with self._lock:
-            if self.empty():
-                return None
-            return self.get()
+            return iter(list(self._trucks))
+
+    def put_truck(self, item):
+        with self._lock:
+            super().put_truck(item)
+
+    def put_trucks(self, items):
+        with self._lock:
+            super().put_trucks(items)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._trucks)
+
+    def queue_size(self):
+        with self._lock:
+            return len(self._trucks)
+
+    def empty(self) -> bool:
+        with self._lock:
+            return not self._trucks
+
+    def peek(self):
+        with self._lock:
+            return super().peek()
+
+    def get_truck(self):
+        with self._lock:
+            return super().get_truck()
+
+
+UNLOAD_QUEUE_BACKENDS = {"deque": UnloadQueue, "locked": LockedUnloadQueue}
+"""Supported unload queue backends"""
 
 
 class UnloadingStation(SimulationNode):
-    """Class for simulating an unloading station"""
+    """Class for simulating an unloading station
 
-    def __init__(self, station_id: int):
+    The state is stored as an UnloadStationState value (`_state`), get_state() returns the UnloadStationState.
+    """
+
+    __slots__ = ("unloading_truck_id", "unload_queue")
+
+    log_columns = {"truck_unloading": "int32", "wait_time": "int32"}
+    node_type = "UnloadStation"
+
+    def __init__(
+        self,
+        station_id: int,
+        log_store: LogStore | None = None,
+        metrics: StationMetrics | None = None,
+        queue_backend: str = "deque",
+    ):
         """Constructor for unloading station class
 
         Args:
             station_id (int): Station ID of the specified unloading station
+            log_store (LogStore): Shared station log store (row `station_id` belongs to this station)
+            metrics (StationMetrics): Shared online station metrics (row `station_id` belongs to this station)
+            queue_backend (str): Unload queue backend - "deque" (unlocked, default)
+                or "locked" (thread safe, for concurrent drivers)
         """
-        logger.debug("Initializng unloading site")
-        super().__init__(idx=station_id, node_type="UnloadStation")
-        self._state = StationState.Unoccupied
-        """State of the unloading station"""
+        if queue_backend not in UNLOAD_QUEUE_BACKENDS:
+            raise ValueError(
+                f"Unknown unload queue backend: {queue_backend}. Expected one of {tuple(UNLOAD_QUEUE_BACKENDS)}"
+            )
+        super().__init__(idx=station_id, log_store=log_store, metrics=metrics)
+        self._state = StationState.Unoccupied.value
+        """State of the unloading station (UnloadStationState value)"""
         self.unloading_truck_id: int = None
         """Truck ID that is currently unloading at the station"""
-        self.unload_queue = UnloadQueue(station_id)
+        self.unload_queue: UnloadQueue = UNLOAD_QUEUE_BACKENDS[queue_backend](station_id)
         """Queue object to process incoming trucks"""
 
+    def get_state(self) -> StationState:
+        """Returns the current state of the station"""
+        return STATION_STATES[self._state]
+
     def _next_state(self):
         """Evaluate next state of the station"""
         # TODO: Implement in future versions
@@ -66,8 +182,6 @@ class UnloadingStation(SimulationNode):
         """Get the total wait time based on mining truck at any given time"""
         # Since each sim clock tick is 5 minutes, for every tick
         # one mining truck can complete the unloading operation
-
-        # Okay to use qsize here as threading.lock has been implemented
         return 1 * self.unload_queue.queue_size()
 
     def log_data(self, truck_dequeued: int):
@@ -76,14 +190,44 @@ class UnloadingStation(SimulationNode):
         Args:
             truck_dequeued (int) : Truck dequeued in the current tick
         """
-        _data = {
-            "tick": self.current_tick,
-            "id": self.idx,
-            "truck_unloading": truck_dequeued,
-            "wait_time": self.get_wait_time(),
+        store, row = self._log_store, self._log_row
+        wait_time = self.get_wait_time()
+        if store is not None:
+            position = store.reserve(row, self.current_tick)
+            store.columns["truck_unloading"][row, position] = -1 if truck_dequeued is None else truck_dequeued
+            store.columns["wait_time"][row, position] = wait_time
+        if self._metrics is not None:
+            self._metrics.record(row, wait_time)
+
+    def get_log_columns(self) -> dict:
+        """Logged station data as columns: tick, id, truck_unloading (nullable), wait_time"""
+        import pandas as pd
+
+        store, row = self._log_store, self._log_row
+        if store is None:
+            raise ValueError(f"{self}: No log data recorded, only online metrics are available")
+        truck_unloading = store.get_column("truck_unloading", row)
+        return {
+            "tick": store.get_ticks(row),
+            "id": np.full(len(truck_unloading), self.idx),
+            "truck_unloading": pd.arrays.IntegerArray(truck_unloading, truck_unloading < 0),
+            "wait_time": store.get_column("wait_time", row),
         }
 
-        self._data_log_list.append(_data)
+    @property
+    def _data_log_list(self) -> list[dict]:
+        """Logged station data as a list of dicts (one per tick)"""
+        store, row = self._log_store, self._log_row
+        if store is None:
+            return []
+        return [
+            {"tick": tick, "id": self.idx, "truck_unloading": None if truck < 0 else truck, "wait_time": wait_time}
+            for tick, truck, wait_time in zip(
+                store.get_ticks(row).tolist(),
+                store.get_column("truck_unloading", row).tolist(),
+                store.get_column("wait_time", row).tolist(),
+            )
+        ]
 
     # Instead of passing the entire truck object into the queue,
     # simply pass the truck_id into the queue
@@ -101,19 +245,43 @@ class UnloadingStation(SimulationNode):
         # Increment time step
         self.current_tick += 1
 
+        tracer = self._tracer
+
         # Insert new truck into the   queue
         if trucks:
-            for truck in trucks:
-                self.unload_queue.put_truck(truck)
-            logger.debug(f"{self}: At T={self.current_tick}:, Number of trucks inserted: {len(trucks)}")
+            self.unload_queue.put_trucks(trucks)
+            if tracer is not None:
+                queue_size = self.unload_queue.queue_size()
+                for position, truck in enumerate(trucks, start=queue_size - len(trucks) + 1):
+                    tracer.emit(self.current_tick, TraceEvent.Enqueue, truck, self.idx, position)
 
         # Pop theleft-most truck from queue
         # This represents a truck completing unload operation, representing one tick
         _truck_dequeued = self.unload_queue.get_truck()
-        if _truck_dequeued:
-            logger.debug(f"{self}: At T={self.current_tick}: Truck ID finished unloading: {_truck_dequeued}")
+        if tracer is not None and _truck_dequeued is not None:
+            tracer.emit(
+                self.current_tick, TraceEvent.Dequeue, _truck_dequeued, self.idx, self.unload_queue.queue_size()
+            )
 
         # Log data each tick
         self.log_data(_truck_dequeued)
 
         return _truck_dequeued
+
+    def advance(self, n_ticks: int):
+        """Move an idle station (empty unload queue) forward by n_ticks
+
+        Args:
+            n_ticks (int): Number of ticks to move forward
+        """
+        if n_ticks <= 0:
+            return
+
+        store, row = self._log_store, self._log_row
+        if store is not None:
+            position = store.reserve(row, self.current_tick + 1, n_ticks)
+            store.columns["truck_unloading"][row, position : position + n_ticks] = -1
+            store.columns["wait_time"][row, position : position + n_ticks] = 0
+        if self._metrics is not None:
+            self._metrics.record(row, 0, n_ticks)
+        self.current_tick += n_ticks
@@ -0,0 +1,365 @@
+"""Search for the smallest station count (or largest fleet) that meets a service level agreement
+
+Queueing gets worse with fewer stations or more trucks, so the SLA is monotone in each of them and the
+answer is found by a parallel bisection (k-section) instead of a full grid: each round evaluates
+`max_workers` candidates and keeps the narrowest bracket between a candidate that misses the SLA and one that
+meets it. The search starts from the station count at which the stations would be fully utilized, and gallops
+(doubles) until the SLA is met.
+
+Candidates are evaluated with the summary metrics of online runs (MiningSimulator.summarize), averaged over
+replicates. Every candidate uses the same replicate seeds (common random numbers), so differences between
+candidates come from the station count and not from sampling noise, which keeps the search monotone. With a
+`screen_margin`, candidates that the queueing surrogate (see mining_sim.surrogate) predicts far from the SLA
+are decided without simulating them.
+
+Usage:
+    python -m mining_sim.optimize --trucks 500 --max-queued-pct 2 --max-wait 0.5 --replicates 3 --workers 4
+"""
+
+import argparse
+import logging
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mining_sim.nodes.truck import TIME_TO_UNLOAD, TRAVEL_TIME_UNLOAD_SITE_TO_MINE
+from mining_sim.surrogate import SCREEN_METRICS, predict, screen
+from mining_sim.sweep import make_sweep_configs, run_config
+from mining_sim.utility.rng import MAX_MINING_STEPS, MIN_MINING_STEPS, TICKS_PER_MINING_STEP
+
+logger = logging.getLogger(__name__)
+
+SLA_METRICS = ("Queued_pct", "average_wait_time", "max_wait_time")
+"""Summary metrics that can be part of an SLA (queueing metrics, which grow with the load on the stations)"""
+
+DEFAULT_SLA = {"Queued_pct": 2.0, "average_wait_time": 0.5}
+"""Default maximum truck Queued_pct and station average_wait_time"""
+
+MEAN_CYCLE_TICKS = (MIN_MINING_STEPS + MAX_MINING_STEPS) / 2 * TICKS_PER_MINING_STEP + (
+    2 * TRAVEL_TIME_UNLOAD_SITE_TO_MINE + TIME_TO_UNLOAD
+)
+"""Mean time of a truck cycle without queueing: mining, round trip and unload (ticks)"""
+
+SCREEN_MIN_HOURS = 72
+"""Shortest runs for which surrogate screening was validated against simulated SLA verdicts (hours)"""
+
+
+class CandidateEvaluator:
+    """Evaluates candidate (n_trucks, m_stations) configurations against an SLA, caching the results"""
+
+    def __init__(
+        self,
+        sla: dict[str, float],
+        stop_time_hr: int = 72,
+        engine: str = "vector",
+        n_replicates: int = 1,
+        base_seed: int = 0,
+        executor: ProcessPoolExecutor | None = None,
+        screen_margin: float | None = None,
+    ):
+        """Constructor for the candidate evaluator
+
+        Args:
+            sla (dict[str, float]): Maximum value of summary metrics, e.g. {"Queued_pct": 2.0}
+            stop_time_hr (int): Simulation stop time in hours
+            engine (str): Simulation engine
+            n_replicates (int): Replicates (common random numbers) averaged per candidate
+            base_seed (int): Base seed from which replicate seeds are derived
+            executor (ProcessPoolExecutor): Process pool for the runs (None to run them in this process)
+            screen_margin (float): Decide candidates with the surrogate when its prediction is beyond this
+                relative margin of the SLA (see surrogate.screen), None to simulate every candidate. The surrogate
+                predicts the steady state, while the warm-up of short runs adds queueing: screening is meant for
+                runs of several days.
+        """
+        if screen_margin is not None:
+            unknown = [x for x in sla if x not in SCREEN_METRICS]
+            if unknown:
+                raise ValueError(f"The surrogate cannot screen SLA metrics {unknown}, set screen_margin to None")
+            if stop_time_hr < SCREEN_MIN_HOURS:
+                logger.warning(
+                    f"Runs of {stop_time_hr} h are dominated by the warm-up, the surrogate may accept candidates "
+                    f"that miss the SLA (use at least {SCREEN_MIN_HOURS} h)"
+                )
+        self.sla = dict(sla)
+        """Maximum value of each summary metric"""
+        self.stop_time_hr = stop_time_hr
+        """Simulation stop time in hours"""
+        self.engine = engine
+        """Simulation engine"""
+        self.n_replicates = n_replicates
+        """Replicates averaged per candidate"""
+        self.base_seed = base_seed
+        """Base seed of the replicates"""
+        self.executor = executor
+        """Process pool for the runs"""
+        self.screen_margin = screen_margin
+        """Relative margin beyond which the surrogate decides a candidate (None to simulate every candidate)"""
+        self.results: dict[tuple[int, int], dict] = {}
+        """Mean summary metrics of each evaluated (n_trucks, m_stations), with meets_sla and screened"""
+        self.n_runs = 0
+        """Number of simulation runs"""
+        self.n_screened = 0
+        """Number of candidates decided by the surrogate"""
+
+    def evaluate(self, candidates: list[tuple[int, int]]) -> dict[tuple[int, int], bool]:
+        """Screen the candidates not evaluated yet with the surrogate, and run all replicates of the others in parallel
+
+        Args:
+            candidates (list[tuple[int, int]]): (n_trucks, m_stations) of each candidate
+
+        Returns:
+            dict[tuple[int, int], bool]: Whether each candidate meets the SLA
+        """
+        new = sorted(set(candidates) - set(self.results))
+        if self.screen_margin is not None:
+            undecided = []
+            for candidate in new:
+                meets_sla = screen(*candidate, self.sla, self.screen_margin)
+                if meets_sla is None:
+                    undecided.append(candidate)
+                    continue
+                predicted = predict(*candidate)
+                self.results[candidate] = {
+                    **{x: predicted[x] for x in self.sla},
+                    "meets_sla": meets_sla,
+                    "screened": True,
+                }
+                self.n_screened += 1
+                logger.info(f"n_trucks={candidate[0]}, m_stations={candidate[1]}: screened, meets SLA: {meets_sla}")
+            new = undecided
+        configs = []
+        for n_trucks, m_stations in new:
+            configs += make_sweep_configs(
+                [n_trucks],
+                [m_stations],
+                n_replicates=self.n_replicates,
+                base_seed=self.base_seed,
+                stop_time_hr=self.stop_time_hr,
+                engine=self.engine,
+            )
+        runs = list(self.executor.map(run_config, configs) if self.executor is not None else map(run_config, configs))
+        self.n_runs += len(runs)
+
+        for i, candidate in enumerate(new):
+            replicates = runs[i * self.n_replicates : (i + 1) * self.n_replicates]
+            means = {metric: float(np.mean([x[metric] for x in replicates])) for metric in self.sla}
+            meets_sla = all(means[metric] <= target for metric, target in self.sla.items())
+            self.results[candidate] = {**means, "meets_sla": meets_sla, "screened": False}
+            logger.info(f"n_trucks={candidate[0]}, m_stations={candidate[1]}: {means}, meets SLA: {meets_sla}")
+        return {x: self.results[x]["meets_sla"] for x in candidates}
+
+
+def search_min(check, lower: int, upper: int, guess: int, width: int = 1) -> int | None:
+    """Smallest integer in [lower, upper] for which a monotone check is True
+
+    Gallops up from the guess until the check is True, then narrows the bracket with `width` evenly spaced
+    checks per round (bisection for a width of 1). If noise makes the check non-monotone, the smallest True
+    value is kept as the upper end of the bracket.
+
+    Args:
+        check (Callable): Function of a list of values returning {value: bool}, evaluated together
+        lower (int): Smallest value (the check is assumed False below it)
+        upper (int): Largest value
+        guess (int): Starting point
+        width (int): Values checked per round
+
+    Returns:
+        int | None: Smallest value for which the check is True, None if it is False at upper
+    """
+    below, above = lower - 1, None  # Largest value known False, smallest value known True
+    start = min(max(guess, lower), upper)
+    while above is None:
+        points = sorted({min(start * 2**i, upper) for i in range(width)})
+        results = check(points)
+        true_points = [x for x in points if results[x]]
+        if true_points:
+            above = true_points[0]
+        elif points[-1] == upper:
+            return None
+        below = max([x for x in points if not results[x] and x < (above or upper + 1)], default=below)
+        start = points[-1] * 2
+
+    while above - below > 1:
+        points = sorted({int(round(x)) for x in np.linspace(below, above, width + 2)[1:-1]} - {below, above})
+        results = check(points)
+        above = min([x for x in points if results[x]], default=above)
+        below = max([x for x in points if not results[x] and x < above], default=below)
+    return above
+
+
+def _run_search(evaluate_search, sla: dict[str, float], max_workers: int, **evaluator_args) -> dict:
+    """Run a search with a candidate evaluator, returning its answer and evaluations"""
+    if not sla:
+        raise ValueError("The SLA must have at least one metric")
+    unknown = [x for x in sla if x not in SLA_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown SLA metrics: {unknown}. Expected some of {SLA_METRICS}")
+    start_time = time.perf_counter()
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        evaluator = CandidateEvaluator(sla, executor=executor, **evaluator_args)
+        answer = evaluate_search(evaluator)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    logger.info(
+        f"Search finished in {time.perf_counter() - start_time:.1f} s with {evaluator.n_runs} runs "
+        f"and {evaluator.n_screened} screened candidates"
+    )
+    evaluations = [{"n_trucks": n, "m_stations": m, **result} for (n, m), result in sorted(evaluator.results.items())]
+    return {
+        "answer": answer,
+        "runs": evaluator.n_runs,
+        "screened": evaluator.n_screened,
+        "evaluations": evaluations,
+    }
+
+
+def find_min_stations(
+    n_trucks: int,
+    sla: dict[str, float] = DEFAULT_SLA,
+    m_max: int | None = None,
+    stop_time_hr: int = 72,
+    engine: str = "vector",
+    n_replicates: int = 1,
+    base_seed: int = 0,
+    max_workers: int = 1,
+    screen_margin: float | None = None,
+) -> dict:
+    """Smallest number of stations for which a fleet meets the SLA
+
+    Args:
+        n_trucks (int): Number of trucks
+        sla (dict[str, float]): Maximum mean value of summary metrics (see MiningSimulator.summarize)
+        m_max (int): Largest station count considered (defaults to one station per truck)
+        stop_time_hr (int): Simulation stop time in hours
+        engine (str): Simulation engine
+        n_replicates (int): Replicates (common random numbers) averaged per candidate
+        base_seed (int): Base seed from which replicate seeds are derived
+        max_workers (int): Worker processes, also the number of candidates evaluated per round
+        screen_margin (float): Decide candidates far from the SLA with the surrogate (see CandidateEvaluator)
+
+    Returns:
+        dict: answer (m_stations, None if the SLA is not met with m_max stations), runs (number of simulation
+            runs), screened (candidates decided by the surrogate) and evaluations (mean metrics of each candidate)
+    """
+    m_max = m_max or n_trucks
+    # Below one station per cycle's worth of unloads, the stations are saturated and queues grow without bound
+    guess = max(1, math.ceil(n_trucks * TIME_TO_UNLOAD / MEAN_CYCLE_TICKS))
+
+    def evaluate_search(evaluator: CandidateEvaluator) -> int | None:
+        def check(values: list[int]) -> dict[int, bool]:
+            results = evaluator.evaluate([(n_trucks, m) for m in values])
+            return {m: results[(n_trucks, m)] for m in values}
+
+        return search_min(check, 1, m_max, guess, width=max_workers)
+
+    return _run_search(
+        evaluate_search,
+        sla,
+        max_workers,
+        stop_time_hr=stop_time_hr,
+        engine=engine,
+        n_replicates=n_replicates,
+        base_seed=base_seed,
+        screen_margin=screen_margin,
+    )
+
+
+def find_max_trucks(
+    m_stations: int,
+    sla: dict[str, float] = DEFAULT_SLA,
+    n_max: int | None = None,
+    stop_time_hr: int = 72,
+    engine: str = "vector",
+    n_replicates: int = 1,
+    base_seed: int = 0,
+    max_workers: int = 1,
+    screen_margin: float | None = None,
+) -> dict:
+    """Largest fleet that a number of stations can serve within the SLA
+
+    Args:
+        m_stations (int): Number of unloading stations
+        sla (dict[str, float]): Maximum mean value of summary metrics (see MiningSimulator.summarize)
+        n_max (int): Largest fleet considered (defaults to 4x the fleet that saturates the stations)
+        stop_time_hr (int): Simulation stop time in hours
+        engine (str): Simulation engine
+        n_replicates (int): Replicates (common random numbers) averaged per candidate
+        base_seed (int): Base seed from which replicate seeds are derived
+        max_workers (int): Worker processes, also the number of candidates evaluated per round
+        screen_margin (float): Decide candidates far from the SLA with the surrogate (see CandidateEvaluator)
+
+    Returns:
+        dict: answer (n_trucks, None if even 1 truck misses the SLA, n_max if n_max meets it), runs (number
+            of simulation runs), screened (candidates decided by the surrogate) and evaluations (mean metrics of
+            each candidate)
+    """
+    saturation = max(1, int(m_stations * MEAN_CYCLE_TICKS / TIME_TO_UNLOAD))
+    n_max = n_max or 4 * saturation
+
+    def evaluate_search(evaluator: CandidateEvaluator) -> int | None:
+        # Smallest fleet that misses the SLA, the answer is one truck less
+        def check(values: list[int]) -> dict[int, bool]:
+            results = evaluator.evaluate([(n, m_stations) for n in values])
+            return {n: not results[(n, m_stations)] for n in values}
+
+        smallest_miss = search_min(check, 1, n_max, saturation // 2, width=max_workers)
+        return n_max if smallest_miss is None else (smallest_miss - 1 or None)
+
+    return _run_search(
+        evaluate_search,
+        sla,
+        max_workers,
+        stop_time_hr=stop_time_hr,
+        engine=engine,
+        n_replicates=n_replicates,
+        base_seed=base_seed,
+        screen_margin=screen_margin,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the smallest station count (or largest fleet) meeting an SLA")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--trucks", type=int, help="Fleet size, search the smallest station count")
+    target.add_argument("--stations", type=int, help="Station count, search the largest fleet")
+    parser.add_argument("--max-queued-pct", type=float, default=DEFAULT_SLA["Queued_pct"], help="SLA Queued_pct")
+    parser.add_argument("--max-wait", type=float, default=DEFAULT_SLA["average_wait_time"], help="SLA wait time")
+    parser.add_argument("--hours", type=int, default=72, help="Simulation stop time in hours")
+    parser.add_argument("--engine", default="vector", help="Simulation engine (tick, event or vector)")
+    parser.add_argument("--replicates", type=int, default=1, help="Replicates averaged per candidate")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for the replicate seeds")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (candidates per round)")
+    parser.add_argument(
+        "--screen-margin", type=float, help="Skip candidates the surrogate predicts beyond this margin of the SLA"
+    )
+    args = parser.parse_args()
+
+    sla = {"Queued_pct": args.max_queued_pct, "average_wait_time": args.max_wait}
+    options = {
+        "sla": sla,
+        "stop_time_hr": args.hours,
+        "engine": args.engine,
+        "n_replicates": args.replicates,
+        "base_seed": args.seed,
+        "max_workers": args.workers,
+        "screen_margin": args.screen_margin,
+    }
+    if args.trucks is not None:
+        results = find_min_stations(args.trucks, **options)
+        answer = f"Smallest station count for {args.trucks} trucks: {results['answer']}"
+    else:
+        results = find_max_trucks(args.stations, **options)
+        answer = f"Largest fleet for {args.stations} stations: {results['answer']}"
+    for evaluation in results["evaluations"]:
+        metrics = ", ".join(f"{x}={evaluation[x]:.3f}" for x in sla)
+        source = " (surrogate)" if evaluation["screened"] else ""
+        print(f"  n_trucks={evaluation['n_trucks']}, m_stations={evaluation['m_stations']}: {metrics}{source}")
+    print(f"{answer} ({results['runs']} runs, {results['screened']} screened)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Paced real-time runs of a MiningSimulator with live updates to asyncio subscribers
+
+The runner advances the simulation tick by tick at a speed-up over wall clock (or as fast as possible)
+and publishes one update per tick to every subscriber: the truck state transitions of the tick and the
+queue lengths of the stations that changed. Each subscriber has a bounded queue of pending updates, so a
+slow subscriber never stalls the simulation: once its queue is full, new updates are merged into the last
+pending one ("coalesce") or replace all pending updates, keeping only their queue lengths ("latest").
+Test harnesses that need every update can subscribe with "block", which pauses the simulation until they
+catch up.
+
+Usage:
+    runner = RealTimeRunner(sim, speedup=60)
+    subscription = runner.subscribe()
+
+    async def display():
+        async for update in subscription:
+            print(update["tick"], update["queue_lengths"])
+
+    async def main():
+        await asyncio.gather(runner.run(), display())
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+import numpy as np
+
+from mining_sim.utility.tracing import TraceEvent
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_POLICIES = ("coalesce", "latest", "block")
+"""Behavior of a subscription when its queue of pending updates is full"""
+
+TICK_SECONDS = 5 * 60
+"""Simulated time of one tick (seconds)"""
+
+
+def merge_updates(older: dict, newer: dict) -> dict:
+    """Merge two consecutive tick updates into one
+
+    Args:
+        older (dict): Update of the earlier tick(s)
+        newer (dict): Update of the following tick(s)
+
+    Returns:
+        dict: Update covering the ticks of both, with all transitions and the latest queue lengths
+    """
+    return {
+        "tick": newer["tick"],
+        "first_tick": older["first_tick"],
+        "transitions": older["transitions"] + newer["transitions"],
+        "queue_lengths": {**older["queue_lengths"], **newer["queue_lengths"]},
+    }
+
+
+class Subscription:
+    """Bounded queue of updates for one subscriber, consumed with `async for` or `await get()`"""
+
+    def __init__(self, max_pending: int = 16, policy: str = "coalesce"):
+        """Constructor for a subscription
+
+        Args:
+            max_pending (int): Maximum number of pending updates
+            policy (str): What to do when the pending updates are full, see SUBSCRIBER_POLICIES
+        """
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be at least 1, got {max_pending}")
+        if policy not in SUBSCRIBER_POLICIES:
+            raise ValueError(f"Unknown subscriber policy: {policy}. Supported policies: {SUBSCRIBER_POLICIES}")
+        self.max_pending = max_pending
+        """Maximum number of pending updates"""
+        self.policy = policy
+        """Behavior when the pending updates are full"""
+        self.coalesced = 0
+        """Number of updates merged into or replaced by a later update"""
+        self.closed = False
+        """Set when the run is over or the subscriber unsubscribed"""
+        self._pending: deque[dict] = deque()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+
+    def full(self) -> bool:
+        """Whether the subscription has max_pending updates waiting"""
+        return len(self._pending) >= self.max_pending
+
+    def publish(self, update: dict):
+        """Queue an update without waiting (called by the runner)"""
+        if self.closed:
+            return
+        if self.full():
+            if self.policy == "latest":
+                # Keep the queue lengths of the dropped updates, discard their transitions
+                queue_lengths = {}
+                for pending in self._pending:
+                    queue_lengths.update(pending["queue_lengths"])
+                queue_lengths.update(update["queue_lengths"])
+                update = {**update, "first_tick": self._pending[0]["first_tick"], "queue_lengths": queue_lengths}
+                self.coalesced += len(self._pending)
+                self._pending.clear()
+            else:
+                self.coalesced += 1
+                update = merge_updates(self._pending.pop(), update)
+        self._pending.append(update)
+        self._readable.set()
+
+    async def wait_writable(self):
+        """Wait until there is room for an update (or the subscription is closed)"""
+        while self.full() and not self.closed:
+            self._writable.clear()
+            await self._writable.wait()
+
+    async def get(self) -> dict | None:
+        """Next update, or None once the run is over and all updates were read"""
+        while not self._pending:
+            if self.closed:
+                return None
+            self._readable.clear()
+            await self._readable.wait()
+        update = self._pending.popleft()
+        self._writable.set()
+        return update
+
+    def close(self):
+        """Stop receiving updates. Updates already queued can still be read."""
+        self.closed = True
+        self._readable.set()
+        self._writable.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        update = await self.get()
+        if update is None:
+            raise StopAsyncIteration
+        return update
+
+
+class RealTimeRunner:
+    """Run a simulation paced against wall clock, publishing per tick updates to asyncio subscribers
+
+    Each update is a dict with:
+        tick (int): Last tick covered by the update (sim.current_tick after it was simulated, also the tick of its
+            transitions). The first update of a run has the tick the run starts from and no transitions.
+        first_tick (int): First tick covered by the update (same as tick unless updates were coalesced)
+        transitions (list[tuple]): (tick, truck ID, previous state code, new state code) of every truck
+            state transition, in the order they happened
+        queue_lengths (dict[int, int]): Number of trucks queued at each station whose queue length changed
+
+    Transitions are collected with a Tracer attached to the simulation for the duration of the run. Updates are
+    shared by all subscribers and must not be modified.
+    """
+
+    def __init__(self, sim, speedup: float | None = None):
+        """Constructor for the real-time runner
+
+        Args:
+            sim (MiningSimulator): Simulation to run (any engine), from its current tick
+            speedup (float): Simulated time per wall clock time, e.g. 60 runs one simulated hour per minute.
+                None runs as fast as possible, yielding to the event loop after every tick.
+        """
+        if speedup is not None and speedup <= 0:
+            raise ValueError(f"speedup must be positive, got {speedup}")
+        self.sim = sim
+        """Simulation being run"""
+        self.speedup = speedup
+        """Simulated time per wall clock time (None for as fast as possible)"""
+        self.subscriptions: list[Subscription] = []
+        """Active subscriptions"""
+        self.late_ticks = 0
+        """Number of ticks that finished after their scheduled wall clock time"""
+        self._queue_lengths = None
+
+    def subscribe(self, max_pending: int = 16, policy: str = "coalesce") -> Subscription:
+        """Subscribe to the tick updates
+
+        The first update of a subscription has the queue lengths of all stations.
+
+        Args:
+            max_pending (int): Maximum number of pending updates
+            policy (str): When the pending updates are full, "coalesce" merges the new update into the last pending
+                one, "latest" replaces the pending updates by the new one (keeping their queue lengths but not their
+                transitions), "block" pauses the simulation until the subscriber catches up
+
+        Returns:
+            Subscription: Async iterator over the updates, ending when the run is over
+        """
+        subscription = Subscription(max_pending=max_pending, policy=policy)
+        if self._queue_lengths is not None:
+            tick = self.sim.current_tick
+            subscription.publish(
+                {
+                    "tick": tick,
+                    "first_tick": tick,
+                    "transitions": [],
+                    "queue_lengths": dict(enumerate(self._queue_lengths.tolist())),
+                }
+            )
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Stop publishing updates to a subscription"""
+        subscription.close()
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    def _get_queue_lengths(self) -> np.ndarray:
+        engine = self.sim._engine
+        if hasattr(engine, "get_wait_times"):
+            return engine.get_wait_times()
+        return np.fromiter((x.get_wait_time() for x in self.sim.unloading_stations), dtype=np.int64)
+
+    def _tick_update(self, tick: int, queue_lengths: np.ndarray, changed: np.ndarray) -> dict:
+        events = self.sim.tracer.drain()
+        events = events[events["event"] == TraceEvent.StateTransition]
+        transitions = list(zip(*(events[x].tolist() for x in ("tick", "truck", "arg0", "arg1"))))
+        return {
+            "tick": tick,
+            "first_tick": tick,
+            "transitions": transitions,
+            "queue_lengths": dict(zip(changed.tolist(), queue_lengths[changed].tolist())),
+        }
+
+    async def run(self, until_tick: int | None = None):
+        """Run the simulation until its stop time (or until_tick), publishing an update after every tick
+
+        Args:
+            until_tick (int): Last tick to run. Defaults to the stop time of the simulation.
+        """
+        sim = self.sim
+        if sim.tracer is not None:
+            raise ValueError("Simulation already has a tracer, disable tracing before a real-time run")
+        if until_tick is None:
+            until_tick = min(sim.stop_time, sim.max_time)
+
+        # Up to one transition, enqueue and assignment per truck and one dequeue per station per tick
+        sim.enable_tracing(capacity=3 * sim.num_trucks + sim.num_stations + 1)
+        self._queue_lengths = self._get_queue_lengths()
+        initial = dict(enumerate(self._queue_lengths.tolist()))
+        for subscription in self.subscriptions:
+            tick = sim.current_tick
+            subscription.publish({"tick": tick, "first_tick": tick, "transitions": [], "queue_lengths": initial})
+
+        tick_wall_seconds = None if self.speedup is None else TICK_SECONDS / self.speedup
+        start_tick, start_time = sim.current_tick, time.monotonic()
+        try:
+            while sim.current_tick <= until_tick:
+                sim.tick()
+                # Events of sim.tick() are traced at the tick it moved to
+                tick = sim.current_tick
+
+                queue_lengths = self._get_queue_lengths()
+                changed = np.flatnonzero(queue_lengths != self._queue_lengths)
+                self._queue_lengths = queue_lengths
+                update = self._tick_update(tick, queue_lengths, changed)
+                for subscription in self.subscriptions:
+                    if subscription.policy == "block":
+                        await subscription.wait_writable()
+                    subscription.publish(update)
+
+                if tick_wall_seconds is None:
+                    await asyncio.sleep(0)
+                    continue
+                # Pace against the start of the run, so that late ticks do not accumulate drift
+                delay = start_time + (sim.current_tick - start_tick) * tick_wall_seconds - time.monotonic()
+                if delay < 0:
+                    self.late_ticks += 1
+                await asyncio.sleep(max(delay, 0))
+        finally:
+            sim.disable_tracing()
+            self._queue_lengths = None
+            for subscription in self.subscriptions:
+                subscription.close()
+            self.subscriptions = []
+        sim.sync_nodes()
+        logger.info(f"Real-time run finished at T={sim.current_tick}, {self.late_ticks} late ticks")
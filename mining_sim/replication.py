@@ -0,0 +1,255 @@
+"""Replicated Monte Carlo runs of one MiningSimulator configuration with adaptive early stopping
+
+Independent replicates (seeds derived with replicate_seeds) are run until the confidence interval of every
+target metric is precise enough, or until max_replicates. Running means and variances are updated with
+Welford's algorithm, and the half-width of each interval uses the Student t quantile for the number of
+replicates so far. Replicates are accepted in replicate order and the stopping rule is checked after each
+one, so the result does not depend on the number of worker processes.
+
+Usage:
+    python -m mining_sim.replication --trucks 500 --stations 20 --hours 72 --precision 0.01 --workers 8
+"""
+
+import argparse
+import logging
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mining_sim.sweep import make_sweep_configs, run_config
+from mining_sim.utility.intervals import t_quantile
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_METRICS = (
+    "Mining_pct",
+    "OnRoad_pct",
+    "Unloading_pct",
+    "Queued_pct",
+    "Efficiency_pct",
+    "Helium_Unloads",
+    "average_wait_time",
+    "max_wait_time",
+    "efficiency_pct",
+)
+"""Metrics of MiningSimulator.summarize() tracked across replicates"""
+
+DEFAULT_TARGETS = ("Efficiency_pct", "average_wait_time")
+"""Metrics whose precision decides when to stop by default (truck efficiency and station wait time)"""
+
+
+class RunningStats:
+    """Running mean and variance of metrics across replicates (Welford's algorithm)"""
+
+    def __init__(self, metrics=SUMMARY_METRICS):
+        """Constructor for the running stats
+
+        Args:
+            metrics (Iterable[str]): Metrics to track
+        """
+        self.metrics = tuple(metrics)
+        """Tracked metrics"""
+        self.n = 0
+        """Number of replicates recorded"""
+        self._mean = dict.fromkeys(self.metrics, 0.0)
+        self._m2 = dict.fromkeys(self.metrics, 0.0)
+
+    def update(self, result: dict):
+        """Record the metrics of one replicate"""
+        self.n += 1
+        for metric in self.metrics:
+            delta = result[metric] - self._mean[metric]
+            self._mean[metric] += delta / self.n
+            self._m2[metric] += delta * (result[metric] - self._mean[metric])
+
+    def mean(self, metric: str) -> float:
+        """Mean of a metric across replicates"""
+        return self._mean[metric]
+
+    def std(self, metric: str) -> float:
+        """Sample standard deviation of a metric across replicates (NaN for less than 2 replicates)"""
+        if self.n < 2:
+            return math.nan
+        return math.sqrt(self._m2[metric] / (self.n - 1))
+
+    def half_width(self, metric: str, confidence: float = 0.95) -> float:
+        """Half-width of the confidence interval of the mean of a metric (NaN for less than 2 replicates)"""
+        if self.n < 2:
+            return math.nan
+        return t_quantile(confidence, self.n - 1) * self.std(metric) / math.sqrt(self.n)
+
+    def to_results(self, confidence: float = 0.95) -> dict:
+        """Mean, standard deviation and confidence interval of each metric
+
+        Returns:
+            dict: {metric: {"mean", "std", "half_width", "ci_low", "ci_high"}}
+        """
+        results = {}
+        for metric in self.metrics:
+            mean, half_width = self.mean(metric), self.half_width(metric, confidence)
+            results[metric] = {
+                "mean": mean,
+                "std": self.std(metric),
+                "half_width": half_width,
+                "ci_low": mean - half_width,
+                "ci_high": mean + half_width,
+            }
+        return results
+
+
+def is_precise(
+    stats: RunningStats,
+    targets=DEFAULT_TARGETS,
+    rel_precision: float = 0.01,
+    abs_precision: dict[str, float] | None = None,
+    confidence: float = 0.95,
+) -> bool:
+    """Whether the confidence interval of every target metric is narrow enough
+
+    A metric is precise when its half-width is at most rel_precision x |mean|, or at most its absolute
+    precision (for metrics whose mean can be close to 0, e.g. the wait time of an idle station).
+
+    Args:
+        stats (RunningStats): Running stats of the replicates so far
+        targets (Iterable[str]): Metrics that must be precise
+        rel_precision (float): Maximum half-width relative to the mean
+        abs_precision (dict[str, float]): Maximum half-width of some metrics, in the units of the metric
+        confidence (float): Confidence level of the intervals
+
+    Returns:
+        bool: True if all target metrics are precise
+    """
+    abs_precision = abs_precision or {}
+    if stats.n < 2:
+        return False
+    for metric in targets:
+        half_width = stats.half_width(metric, confidence)
+        if half_width > rel_precision * abs(stats.mean(metric)) and half_width > abs_precision.get(metric, 0):
+            return False
+    return True
+
+
+def run_replications(
+    n_trucks: int,
+    m_stations: int,
+    stop_time_hr: int = 72,
+    engine: str = "vector",
+    targets=DEFAULT_TARGETS,
+    rel_precision: float = 0.01,
+    abs_precision: dict[str, float] | None = None,
+    confidence: float = 0.95,
+    min_replicates: int = 5,
+    max_replicates: int = 100,
+    base_seed: int = 0,
+    max_workers: int = 1,
+) -> dict:
+    """Run independent replicates of a configuration until the target metrics are precise enough
+
+    Replicates are run in batches of max_workers (in a process pool if max_workers > 1). Results are accepted
+    in replicate order and the stopping rule is checked after each one, so the replicates used (and the
+    results) are the same for any number of workers; the extra replicates of the last batch are discarded.
+
+    Args:
+        n_trucks (int): Number of trucks
+        m_stations (int): Number of unloading stations
+        stop_time_hr (int): Simulation stop time in hours
+        engine (str): Simulation engine
+        targets (Iterable[str]): Metrics of MiningSimulator.summarize() that must reach the precision
+        rel_precision (float): Maximum half-width of the confidence intervals relative to their mean
+        abs_precision (dict[str, float]): Maximum half-width of some metrics, in the units of the metric
+        confidence (float): Confidence level of the intervals
+        min_replicates (int): Replicates run before the stopping rule is checked (at least 3)
+        max_replicates (int): Replicates run at most if the precision is not reached
+        base_seed (int): Base seed from which replicate seeds are derived (see replicate_seeds)
+        max_workers (int): Number of worker processes
+
+    Returns:
+        dict: replicates (number used), converged (precision reached), metrics (see RunningStats.to_results)
+            and runs (summary of each replicate, see run_config)
+    """
+    targets = tuple(targets)
+    unknown = [x for x in targets if x not in SUMMARY_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown target metrics: {unknown}. Expected metrics of {SUMMARY_METRICS}")
+    if min_replicates < 3:
+        raise ValueError(f"min_replicates must be at least 3, got {min_replicates}")
+    if max_replicates < min_replicates:
+        raise ValueError(f"max_replicates ({max_replicates}) must be at least min_replicates ({min_replicates})")
+    if rel_precision < 0:
+        raise ValueError(f"rel_precision must not be negative, got {rel_precision}")
+    t_quantile(confidence, 1)  # Validate the confidence level before running anything
+
+    configs = make_sweep_configs(
+        [n_trucks],
+        [m_stations],
+        n_replicates=max_replicates,
+        base_seed=base_seed,
+        stop_time_hr=stop_time_hr,
+        engine=engine,
+    )
+    stats = RunningStats()
+    runs = []
+    converged = False
+    start_time = time.perf_counter()
+    executor = ProcessPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+    try:
+        while not converged and len(runs) < max_replicates:
+            batch_size = max(min_replicates - len(runs), max_workers)
+            batch = configs[len(runs) : len(runs) + batch_size]
+            results = executor.map(run_config, batch) if executor is not None else map(run_config, batch)
+            for result in results:
+                runs.append(result)
+                stats.update(result)
+                if len(runs) >= min_replicates and is_precise(stats, targets, rel_precision, abs_precision, confidence):
+                    converged = True
+                    break
+            logger.info(
+                f"{len(runs)} replicates, "
+                + ", ".join(f"{x}={stats.mean(x):.4g} +/- {stats.half_width(x, confidence):.3g}" for x in targets)
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if not converged:
+        logger.warning(f"Precision not reached after {max_replicates} replicates")
+    logger.info(f"Replications finished in {time.perf_counter() - start_time:.1f} s")
+    return {"replicates": len(runs), "converged": converged, "metrics": stats.to_results(confidence), "runs": runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run replicates of a MiningSimulator configuration until precise")
+    parser.add_argument("--trucks", type=int, required=True, help="Number of trucks")
+    parser.add_argument("--stations", type=int, required=True, help="Number of unloading stations")
+    parser.add_argument("--hours", type=int, default=72, help="Simulation stop time in hours")
+    parser.add_argument("--engine", default="vector", help="Simulation engine (tick, event or vector)")
+    parser.add_argument("--target", action="append", choices=SUMMARY_METRICS, help="Metric that must be precise")
+    parser.add_argument("--precision", type=float, default=0.01, help="Maximum CI half-width relative to the mean")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the intervals")
+    parser.add_argument("--min-replicates", type=int, default=5, help="Replicates before checking the precision")
+    parser.add_argument("--max-replicates", type=int, default=100, help="Maximum number of replicates")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for the replicate seeds")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    args = parser.parse_args()
+
+    results = run_replications(
+        args.trucks,
+        args.stations,
+        stop_time_hr=args.hours,
+        engine=args.engine,
+        targets=args.target or DEFAULT_TARGETS,
+        rel_precision=args.precision,
+        confidence=args.confidence,
+        min_replicates=args.min_replicates,
+        max_replicates=args.max_replicates,
+        base_seed=args.seed,
+        max_workers=args.workers,
+    )
+    status = "converged" if results["converged"] else "did not converge"
+    print(f"{results['replicates']} replicates, {status} ({args.confidence:.0%} confidence intervals)")
+    for metric, values in results["metrics"].items():
+        print(f"{metric:>18}: {values['mean']:10.4f} +/- {values['half_width']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,33 @@
 """Mining Simulator for helium miners on the moon"""
 
-import bisect
+import heapq
 import logging
+import os
 import sys
-import time
+from contextlib import nullcontext
 from datetime import datetime
-import random
 
+import numpy as np
+
+from mining_sim.checkpoint import snapshot, restore, save_checkpoint, fork_branches
+from mining_sim.engines.event import EventEngine
+from mining_sim.engines.vectorized import VectorEngine
 from mining_sim.nodes.truck import MiningTruck
-from mining_sim.nodes.unloadstation import UnloadingStation
+from mining_sim.nodes.unloadstation import UnloadingStation, UNLOAD_QUEUE_BACKENDS
 from mining_sim.enums.sim_enums import TruckState
-from mining_sim.utility.analysis import (
-    convert_log_to_df,
-    compute_truck_metrics,
-    compute_cumulative_truck_stats,
-    compute_station_metrics,
-)
+from mining_sim.utility.assignment import StationAssigner
+from mining_sim.utility.log_store import LogStore
+from mining_sim.utility.log_sink import LogSink, compute_log_file_metrics
+from mining_sim.utility.metrics import TruckMetrics, StationMetrics, compute_log_store_metrics
+from mining_sim.utility.profiling import PhaseProfiler
+from mining_sim.utility.result_cache import ResultCache, cache_key
+from mining_sim.utility.tracing import Tracer, TraceEvent
+from mining_sim.utility.rng import MiningDurationSampler
+from mining_sim.utility.steady_state import SteadyStateDetector
 
 logger = logging.getLogger(__name__)
 
-# Seed random here for reproducibility
-random.seed(42)
+_UNLOADING = TruckState.Unloading.value
 
 
 def find_station_info_by_id(station_infos, station_id) -> dict | None:
@@ -58,18 +65,37 @@ def get_truck_assignments(station_infos) -> list[dict]:
 
 dots = ["   ", ".  ", ".. ", "..."]
 
+SIM_ENGINES = ("tick", "event", "vector")
+"""Supported simulation engines"""
+
+SIM_METRICS = ("log", "online")
+"""Supported metrics modes"""
+
 
 def animate_output(ticks):
     """Animate the 'Running Simulation' terminal output"""
     sys.stdout.write(f"\rRunning Simulation{dots[ticks % len(dots)]} : T = {ticks*5/60} hours")
     sys.stdout.flush()
-    time.sleep(0.005)
 
 
 class MiningSimulator:
     """Class for creating a Mining Simulator"""
 
-    def __init__(self, n_trucks: int, m_stations: int, stop_time_hr: int = 72, max_time_hr: int = 120):
+    def __init__(
+        self,
+        n_trucks: int,
+        m_stations: int,
+        stop_time_hr: int = 72,
+        max_time_hr: int = 120,
+        engine: str = "tick",
+        metrics: str = "log",
+        seed: int | np.random.Generator | None = 42,
+        queue_backend: str = "deque",
+        log_sink: LogSink | None = None,
+        log_dir: str | None = None,
+        steady_state: SteadyStateDetector | None = None,
+        cache: ResultCache | None = None,
+    ):
         """Mining Simulation Constructor
 
         Args:
@@ -77,7 +103,39 @@ class MiningSimulator:
             m_stations (int): Number of unloading stations in the simulation
             stop_time (hours): Simulation stop time in hours
             max_time (hours): Maximum runtime of simulation.
+            engine (str): Simulation engine - "tick" (fixed time-step), "event" (next-event)
+                or "vector" (NumPy arrays for the whole fleet)
+            metrics (str): How metrics are collected - "log" (per tick logs, analyzed after the run)
+                or "online" (running counters updated every tick, no per tick logs are kept)
+            seed (int | np.random.Generator): Seed or generator for the simulation's random stream.
+                Simulations with the same seed give the same results with any engine. None for an unseeded stream.
+            queue_backend (str): Unload queue backend of the stations - "deque" (default)
+                or "locked" (thread safe, for drivers that access stations from several threads)
+            log_sink (LogSink): Write the logs to Parquet/Arrow files in chunks while the simulation runs, keeping
+                only the last chunk in memory (log metrics mode)
+            log_dir (str): Keep the logs in memory mapped files in this directory instead of in memory, for logs
+                larger than RAM (log metrics mode)
+            steady_state (SteadyStateDetector): Detect the end of the warm-up during run() and exclude it from the
+                metrics, optionally ending the run once the estimates are stable (online metrics mode)
+            cache (ResultCache): Restore the results of run() from this cache when the same run (arguments, seed
+                and code version) is cached, and store them otherwise. Runs with an unseeded or generator seed, a
+                log sink, a log directory, a steady-state detector, a tracer, a profiler or a checkpoint path are
+                not cached.
         """
+        if engine not in SIM_ENGINES:
+            raise ValueError(f"Unknown simulation engine: {engine}. Expected one of {SIM_ENGINES}")
+        if metrics not in SIM_METRICS:
+            raise ValueError(f"Unknown metrics mode: {metrics}. Expected one of {SIM_METRICS}")
+        if queue_backend not in UNLOAD_QUEUE_BACKENDS:
+            raise ValueError(
+                f"Unknown unload queue backend: {queue_backend}. Expected one of {tuple(UNLOAD_QUEUE_BACKENDS)}"
+            )
+        if log_sink is not None and metrics != "log":
+            raise ValueError("A log sink requires log metrics (metrics='log')")
+        if log_dir is not None and (metrics != "log" or log_sink is not None):
+            raise ValueError("A log directory requires log metrics (metrics='log') and no log sink")
+        if steady_state is not None and metrics != "online":
+            raise ValueError("Steady-state detection requires online metrics (metrics='online')")
         self.num_trucks = n_trucks
         """Number of trucks in the simulation"""
         self.num_stations = m_stations
@@ -92,13 +150,96 @@ class MiningSimulator:
         """List to hold unloading station in the simulation"""
         self.current_tick = 0
         """Tick counter of the simulation"""
+        self.engine = engine
+        """Simulation engine used to move the simulation forward"""
+        self.seed = int(seed) if isinstance(seed, (int, np.integer)) else None
+        """Integer seed of the simulation (None for a generator or an unseeded stream)"""
+        self.rng = np.random.default_rng(seed)
+        """Random generator owned by this simulation"""
+        self.duration_sampler = MiningDurationSampler(self.rng)
+        """Mining durations drawn from the simulation's random generator"""
+        self.station_assigner = StationAssigner(self.num_stations)
+        """Priority structure used to assign new trucks to stations on each tick"""
+        self.profiler: PhaseProfiler | None = None
+        """Per-phase timing of ticks and analysis (None when profiling is disabled)"""
+        self.tracer: Tracer | None = None
+        """Structured event tracing (None when tracing is disabled)"""
+
+        self.metrics = metrics
+        """Metrics mode of the simulation"""
+        self.truck_log: LogStore | None = None
+        """Columnar log store shared by all mining trucks (log metrics mode)"""
+        self.station_log: LogStore | None = None
+        """Columnar log store shared by all unloading stations (log metrics mode)"""
+        self.truck_metrics: TruckMetrics | None = None
+        """Running metrics for all mining trucks (online metrics mode)"""
+        self.station_metrics: StationMetrics | None = None
+        """Running metrics for all unloading stations (online metrics mode)"""
+        self.log_sink = log_sink
+        """Files the logs are flushed to during the run (None to keep the full logs in memory)"""
+        self.log_dir = log_dir
+        """Directory of the memory mapped logs (None for in-memory logs)"""
+        self.steady_state = steady_state
+        """Warm-up and stability detection during run() (None to report the whole run)"""
+        self.cache = cache
+        """Cache of run results (None to always simulate)"""
+        self.from_cache = False
+        """Whether the results were restored from the cache by run(), without simulating the ticks"""
+
+        if metrics == "online":
+            self.truck_metrics = TruckMetrics(self.num_trucks)
+            self.station_metrics = StationMetrics(self.num_stations)
+        else:
+            # Preallocate logs for the full run, or for one chunk with a log sink (nodes log once per tick)
+            log_capacity = min(self.stop_time, self.max_time) + 2
+            if log_sink is not None:
+                log_capacity = min(log_capacity, log_sink.chunk_ticks + 2)
+                log_sink.open(self.num_trucks, self.num_stations)
+            truck_log_path = station_log_path = None
+            if log_dir is not None:
+                truck_log_path, station_log_path = os.path.join(log_dir, "truck_log"), os.path.join(
+                    log_dir, "station_log"
+                )
+            self.truck_log = LogStore(
+                self.num_trucks, MiningTruck.log_columns, capacity=log_capacity, path=truck_log_path
+            )
+            self.station_log = LogStore(
+                self.num_stations, UnloadingStation.log_columns, capacity=log_capacity, path=station_log_path
+            )
+
+        self._engine: EventEngine | VectorEngine | None = None
+        """Engine used to move nodes forward (None for the tick engine)"""
+
+        # Trucks by activity (tick engine), updated when trucks change state
+        self._moving_trucks: list[int] = list(range(self.num_trucks))
+        """IDs of trucks mining or on the road, in ID order"""
+        self._arriving_trucks: list[int] = []
+        """IDs of trucks that arrived at the unloading site and are waiting for a station, in ID order"""
+        self._queued_trucks: set[int] = set()
+        """IDs of trucks queued or unloading at a station"""
+
+        if engine == "vector":
+            # Trucks and stations are views into the fleet arrays
+            self._engine = VectorEngine(self)
+            self.mining_trucks = self._engine.trucks
+            self.unloading_stations = self._engine.stations
+            return
 
         # Initialize Mining Trucks
         for idx in range(self.num_trucks):
-            self.mining_trucks.append(MiningTruck(idx))
+            self.mining_trucks.append(
+                MiningTruck(idx, log_store=self.truck_log, metrics=self.truck_metrics, sampler=self.duration_sampler)
+            )
 
         for idx in range(self.num_stations):
-            self.unloading_stations.append(UnloadingStation(idx))
+            self.unloading_stations.append(
+                UnloadingStation(
+                    idx, log_store=self.station_log, metrics=self.station_metrics, queue_backend=queue_backend
+                )
+            )
+
+        if engine == "event":
+            self._engine = EventEngine(self)
 
     def assign_stations_algo(self, new_trucks: list[int], __station_infos: list[dict] = []):
         """Algorithm to assign mining trucks to station queue
@@ -126,7 +267,7 @@ class MiningSimulator:
         else:
             station_infos = __station_infos
 
-        logger.debug(f"Station infos initialized with {len(station_infos)} elems, new trucks {len(new_trucks)}")
+        logger.debug("Station infos initialized with %d elems, new trucks %d", len(station_infos), len(new_trucks))
 
         # ------------------------------------------------------------------------------------------------------#
         # ASIGNMENT ALGORITHM INFO
@@ -135,34 +276,20 @@ class MiningSimulator:
         # until all new trucks are exhausted in round robin fashion
         # ------------------------------------------------------------------------------------------------------#
 
-        # Sort based on queue wait time in ascending order
+        # Sort based on queue wait time in ascending order. Stations with the same wait time
+        # keep their order, and each station's position in this order is its tiebreaker.
         station_infos.sort(key=lambda x: x["wait_time"] + len(x["q_trucks"]))
-
-        # Assign trucks to queue with lowest queue times in round robin fashion
-        while new_trucks:
-            # Get the lowest wait_time stations
-            logger.debug(f"New Trucks:{new_trucks}")
-            min_wait_time = station_infos[0]["wait_time"] + len(station_infos[0]["q_trucks"])
-            logger.debug(f"Min Wait Time: {min_wait_time}")
-            stations_with_min_wait = []
-
-            while (
-                station_infos and (station_infos[0]["wait_time"] + len(station_infos[0]["q_trucks"])) == min_wait_time
-            ):
-                stations_with_min_wait.append(station_infos.pop(0))
-
-            logger.debug(f"Stations with min wait time: {len(stations_with_min_wait)}")
-            # Assign multiple trucks to these stations
-            for station in stations_with_min_wait:
-                # Assign one truck at a time (or more if there are still trucks)
-                if new_trucks:
-                    station["q_trucks"].append(new_trucks.pop(0))
-                else:
-                    break
-
-            # Re-insert stations with updated wait_time back into sorted list
-            for station in stations_with_min_wait:
-                bisect.insort(station_infos, station, key=lambda x: x["wait_time"] + len(x["q_trucks"]))
+        station_heap = [(x["wait_time"] + len(x["q_trucks"]), seq, x) for seq, x in enumerate(station_infos)]
+
+        # Assign trucks to queue with lowest queue times in round robin fashion. A station that
+        # receives a truck goes behind all stations with the same updated wait time.
+        sequence = len(station_heap)
+        for truck in new_trucks:
+            wait_time, _, station = heapq.heappop(station_heap)
+            station["q_trucks"].append(truck)
+            heapq.heappush(station_heap, (wait_time + 1, sequence, station))
+            sequence += 1
+        new_trucks.clear()
 
         station_infos.sort(key=lambda x: x["station_id"])
         if len(station_infos) != self.num_stations:
@@ -176,110 +303,423 @@ class MiningSimulator:
         # --------------------- SIMULATION TICK INFO -----------------------------------------------#
         # To move the simulation forward by one tick, the following needs to happen:
         # 1. Increment simulation tick counter (current_tick)
-        # 2. Find trucks with = UnloadStation state AND not queued
+        # 2. Take trucks with = UnloadStation state AND not queued (arrived on the previous tick)
         # 3. Pass these trucks to the assignment algo and get station assignments
         # 4. Move all other trucks (not in Unloading state) forward by one tick
         # 5. Move all unloading stations by one tick (passing in new truck assignments)
         # 6. Tick remaining trucks with Unloading State AND unload queued
+        #
+        # Trucks are tracked in index sets by activity (moving, arriving, queued), which are
+        # updated on state transitions, so each step only visits the trucks it acts on.
         # --------------------- SIMULATION TICK INFO -----------------------------------------------#
 
+        if self.log_sink is not None and self.current_tick % self.log_sink.chunk_ticks == 0 and self.current_tick:
+            self.flush_logs()
+
         # 1. Increment simulation tick counter (current_tick)
         self.current_tick += 1
 
-        # 2. Find trucks with = UnloadStation state AND not queued
-        new_trucks = []  # List to hold new trucks ready to be queued/unloaded
-        for truck in self.mining_trucks:
-            if truck.get_state() == TruckState.Unloading and not truck.unload_queued:
-                logger.debug(f"At T={self.current_tick}, added {truck} to assignment list")
-                new_trucks.append(truck.idx)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_tick()
+
+        # Event and vector engines move the nodes themselves
+        if self._engine is not None:
+            self._engine.tick(self.current_tick)
+            if profiler is not None:
+                profiler.lap("engine_tick", self.num_trucks)
+                profiler.end_tick(self.current_tick)
+            return
+
+        trucks = self.mining_trucks
+
+        # 2. Take trucks with = UnloadStation state AND not queued
+        new_trucks, self._arriving_trucks = self._arriving_trucks, []
+        n_new_trucks = len(new_trucks)
+        if profiler is not None:
+            profiler.lap("collect_arrivals", n_new_trucks)
 
         # 3. Pass these trucks to the assignment algo and get station assignments
-        station_assignments = []
-        truck_assignments = []
-        if new_trucks:
-            logger.debug(f"At T={self.current_tick}, {len(new_trucks)} trucks waiting for unload station")
-            station_assignments, truck_assignments = self.assign_stations_algo(new_trucks)
+        station_assignments: dict[int, list[int]] = {}
         if new_trucks:
-            logger.warning("New Trucks list is not empty. ALL TRUCKS NOT ASSIGNED!!")
-
-        # 4. Move all other trucks (not in Unloading state) forward by one tick
-        for truck in self.mining_trucks:
-            if truck.get_state() != TruckState.Unloading:
-                truck.tick()
+            logger.debug("At T=%d, %d trucks waiting for unload station", self.current_tick, n_new_trucks)
+            station_assignments = self.station_assigner.assign(self.current_tick, new_trucks)
+        if profiler is not None:
+            profiler.lap("assign", n_new_trucks)
+
+        # 4. Move all other trucks (not in Unloading state) forward by one tick, in ID order
+        # so random draws happen in the same order with every engine
+        still_moving = []
+        for truck_idx in self._moving_trucks:
+            truck = trucks[truck_idx]
+            truck.tick()
+            if truck._state == _UNLOADING:
+                self._arriving_trucks.append(truck_idx)
+            else:
+                still_moving.append(truck_idx)
+        if profiler is not None:
+            profiler.lap("tick_trucks", len(self._moving_trucks))
 
         # 5. Move all unloading stations by one tick (passing in new truck assignments)
-        _trucks_unload_complete = []  # Track the trucks that completed unloading
+        _trucks_unload_complete = set()  # Track the trucks that completed unloading
         for station in self.unloading_stations:
-            station_assignment: dict = find_station_info_by_id(station_assignments, station_id=station.idx)
-            if station_assignment is None:
-                logger.debug(f"Station Assignment not found for: {station}, assignment skipped")
-                _get_truck = station.tick(trucks=[])
-            else:
-                # Get truck that finished unloading (if any)
-                _get_truck = station.tick(trucks=station_assignment["q_trucks"])
+            # Get truck that finished unloading (if any)
+            _get_truck = station.tick(trucks=station_assignments.get(station.idx, []))
 
             if _get_truck is not None:
-                _trucks_unload_complete.append(_get_truck)
+                _trucks_unload_complete.add(_get_truck)
+        if profiler is not None:
+            profiler.lap("tick_stations", self.num_stations)
 
         # 6. Tick remaining trucks with Unloading State AND unload queued
         # Based on truck assignments, first update each truck's unloading status
-        for truck_assignment in truck_assignments:
-            truck_idx = truck_assignment["truck_id"]
-            if truck_idx != self.mining_trucks[truck_idx].idx:
-                logger.error(f"truck_idx: {truck_idx} does not match expected {self.mining_trucks[truck_idx].idx}")
-                logger.error(f"truck assignment: {truck_assignment}")
-                raise ValueError("Truck indexes don't match")
-
-            truck: MiningTruck = self.mining_trucks[truck_idx]
-            truck.assign_unload_site(truck_assignment["station_id"])
-
-        # Move other trucks still in unloading state
-        # NOTE: This logic of updating ticks for different can be improved, but leave
-        # as is for now due to time constraints.
-        for truck in self.mining_trucks:
-            if truck.get_state() == TruckState.Unloading and truck.unload_queued:
-                _unload_complete = True if truck.idx in _trucks_unload_complete else False
-
-                truck.tick(unloading_complete=_unload_complete)
-                logger.debug(
-                    f"Truck: {truck} , Tick Count: {truck.current_tick} , Truck State: {truck.get_state().name}"
-                )
+        for station_idx, q_trucks in station_assignments.items():
+            for truck_idx in q_trucks:
+                if truck_idx != trucks[truck_idx].idx:
+                    logger.error(f"truck_idx: {truck_idx} does not match expected {trucks[truck_idx].idx}")
+                    logger.error(f"truck assignment: {truck_idx} -> station {station_idx}")
+                    raise ValueError("Truck indexes don't match")
+
+                trucks[truck_idx].assign_unload_site(station_idx)
+                self._queued_trucks.add(truck_idx)
+                if self.tracer is not None:
+                    self.tracer.emit(self.current_tick, TraceEvent.Assignment, truck_idx, station_idx)
+        if profiler is not None:
+            profiler.lap("apply_assignments", n_new_trucks)
+
+        # Move trucks still in unloading state, trucks that completed unloading go back on the road
+        n_queued_trucks = len(self._queued_trucks)
+        for truck_idx in self._queued_trucks:
+            truck = trucks[truck_idx]
+            truck.tick(unloading_complete=truck_idx in _trucks_unload_complete)
+
+        if _trucks_unload_complete:
+            self._queued_trucks.difference_update(_trucks_unload_complete)
+            still_moving.extend(sorted(_trucks_unload_complete))
+            # Both parts are sorted, so this is a linear merge
+            still_moving.sort()
+        self._moving_trucks = still_moving
+        if profiler is not None:
+            profiler.lap("tick_queued_trucks", n_queued_trucks)
+            profiler.end_tick(self.current_tick)
+
+    def enable_profiling(self, callback=None) -> PhaseProfiler:
+        """Record wall time, calls and items processed for each phase of tick() and of the analysis
 
-    def run(self):
-        """Function to run the simulation until stop time passed through class constructor"""
+        Args:
+            callback (Callable): Called as callback(tick, phase_seconds) at the end of every tick
+
+        Returns:
+            PhaseProfiler: Profiler of the simulation (also available as `sim.profiler`)
+        """
+        self.profiler = PhaseProfiler(callback)
+        return self.profiler
+
+    def disable_profiling(self):
+        """Stop recording phase timings"""
+        self.profiler = None
+
+    def enable_tracing(self, capacity: int = 65536, path: str | None = None, trucks=None, stations=None) -> Tracer:
+        """Record state transition, enqueue, dequeue and assignment events (see `mining_sim.utility.tracing`)
+
+        Args:
+            capacity (int): Number of events kept in memory (ring buffer without a file)
+            path (str): Binary trace file to stream the events to
+            trucks (Iterable[int]): Only record events of these truck IDs
+            stations (Iterable[int]): Only record events of these station IDs
+
+        Returns:
+            Tracer: Tracer of the simulation (also available as `sim.tracer`)
+        """
+        self.disable_tracing()
+        self.tracer = Tracer(capacity=capacity, path=path, trucks=trucks, stations=stations)
+        self._set_node_tracer(self.tracer)
+        return self.tracer
+
+    def disable_tracing(self):
+        """Stop recording events and close the trace file"""
+        if self.tracer is not None:
+            self.tracer.close()
+        self.tracer = None
+        self._set_node_tracer(None)
+
+    def _set_node_tracer(self, tracer: Tracer | None):
+        for node in self.mining_trucks + self.unloading_stations:
+            node._tracer = tracer
+
+    def run(
+        self,
+        verbose: bool = True,
+        checkpoint_path: str | None = None,
+        checkpoint_interval_hr: float = 24,
+        profile: bool = False,
+        profile_callback=None,
+    ) -> dict | None:
+        """Function to run the simulation until stop time passed through class constructor
+
+        A simulation restored from a checkpoint resumes from its current tick. With a steady-state detector that
+        stops when stable, the run can end before the stop time. With a cache, a cached run only restores the
+        metrics (and the logs if the cache keeps them) and the final tick: trucks and stations are not advanced.
+        Memory mapped logs and the trace file are flushed at the end of the run.
+
+        Args:
+            verbose (bool): Print and animate simulation progress in the terminal
+            checkpoint_path (str): If set, a checkpoint is written to this file periodically during the run
+            checkpoint_interval_hr (float): Simulated time between checkpoints (hours)
+            profile (bool): Time each phase of the ticks (see enable_profiling())
+            profile_callback (Callable): Per tick callback(tick, phase_seconds), enables profiling
+
+        Returns:
+            dict: Timing report (see PhaseProfiler.report()) if profiling is enabled, else None
+        """
+        if profile or profile_callback is not None:
+            self.enable_profiling(profile_callback)
+        # Checkpoints are only written by simulated runs
+        config = self.cache_config if self.cache is not None and checkpoint_path is None else None
+        key = cache_key(config) if config is not None else None
+        if key is not None and self.current_tick == 0 and self._restore_from_cache(key):
+            if verbose:
+                print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Simulation results restored from cache")
+            return self.profiler.report() if self.profiler is not None else None
+        start_tick = self.current_tick
         sim_stop_time = min(self.stop_time, self.max_time)
-        print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Simulation started!")
-        print(f"Num of Trucks: {self.num_trucks}, Num of Stations: {self.num_stations}")
+        checkpoint_interval = max(1, int(checkpoint_interval_hr * 60 / 5))
+        if verbose:
+            print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Simulation started!")
+            print(f"Num of Trucks: {self.num_trucks}, Num of Stations: {self.num_stations}")
 
         while self.current_tick <= sim_stop_time:
-            if self.current_tick % 12 == 0:
+            if verbose and self.current_tick % 12 == 0:
                 animate_output(self.current_tick)
             # Simulation tick
             self.tick()
+            if checkpoint_path is not None and self.current_tick % checkpoint_interval == 0:
+                logger.info(f"At T={self.current_tick}, writing checkpoint to {checkpoint_path}")
+                self.save_checkpoint(checkpoint_path)
+            if self.steady_state is not None and self.steady_state.observe(self):
+                break
+
+        self.sync_nodes()
+        if self.log_sink is not None:
+            self.flush_logs()
+        if self.log_dir is not None:
+            self.truck_log.flush()
+            self.station_log.flush()
+        if self.tracer is not None:
+            self.tracer.flush()
+        if key is not None and start_tick == 0:
+            truck_metrics, station_metrics = self._compute_metrics()
+            summary = {**truck_metrics.summary(), **station_metrics.summary()}
+            self.cache.put(
+                key, summary, self.current_tick, truck_metrics, station_metrics, self.truck_log, self.station_log
+            )
+        if verbose:
+            sys.stdout.flush()
+            print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Simulation Complete! :)")
+            if self.profiler is not None:
+                print(self.profiler.format_report())
+
+        return self.profiler.report() if self.profiler is not None else None
+
+    @property
+    def cache_config(self) -> dict | None:
+        """Arguments that determine the results of the simulation, hashed into its cache key
+
+        The unload queue backend does not change the results and is left out. Runs that produce more than the
+        cached metrics (log sink, log directory, tracer or profiler) or depend on state beyond the arguments
+        (unseeded, steady-state detection) are not cacheable.
 
-        sys.stdout.flush()
-        print(f"\n{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Simulation Complete! :)")
+        Returns:
+            dict | None: JSON serializable config (see result_cache.cache_key), None if the run is not cacheable
+        """
+        if (
+            self.seed is None
+            or self.log_sink is not None
+            or self.log_dir is not None
+            or self.steady_state is not None
+            or self.tracer is not None
+            or self.profiler is not None
+        ):
+            return None
+        return {
+            "n_trucks": self.num_trucks,
+            "m_stations": self.num_stations,
+            "stop_time": self.stop_time,
+            "max_time": self.max_time,
+            "engine": self.engine,
+            "metrics": self.metrics,
+            "seed": self.seed,
+        }
+
+    def _restore_from_cache(self, key: str) -> bool:
+        """Restore the metrics, logs and final tick of a cached run, return False if it is not cached"""
+        entry = self.cache.get(key)
+        metrics = self.cache.get_metrics(key) if entry is not None else None
+        if metrics is None:
+            return False
+        if self.metrics == "log" and self.cache.include_logs:
+            if not self.cache.get_logs(key, self.truck_log, self.station_log):
+                return False
+        self.truck_metrics, self.station_metrics = metrics
+        self.current_tick = entry["tick"]
+        self.from_cache = True
+        logger.info(f"Restored {self.num_trucks} trucks and {self.num_stations} stations from cache entry {key[:12]}")
+        return True
+
+    def snapshot(self, include_logs: bool = True) -> bytes:
+        """Binary snapshot of the full simulation state, see `mining_sim.checkpoint.snapshot()`
+
+        Args:
+            include_logs (bool): Include the per tick logs
+
+        Returns:
+            bytes: Snapshot that can be passed to MiningSimulator.restore()
+        """
+        return snapshot(self, include_logs=include_logs)
+
+    @classmethod
+    def restore(cls, data: bytes) -> "MiningSimulator":
+        """Restore a simulation from a snapshot. It continues exactly like the uninterrupted simulation.
+
+        Args:
+            data (bytes): Snapshot created by MiningSimulator.snapshot()
+
+        Returns:
+            MiningSimulator: Restored simulation
+        """
+        sim = restore(data)
+        if not isinstance(sim, cls):
+            raise ValueError(f"Snapshot does not contain a {cls.__name__}")
+        return sim
+
+    def save_checkpoint(self, path: str, include_logs: bool = True):
+        """Write a snapshot of the simulation to a file
+
+        Args:
+            path (str): Checkpoint file path
+            include_logs (bool): Include the per tick logs
+        """
+        save_checkpoint(self, path, include_logs=include_logs)
+
+    @classmethod
+    def load_checkpoint(cls, path: str) -> "MiningSimulator":
+        """Restore a simulation from a checkpoint file, call run() to resume it
+
+        Args:
+            path (str): Checkpoint file written by MiningSimulator.save_checkpoint()
+
+        Returns:
+            MiningSimulator: Restored simulation
+        """
+        with open(path, "rb") as f:
+            return cls.restore(f.read())
+
+    def fork(self, branches: list, max_workers: int | None = None) -> list:
+        """Run what-if branches from the current state of the simulation, see `mining_sim.checkpoint.fork_branches()`
+
+        Args:
+            branches (list[Callable]): Functions called as branch(sim) on a copy of this simulation
+            max_workers (int): Maximum number of branches running at a time
+
+        Returns:
+            list: Result of each branch, in the order of `branches`
+        """
+        return fork_branches(self, branches, max_workers=max_workers)
+
+    def sync_nodes(self):
+        """Bring all trucks and stations up to the current simulation tick
+
+        Only required for the event engine, which leaves idle nodes behind until they need to act. Nodes of
+        results restored from the cache are not advanced.
+        """
+        if self._engine is not None and not self.from_cache:
+            self._engine.sync_nodes()
+
+    def flush_logs(self):
+        """Write the logs kept in memory to the log sink and clear them"""
+        if self.log_sink is None:
+            raise ValueError("Simulation has no log sink")
+        self.sync_nodes()
+        self.log_sink.write(self.truck_log, self.station_log)
+
+    def summarize(self) -> dict:
+        """Average truck and station stats of the simulation, without writing any results files
+
+        Computed with NumPy only: online metrics are always up to date, logs are streamed through running
+        metrics (flushing a log sink first).
+
+        Returns:
+            dict: Average truck stats (Mining_pct, OnRoad_pct, Unloading_pct, Queued_pct, Efficiency_pct,
+                Helium_Unloads) and average station stats (average_wait_time, max_wait_time, efficiency_pct)
+        """
+        self.sync_nodes()
+        truck_metrics, station_metrics = self._compute_metrics()
+        return {**truck_metrics.summary(), **station_metrics.summary()}
+
+    def _compute_metrics(self) -> tuple[TruckMetrics, StationMetrics]:
+        """Truck and station metrics of the simulation so far, without pandas"""
+        if self.metrics == "online" or self.from_cache:
+            return self.truck_metrics, self.station_metrics
+        if self.log_sink is not None:
+            self.flush_logs()
+            with self._measure("analysis_log_files", self.log_sink.n_rows["truck_log"]):
+                return compute_log_file_metrics(self.log_sink.path)
+        with self._measure("analysis_log_files", sum(self.truck_log.lengths)):
+            return compute_log_store_metrics(self.truck_log, self.station_log)
+
+    def _measure(self, phase: str, items: int = 0):
+        """Context manager timing an analysis phase when profiling is enabled"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.measure(phase, items)
 
     def analyze_simulation_logs(self):
         """Function for analyzing data logs from the simulation"""
+        # The analysis layer (pandas) is only loaded when results files are written
+        from mining_sim.utility.analysis import (
+            convert_log_to_df,
+            convert_fleet_log_to_df,
+            compute_fleet_truck_metrics,
+            compute_cumulative_truck_stats,
+            compute_station_metrics,
+            save_station_stats,
+        )
+
+        self.sync_nodes()
+
+        if self.metrics == "online" or self.from_cache or self.log_sink is not None or self.log_dir is not None:
+            # Running metrics are already up to date (or restored from the cache), log files (or memory mapped
+            # logs) are streamed through running metrics instead of being loaded
+            source = "online metrics" if self.metrics == "online" else "log files"
+            if self.from_cache:
+                source = "cached results"
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Computing stats from {source}...")
+            truck_metrics, station_metrics = self._compute_metrics()
+            with self._measure("analysis_truck_stats", self.num_trucks):
+                compute_cumulative_truck_stats(truck_metrics.to_df())
+            with self._measure("analysis_station_stats", self.num_stations):
+                save_station_stats(station_metrics.to_results())
+            print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Analysis Complete! :)")
+            return
 
         # Convert log data to pandas data frame
-        truck_df_list = convert_log_to_df(self.mining_trucks)
-        station_df_list = convert_log_to_df(self.unloading_stations)
+        with self._measure("analysis_convert_logs", self.num_trucks + self.num_stations):
+            truck_df = convert_fleet_log_to_df(self.mining_trucks)
+            station_df_list = convert_log_to_df(self.unloading_stations)
 
         # Compute metrics
-        print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Analyzing Trucks Log Data (can take a few minutes)...")
-        # NOTE: Analysis functions are not optimised for speed right now
-        if len(self.mining_trucks) > 1000:
-            print("WARNING: Large number of trucks input to simulation. Analysis will take a while!!!")
+        print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Analyzing Trucks Log Data...")
 
-        # COmpute and output truck metrics
-        truck_df_list = compute_truck_metrics(truck_df_list)
-        compute_cumulative_truck_stats(truck_df_list)
+        # Compute and output truck metrics (all trucks in one vectorized pass)
+        with self._measure("analysis_truck_metrics", len(truck_df)):
+            truck_df = compute_fleet_truck_metrics(truck_df)
+        with self._measure("analysis_truck_stats", self.num_trucks):
+            compute_cumulative_truck_stats(truck_df)
 
         # Compute and output station metrics
         print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Analyzing Trucks Log Data (can take a few minutes)...")
-        compute_station_metrics(station_df_list)
+        with self._measure("analysis_station_metrics", self.num_stations):
+            compute_station_metrics(station_df_list)
 
         # Exit
         print(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}: Analysis Complete! :)")
@@ -0,0 +1,196 @@
+"""Parallel parameter sweeps over MiningSimulator configurations
+
+Usage:
+    python -m mining_sim.sweep --trucks 500 --stations 5:50:5 --replicates 4 --hours 72 --workers 8
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from mining_sim.simulator import MiningSimulator
+from mining_sim.utility.result_cache import ResultCache
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CONFIG_COLUMNS = ["n_trucks", "m_stations", "stop_time_hr", "engine", "replicate"]
+"""Columns identifying a sweep task in the results table"""
+
+
+def replicate_seeds(n_replicates: int, base_seed: int = 0) -> list[int]:
+    """Derive independent seeds for each replicate from a base seed
+
+    The same replicate seed is used for every configuration, so configurations are compared
+    using common random numbers. Each task builds its simulator with its own seed, so results
+    do not depend on which worker process runs it.
+
+    Args:
+        n_replicates (int): Number of replicates
+        base_seed (int): Base seed of the sweep
+
+    Returns:
+        list[int]: One seed per replicate
+    """
+    return [int(x.generate_state(1)[0]) for x in np.random.SeedSequence(base_seed).spawn(n_replicates)]
+
+
+def make_sweep_configs(
+    n_trucks: list[int],
+    m_stations: list[int],
+    n_replicates: int = 1,
+    base_seed: int = 0,
+    stop_time_hr: int = 72,
+    engine: str = "vector",
+) -> list[dict]:
+    """Create sweep tasks for the grid of truck counts x station counts x replicates
+
+    Args:
+        n_trucks (list[int]): Truck counts
+        m_stations (list[int]): Station counts
+        n_replicates (int): Number of replicates (independent seeds) per configuration
+        base_seed (int): Base seed from which replicate seeds are derived
+        stop_time_hr (int): Simulation stop time in hours
+        engine (str): Simulation engine
+
+    Returns:
+        list[dict]: One dict per task with the MiningSimulator arguments, replicate and seed
+    """
+    seeds = replicate_seeds(n_replicates, base_seed)
+    return [
+        {
+            "n_trucks": trucks,
+            "m_stations": stations,
+            "stop_time_hr": stop_time_hr,
+            "engine": engine,
+            "replicate": replicate,
+            "seed": seeds[replicate],
+        }
+        for trucks, stations, replicate in itertools.product(n_trucks, m_stations, range(n_replicates))
+    ]
+
+
+def run_config(config: dict) -> dict:
+    """Run one sweep task and return its summary metrics
+
+    If the MINING_SIM_CACHE environment variable names a directory, results are cached there (see ResultCache), so
+    repeated tasks of any batch runner (sweeps, replications, optimizer, distributed workers) are not simulated again.
+
+    Args:
+        config (dict): Sweep task from make_sweep_configs
+
+    Returns:
+        dict: Task config, summary metrics (see MiningSimulator.summarize) and runtime in seconds
+    """
+    start_time = time.perf_counter()
+    sim = MiningSimulator(
+        n_trucks=config["n_trucks"],
+        m_stations=config["m_stations"],
+        stop_time_hr=config["stop_time_hr"],
+        max_time_hr=config["stop_time_hr"],
+        engine=config["engine"],
+        metrics="online",
+        seed=config["seed"],
+        cache=ResultCache.from_env(),
+    )
+    # A cached run restores its metrics instead of simulating, with the key of MiningSimulator.cache_config
+    sim.run(verbose=False)
+    return {**config, **sim.summarize(), "runtime_s": time.perf_counter() - start_time}
+
+
+def run_sweep(configs: list[dict], max_workers: int | None = None) -> "pd.DataFrame":
+    """Run sweep tasks across a process pool
+
+    Args:
+        configs (list[dict]): Sweep tasks from make_sweep_configs
+        max_workers (int): Number of worker processes (defaults to the number of CPUs)
+
+    Returns:
+        pd.DataFrame: One row per task with config and summary metrics, in task order
+    """
+    import pandas as pd
+
+    max_workers = max_workers or os.cpu_count() or 1
+    # Hand out several tasks at a time to keep inter-process overhead low for large grids
+    chunksize = max(1, len(configs) // (4 * max_workers))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(run_config, configs, chunksize=chunksize))
+
+    return pd.DataFrame(results)
+
+
+def aggregate_sweep_results(results_df: "pd.DataFrame") -> "pd.DataFrame":
+    """Mean and standard deviation of the summary metrics across replicates of each configuration
+
+    Args:
+        results_df (pd.DataFrame): Results from run_sweep
+
+    Returns:
+        pd.DataFrame: One row per configuration with <metric>_mean and <metric>_std columns
+    """
+    group_columns = [x for x in CONFIG_COLUMNS if x != "replicate"]
+    metric_columns = [x for x in results_df.columns if x not in CONFIG_COLUMNS + ["seed"]]
+    aggregated = results_df.groupby(group_columns)[metric_columns].agg(["mean", "std"])
+    aggregated.columns = [f"{metric}_{stat}" for metric, stat in aggregated.columns]
+    aggregated["replicates"] = results_df.groupby(group_columns).size()
+    return aggregated.reset_index()
+
+
+def parse_int_values(values: list[str]) -> list[int]:
+    """Parse integers and inclusive start:stop[:step] ranges from command line arguments"""
+    parsed = []
+    for value in values:
+        if ":" in value:
+            start, stop, *step = (int(x) for x in value.split(":"))
+            parsed.extend(range(start, stop + 1, step[0] if step else 1))
+        else:
+            parsed.append(int(value))
+    return parsed
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Run a parallel MiningSimulator parameter sweep")
+    parser.add_argument("--trucks", nargs="+", required=True, help="Truck counts (values or start:stop[:step])")
+    parser.add_argument("--stations", nargs="+", required=True, help="Station counts (values or start:stop[:step])")
+    parser.add_argument("--replicates", type=int, default=1, help="Independent seeds per configuration")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for the replicate seeds")
+    parser.add_argument("--hours", type=int, default=72, help="Simulation stop time in hours")
+    parser.add_argument("--engine", default="vector", help="Simulation engine (tick, event or vector)")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--output", default="./results/sweep_results.csv", help="Output CSV for all runs")
+    args = parser.parse_args()
+
+    configs = make_sweep_configs(
+        parse_int_values(args.trucks),
+        parse_int_values(args.stations),
+        n_replicates=args.replicates,
+        base_seed=args.seed,
+        stop_time_hr=args.hours,
+        engine=args.engine,
+    )
+    print(f"Running {len(configs)} simulations...")
+    start_time = time.perf_counter()
+    results_df = run_sweep(configs, max_workers=args.workers)
+    print(f"Sweep complete in {time.perf_counter() - start_time:.1f} s")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    results_df.to_csv(args.output, index=False)
+    print(f"Results saved to {args.output}")
+
+    summary_columns = CONFIG_COLUMNS[:2] + ["Efficiency_pct_mean", "Queued_pct_mean", "average_wait_time_mean"]
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(aggregate_sweep_results(results_df)[summary_columns + ["replicates"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
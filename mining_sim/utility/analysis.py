@@ -1,15 +1,16 @@
 import os
 import logging
+import numpy as np
 import pandas as pd
 import json
 
-from mining_sim.nodes.truck import MiningTruck
+from mining_sim.enums.sim_enums import TruckState
+from mining_sim.nodes.truck import MiningTruck, TRUCK_STATE_NAMES
 from mining_sim.nodes.unloadstation import UnloadingStation
 
 logger = logging.getLogger(__name__)
 
 
-# NOTE: Due to lack of time, no unit tests have been written for these functions
 def make_results_dir():
     """Create a results directory if it does not exist"""
     results_dir = "./results"
@@ -20,86 +21,132 @@ def make_results_dir():
 def convert_log_to_df(nodes: list[MiningTruck | UnloadingStation]) -> pd.DataFrame:
     """Convert log data to list of pandas dataframe
 
+    The data frames wrap the columns of the node's log store without copying them.
+
     Args:
         nodes: List of nodes whose log data needs to be converted
     """
     df_list = []
     for node in nodes:
-        df_list.append(pd.DataFrame(node._data_log_list))
+        df_list.append(pd.DataFrame(node.get_log_columns(), copy=False))
 
     return df_list
 
 
-def process_truck(truck_df: pd.DataFrame) -> pd.DataFrame:
-    # Initialize required counters and columns in DataFrame
-    time_mining, time_onroad, time_unloading, time_queued = 0, 0, 0, 0
-    mining_trips, unloads, roundtrips = 0, 0, 0
-    truck_df = truck_df.sort_values(["tick"]).copy()
-    truck_df["Time_Mining"] = 0
-    truck_df["Time_OnRoad"] = 0
-    truck_df["Time_Unloading"] = 0
-    truck_df["Time_Queued"] = 0
-    truck_df["Mining_Trips_Completed"] = 0
-    truck_df["Unloads_Completed"] = 0
-    truck_df["Roundtrips_Completed"] = 0
-    # Iterate over rows to compute values
-    prev_state = "None"
-    for i, row in truck_df.iterrows():
-        # Time spent in each state
-        if row["state"] == "AtMine":
-            time_mining += 1
-        elif "OnRoad" in row["state"]:
-            time_onroad += 1
-        elif row["state"] == "Unloading":
-            if prev_state == "Unloading":
-                time_queued += 1
-            else:
-                time_unloading += 1
-
-        # Detect state transitions
-        if prev_state == "AtMine" and "OnRoad" in row["state"]:
-            mining_trips += 1
-        elif prev_state == "Unloading" and "OnRoad" in row["state"]:
-            unloads += 1
-        elif "OnRoad" in prev_state and row["state"] == "AtMine":
-            roundtrips += 1
-
-        prev_state = row["state"]
-
-        # Update cumulative values in DataFrame
-        truck_df.at[i, "Time_Mining"] = time_mining
-        truck_df.at[i, "Time_OnRoad"] = time_onroad
-        truck_df.at[i, "Time_Unloading"] = time_unloading
-        truck_df.at[i, "Time_Queued"] = time_queued
-        truck_df.at[i, "Mining_Trips_Completed"] = mining_trips
-        truck_df.at[i, "Unloads_Completed"] = unloads
-        truck_df.at[i, "Roundtrips_Completed"] = roundtrips
+def convert_fleet_log_to_df(nodes: list[MiningTruck | UnloadingStation]) -> pd.DataFrame:
+    """Convert log data of all nodes to a single pandas dataframe (grouped by node, in tick order)
+
+    Args:
+        nodes: List of nodes whose log data needs to be converted
+    """
+    node_columns = [node.get_log_columns() for node in nodes]
+    if not node_columns:
+        return pd.DataFrame()
+
+    fleet_columns = {}
+    for name, column in node_columns[0].items():
+        values = [columns[name] for columns in node_columns]
+        if isinstance(column, np.ndarray):
+            fleet_columns[name] = np.concatenate(values)
+        elif isinstance(column, pd.Categorical):
+            codes = np.concatenate([value.codes for value in values])
+            fleet_columns[name] = pd.Categorical.from_codes(codes, categories=column.categories)
+        else:
+            fleet_columns[name] = pd.concat([pd.Series(value) for value in values], ignore_index=True).array
+
+    return pd.DataFrame(fleet_columns)
+
+
+def _group_cumsum(values: np.ndarray, group_start: np.ndarray, group_size: np.ndarray) -> np.ndarray:
+    """Cumulative sum of values within each group of consecutive rows"""
+    cumsum = np.cumsum(values, dtype=np.int64)
+    offsets = cumsum[group_start] - values[group_start]
+    return cumsum - np.repeat(offsets, group_size)
+
+
+def compute_fleet_truck_metrics(fleet_df: pd.DataFrame, group_key: np.ndarray | None = None) -> pd.DataFrame:
+    """Compute cumulative truck metrics for all trucks in a single vectorized pass
+
+    Adds the following cumulative columns to each row: Time_Mining, Time_OnRoad, Time_Unloading,
+    Time_Queued, Mining_Trips_Completed, Unloads_Completed and Roundtrips_Completed.
+
+    Args:
+        fleet_df (pd.DataFrame): Concatenated truck logs (tick, id, state, assigned_station)
+        group_key (np.ndarray): Optional key identifying the log each row belongs to. Defaults to truck ID.
+
+    Returns:
+        pd.DataFrame: Copy of the logs sorted by (group, tick) with the metrics columns added
+    """
+    if group_key is None:
+        group_key = fleet_df["id"].to_numpy()
+    order = np.lexsort((fleet_df["tick"].to_numpy(), group_key))
+    truck_df = fleet_df.iloc[order].copy()
+    group_key = group_key[order]
+
+    # Groups of consecutive rows for each truck
+    first_row = np.r_[True, group_key[1:] != group_key[:-1]] if len(group_key) else np.zeros(0, dtype=bool)
+    group_start = np.flatnonzero(first_row)
+    group_size = np.diff(np.r_[group_start, len(group_key)])
+
+    # State codes for current and previous row (-1 for first row of a truck)
+    state = np.asarray(pd.Categorical(truck_df["state"], categories=TRUCK_STATE_NAMES).codes)
+    prev_state = np.r_[-1, state[:-1]] if len(state) else state
+    prev_state[first_row] = -1
+
+    at_mine = state == TruckState.AtMine.value
+    on_road = (state == TruckState.OnRoad_ToMine.value) | (state == TruckState.OnRoad_ToUnload.value)
+    unloading = state == TruckState.Unloading.value
+    prev_on_road = (prev_state == TruckState.OnRoad_ToMine.value) | (prev_state == TruckState.OnRoad_ToUnload.value)
+    queued = unloading & (prev_state == TruckState.Unloading.value)
+
+    metrics = {
+        "Time_Mining": at_mine,
+        "Time_OnRoad": on_road,
+        "Time_Unloading": unloading & ~queued,
+        "Time_Queued": queued,
+        "Mining_Trips_Completed": (prev_state == TruckState.AtMine.value) & on_road,
+        "Unloads_Completed": (prev_state == TruckState.Unloading.value) & on_road,
+        "Roundtrips_Completed": prev_on_road & at_mine,
+    }
+    for name, mask in metrics.items():
+        truck_df[name] = _group_cumsum(mask, group_start, group_size)
 
     return truck_df
 
 
+def process_truck(truck_df: pd.DataFrame) -> pd.DataFrame:
+    """Compute cumulative metrics for a single truck (see compute_fleet_truck_metrics)"""
+    return compute_fleet_truck_metrics(truck_df, group_key=np.zeros(len(truck_df), dtype=np.int64))
+
+
 def compute_truck_metrics(df_list=list[pd.DataFrame]):
     """Compute truck metrics based on input dataframe"""
-    # Sort by tick within each truck ID
-    analyzed_df_list = []
-    for df in df_list:
-        analyzed_df_list.append(process_truck(df))
+    if not df_list:
+        return []
+
+    # Analyze all trucks in one pass, then split back into one data frame per truck
+    log_size = np.array([len(df) for df in df_list])
+    group_key = np.repeat(np.arange(len(df_list)), log_size)
+    fleet_df = compute_fleet_truck_metrics(pd.concat(df_list), group_key=group_key)
 
-    return analyzed_df_list
+    group_end = np.cumsum(log_size)
+    return [fleet_df.iloc[end - size : end] for size, end in zip(log_size, group_end)]
 
 
 def compute_cumulative_truck_stats(df_list, output_file="./results/truck_stats.json"):
     """
     Compute cumulative time statistics for each truck at the last tick
     and save the result as a JSON file.
-    """
-    # Grab the last row for each truck's dataframe and create new dataframe
-    last_tick_rows = []
-    for df in df_list:
-        last_tick_rows.append(df.loc[df["tick"].idxmax()])
 
-    # Convert the list of rows into a new DataFrame
-    last_tick_df = pd.DataFrame(last_tick_rows)
+    Args:
+        df_list (list[pd.DataFrame] | pd.DataFrame): Truck metrics from compute_truck_metrics, or a
+            single fleet data frame from compute_fleet_truck_metrics
+        output_file (str): Path of the output JSON file
+    """
+    # Grab the last row for each truck
+    fleet_df = df_list if isinstance(df_list, pd.DataFrame) else pd.concat(df_list, ignore_index=True)
+    fleet_df = fleet_df.reset_index(drop=True)
+    last_tick_df = fleet_df.loc[fleet_df.groupby("id", sort=False)["tick"].idxmax()]
 
     # Calculate total time per truck
     last_tick_df["Total_Time"] = (
@@ -180,6 +227,16 @@ def compute_station_metrics(df_list: list[pd.DataFrame], output_file: str = "./r
         }
         results_dict.append(result_dict)
 
+    save_station_stats(results_dict, output_file)
+
+
+def save_station_stats(results_dict: list[dict], output_file: str = "./results/station_stats.json"):
+    """Save station metrics to a JSON file and print the average stats across all stations
+
+    Args:
+        results_dict (list[dict]): Metrics dict for each station
+        output_file (str): Path of the output JSON file
+    """
     # Save the results to a JSON file
     make_results_dir()
     with open(output_file, "w") as f:
@@ -0,0 +1,114 @@
+"""Station assignment for trucks waiting at the unloading site"""
+
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StationAssigner:
+    """Persistent priority structure for assigning trucks to unloading stations
+
+    Each station is represented by `next_free`, the tick at which the station can unload a newly
+    queued truck. The wait time of a station at tick t is max(0, next_free - t), and since every
+    station unloads one truck per tick, ordering busy stations by next_free stays valid as time
+    moves forward. This allows the structure to be kept across ticks:
+    - Idle stations (next_free <= t) are kept in a min-heap keyed by station ID
+    - Busy stations are kept in a min-heap keyed by (next_free, station ID)
+
+    Trucks are assigned with the same rules as `MiningSimulator.assign_stations_algo`: each truck
+    goes to the station with the lowest wait time + trucks assigned in this round. Ties are broken
+    by station ID for stations that have not received a truck yet in this round, followed by the
+    order in which stations received their last truck.
+    """
+
+    def __init__(self, m_stations: int):
+        """Constructor for the station assigner
+
+        Args:
+            m_stations (int): Number of unloading stations
+        """
+        self.next_free: list[int] = [0] * m_stations
+        """Next tick at which each station can unload a newly queued truck"""
+        self._idle: list[int] = list(range(m_stations))
+        """Min-heap of idle station IDs"""
+        self._busy: list[tuple[int, int]] = []
+        """Min-heap of (next_free, station ID) for busy stations"""
+
+    @classmethod
+    def from_wait_times(cls, wait_times: list[int], current_tick: int) -> "StationAssigner":
+        """Create a station assigner from current station wait times
+
+        Args:
+            wait_times (list[int]): Wait time (number of queued trucks) at each station
+            current_tick (int): Last tick processed by the simulation
+
+        Returns:
+            StationAssigner: Station assigner for the next tick
+        """
+        assigner = cls(len(wait_times))
+        assigner._idle = []
+        for station_id, wait_time in enumerate(wait_times):
+            assigner.next_free[station_id] = current_tick + 1 + wait_time
+            if wait_time > 0:
+                assigner._busy.append((assigner.next_free[station_id], station_id))
+            else:
+                assigner._idle.append(station_id)
+        heapq.heapify(assigner._busy)
+        return assigner
+
+    def get_wait_time(self, station_id: int, current_tick: int) -> int:
+        """Wait time of a station at the start of a tick
+
+        Args:
+            station_id (int): Station ID
+            current_tick (int): Tick being processed
+
+        Returns:
+            int: Number of trucks queued at the station
+        """
+        return max(0, self.next_free[station_id] - current_tick)
+
+    def assign(self, current_tick: int, new_trucks: list[int]) -> dict[int, list[int]]:
+        """Assign new trucks to stations
+
+        Args:
+            current_tick (int): Tick being processed
+            new_trucks (list[int]): Truck IDs to be assigned, in assignment order
+
+        Returns:
+            dict[int, list[int]]: Truck IDs assigned to each station ID (in queue order).
+                Only stations that received trucks are included.
+        """
+        idle, busy, next_free = self._idle, self._busy, self.next_free
+
+        # Stations whose queue has drained by now are idle
+        while busy and busy[0][0] <= current_tick:
+            heapq.heappush(idle, heapq.heappop(busy)[1])
+
+        assignments: dict[int, list[int]] = {}
+        reassigned: list[tuple[int, int, int]] = []  # (next_free, sequence, station_id)
+        heappop, heappush = heapq.heappop, heapq.heappush
+        for sequence, truck in enumerate(new_trucks):
+            # Idle stations have the lowest wait time. Otherwise, stations that have not received
+            # a truck in this round come before stations with the same wait time that have.
+            if idle:
+                station_id = heappop(idle)
+                station_next_free = current_tick + 1
+                assignments[station_id] = [truck]
+            elif busy and (not reassigned or busy[0][0] <= reassigned[0][0]):
+                station_next_free, station_id = heappop(busy)
+                station_next_free += 1
+                assignments[station_id] = [truck]
+            else:
+                station_next_free, _, station_id = heappop(reassigned)
+                station_next_free += 1
+                assignments[station_id].append(truck)
+
+            heappush(reassigned, (station_next_free, sequence, station_id))
+
+        for station_next_free, _, station_id in reassigned:
+            next_free[station_id] = station_next_free
+            heappush(busy, (station_next_free, station_id))
+
+        return assignments
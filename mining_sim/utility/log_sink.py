@@ -0,0 +1,241 @@
+"""Chunked export of simulation logs to Parquet or Arrow IPC files
+
+While the simulation runs, the in-memory log stores only hold the ticks since the last flush: every
+`chunk_hr` of simulated time, the truck and station logs are written as a new part file (a single row
+group) and the stores are cleared, so memory use does not grow with the simulated time. The part files
+are read back one at a time by `scan_log()`, and `compute_log_file_metrics()` computes the truck and
+station metrics from them without loading the full logs.
+
+Requires pyarrow (optional dependency), which is only imported when log files are written or read.
+
+Usage:
+    sim = MiningSimulator(n_trucks=50000, m_stations=500, stop_time_hr=24 * 21, log_sink=LogSink("logs"))
+    sim.run()
+    for df in scan_log("logs", "truck_log", ids=[42]):
+        ...
+
+Layout:
+    logs/log_meta.json
+    logs/truck_log/part-00000.parquet  (tick, id, state, assigned_station)
+    logs/station_log/part-00000.parquet  (tick, id, truck_unloading, wait_time)
+"""
+
+import glob
+import json
+import logging
+import os
+from typing import TYPE_CHECKING, Iterator
+
+import numpy as np
+
+from mining_sim.nodes.truck import TRUCK_STATE_NAMES
+from mining_sim.utility.log_store import LogStore
+from mining_sim.utility.metrics import TruckMetrics, StationMetrics, compute_chunked_metrics
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+LOG_SINK_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+"""Supported log file formats and their file extensions"""
+
+LOG_NAMES = ("truck_log", "station_log")
+"""Logs written by the simulation"""
+
+LOG_META_FILE = "log_meta.json"
+"""Description of the log files (format, number of nodes and part files)"""
+
+
+def _import_pyarrow():
+    """pyarrow module, imported on first use (optional dependency)"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Log files require pyarrow, install it with: pip install pyarrow") from None
+    return pa
+
+
+def _store_to_table(store: LogStore):
+    """Logged entries of all nodes in a log store as an Arrow table, ordered by node and tick"""
+    pa = _import_pyarrow()
+    return pa.concat_tables(pa.table(entries) for entries in store.iter_entries())
+
+
+class LogSink:
+    """Writes the simulation logs to part files in fixed-size chunks of simulated time
+
+    Pass it to `MiningSimulator(..., log_sink=LogSink(path))`. The simulation then only keeps `chunk_hr`
+    of logs in memory and flushes them to the sink.
+    """
+
+    def __init__(self, path: str, format: str = "parquet", chunk_hr: float = 24, compression: str | None = None):
+        """Constructor for the log sink
+
+        Args:
+            path (str): Directory of the log files. Part files from a previous run are removed.
+            format (str): File format - "parquet" or "arrow" (Arrow IPC, memory mappable)
+            chunk_hr (float): Simulated time between flushes (hours). Each flush writes one part file per log.
+            compression (str): Compression codec (e.g. "zstd", "lz4"). Defaults to snappy for Parquet
+                and no compression for Arrow.
+        """
+        _import_pyarrow()
+        if format not in LOG_SINK_FORMATS:
+            raise ValueError(f"Unknown log file format: {format}. Expected one of {tuple(LOG_SINK_FORMATS)}")
+        if chunk_hr <= 0:
+            raise ValueError(f"chunk_hr must be positive, got {chunk_hr}")
+        self.path = path
+        """Directory of the log files"""
+        self.format = format
+        """Log file format"""
+        self.chunk_ticks = max(1, int(chunk_hr * 60 / 5))
+        """Simulated time between flushes (ticks)"""
+        self.compression = compression
+        """Compression codec (None for the format default)"""
+        self.n_parts = 0
+        """Number of part files written per log"""
+        self.n_rows = {name: 0 for name in LOG_NAMES}
+        """Number of entries written to each log"""
+        self._meta = {}
+
+    def open(self, n_trucks: int, m_stations: int):
+        """Prepare the log directory for a simulation (called by the simulator)
+
+        Args:
+            n_trucks (int): Number of trucks
+            m_stations (int): Number of unloading stations
+        """
+        for name in LOG_NAMES:
+            os.makedirs(os.path.join(self.path, name), exist_ok=True)
+            for part in glob.glob(os.path.join(self.path, name, "part-*")):
+                os.remove(part)
+        self.n_parts = 0
+        self.n_rows = {name: 0 for name in LOG_NAMES}
+        self._meta = {"format": self.format, "n_trucks": n_trucks, "m_stations": m_stations}
+        self._write_meta()
+
+    def _write_meta(self):
+        with open(os.path.join(self.path, LOG_META_FILE), "w") as f:
+            json.dump({**self._meta, "n_parts": self.n_parts, "n_rows": self.n_rows}, f, indent=4)
+
+    def _write_table(self, table, file_path: str):
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(
+                table, file_path, row_group_size=max(len(table), 1), compression=self.compression or "snappy"
+            )
+            return
+        pa = _import_pyarrow()
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.OSFile(file_path, "wb") as f, pa.ipc.new_file(f, table.schema, options=options) as writer:
+            writer.write_table(table)
+
+    def write(self, truck_log: LogStore, station_log: LogStore):
+        """Write the entries of the log stores as a new part file of each log, then clear the stores
+
+        Args:
+            truck_log (LogStore): Log store of the trucks
+            station_log (LogStore): Log store of the stations
+        """
+        if not any(truck_log.lengths) and not any(station_log.lengths):
+            return
+        file_name = f"part-{self.n_parts:05d}{LOG_SINK_FORMATS[self.format]}"
+        for name, store in zip(LOG_NAMES, (truck_log, station_log)):
+            table = _store_to_table(store)
+            self._write_table(table, os.path.join(self.path, name, file_name))
+            self.n_rows[name] += len(table)
+            store.clear()
+        self.n_parts += 1
+        self._write_meta()
+        logger.debug(f"Wrote log part {file_name} to {self.path}")
+
+
+def read_log_meta(path: str) -> dict:
+    """Description of the log files in a directory written by a LogSink"""
+    with open(os.path.join(path, LOG_META_FILE)) as f:
+        return json.load(f)
+
+
+def _read_part(file_path: str, format: str, columns: list[str] | None):
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(file_path, columns=columns)
+    # Arrow IPC files are memory mapped, only the selected columns are read
+    pa = _import_pyarrow()
+    table = pa.ipc.open_file(pa.memory_map(file_path)).read_all()
+    return table if columns is None else table.select(columns)
+
+
+def _scan_parts(path: str, name: str, columns: list[str] | None = None):
+    """Arrow table of each part file of a log, in order"""
+    if name not in LOG_NAMES:
+        raise ValueError(f"Unknown log: {name}. Expected one of {LOG_NAMES}")
+    meta = read_log_meta(path)
+    extension = LOG_SINK_FORMATS[meta["format"]]
+    for part in sorted(glob.glob(os.path.join(path, name, f"part-*{extension}"))):
+        yield _read_part(part, meta["format"], columns)
+
+
+def scan_log(
+    path: str, name: str = "truck_log", columns: list[str] | None = None, ids=None, raw: bool = False
+) -> Iterator["pd.DataFrame"]:
+    """Read a log written by a LogSink one part file at a time
+
+    Args:
+        path (str): Directory of the log files
+        name (str): Log to read - "truck_log" or "station_log"
+        columns (list[str]): Columns to read (all columns if None)
+        ids (Iterable[int]): Only return the entries of these node IDs
+        raw (bool): Return the stored codes (truck state code, -1 for no truck unloading) instead of
+            the column types of convert_log_to_df()
+
+    Yields:
+        pd.DataFrame: Entries of one part file, ordered by node ID and tick
+    """
+    import pandas as pd
+
+    read_columns = columns
+    if ids is not None and columns is not None and "id" not in columns:
+        read_columns = [*columns, "id"]
+    ids = None if ids is None else np.fromiter(ids, dtype=np.int64)
+
+    for table in _scan_parts(path, name, read_columns):
+        df = table.to_pandas()
+        if ids is not None:
+            df = df[np.isin(df["id"].to_numpy(), ids)].reset_index(drop=True)
+            if columns is not None:
+                df = df[columns]
+        if not raw:
+            if "state" in df:
+                df["state"] = pd.Categorical.from_codes(df["state"], categories=TRUCK_STATE_NAMES)
+            if "truck_unloading" in df:
+                truck_unloading = df["truck_unloading"].to_numpy()
+                df["truck_unloading"] = pd.arrays.IntegerArray(truck_unloading, truck_unloading < 0)
+        yield df
+
+
+def compute_log_file_metrics(path: str) -> tuple[TruckMetrics, StationMetrics]:
+    """Truck and station metrics of a simulation from its log files, reading one part file at a time
+
+    The part files are read as NumPy arrays, without pandas.
+
+    Args:
+        path (str): Directory of the log files written by a LogSink
+
+    Returns:
+        tuple[TruckMetrics, StationMetrics]: Same metrics as a run with metrics="online"
+    """
+    meta = read_log_meta(path)
+
+    def chunks(name: str, columns: list[str]):
+        for table in _scan_parts(path, name, columns):
+            yield {column: table.column(column).to_numpy() for column in columns}
+
+    return compute_chunked_metrics(
+        chunks("truck_log", ["tick", "id", "state"]),
+        chunks("station_log", ["id", "wait_time"]),
+        meta["n_trucks"],
+        meta["m_stations"],
+    )
@@ -0,0 +1,243 @@
+"""Columnar log storage for simulation nodes"""
+
+import json
+import logging
+import os
+from typing import Iterator
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LogStore:
+    """Preallocated columnar log shared by a group of simulation nodes
+
+    Each column is a (nodes x ticks) array, so the log of one node is a contiguous row
+    that can be handed to pandas without copying. A node writes into its own row by index:
+    `reserve()` returns the position of the next entry(s), and the node then writes each
+    column at that position. Entries of a node are consecutive ticks starting at the first
+    logged tick, so the tick and node ID columns are not stored.
+
+    With a `path`, each column is a binary file of fixed-width records (one row of `capacity` entries per
+    node) opened with `numpy.memmap`, so logs larger than RAM are paged to disk by the OS. `flush()` writes
+    the lengths and first ticks next to the column files, and `LogStore.open(path)` maps them again.
+    """
+
+    def __init__(self, n_nodes: int, columns: dict[str, str], capacity: int = 1024, path: str | None = None):
+        """Constructor for the log store
+
+        Args:
+            n_nodes (int): Number of nodes (rows) in the store
+            columns (dict[str, str]): Column names and numpy dtypes
+            capacity (int): Number of entries to preallocate per node
+            path (str): Directory of memory mapped column files (None to keep the columns in memory).
+                Existing column files are overwritten.
+        """
+        self.capacity = max(capacity, 1)
+        """Number of entries allocated per node"""
+        self.path = path
+        """Directory of the memory mapped column files (None for in-memory columns)"""
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        self.columns: dict[str, np.ndarray] = {
+            name: self._allocate(name, dtype, (n_nodes, self.capacity)) for name, dtype in columns.items()
+        }
+        """Log columns, each with shape (nodes, capacity)"""
+        self.lengths: list[int] = [0] * n_nodes
+        """Number of entries logged by each node"""
+        self.first_tick: list[int] = [0] * n_nodes
+        """Tick of the first entry logged by each node"""
+
+    def _column_file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _allocate(self, name: str, dtype, shape: tuple[int, int], suffix: str = "") -> np.ndarray:
+        """Zero filled column, memory mapped to its column file when the store has a path"""
+        if self.path is None:
+            return np.zeros(shape, dtype=dtype)
+        if 0 in shape:
+            # Empty files cannot be memory mapped
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self._column_file(name) + suffix, dtype=dtype, mode="w+", shape=shape)
+
+    def _grow(self, min_capacity: int):
+        """Grow all columns to hold at least min_capacity entries per node"""
+        capacity = max(min_capacity, 2 * self.capacity)
+        logger.debug(f"Growing log store from {self.capacity} to {capacity} entries per node")
+        for name, column in self.columns.items():
+            # The row width changes, so memory mapped columns are copied to a new file
+            dtype, shape = column.dtype, (column.shape[0], capacity)
+            new_column = self._allocate(name, dtype, shape, suffix=".grow")
+            new_column[:, : self.capacity] = column
+            if isinstance(new_column, np.memmap):
+                # Mapped files cannot be renamed on Windows: unmap both columns first, then map the new file
+                new_column.flush()
+                del new_column
+                self.columns[name] = column = None
+                os.replace(self._column_file(name) + ".grow", self._column_file(name))
+                new_column = np.memmap(self._column_file(name), dtype=dtype, mode="r+", shape=shape)
+            self.columns[name] = new_column
+        self.capacity = capacity
+
+    def _map(self, name: str, dtype) -> np.ndarray:
+        """Map the existing column file of a restored store, at the capacity the file was grown to"""
+        n_nodes = len(self.lengths)
+        if n_nodes == 0:
+            return np.zeros((0, self.capacity), dtype=dtype)
+        path = self._column_file(name)
+        try:
+            capacity = os.path.getsize(path) // (n_nodes * np.dtype(dtype).itemsize)
+        except FileNotFoundError:
+            raise ValueError(f"Log column file {path} is missing, the logs of this run cannot be resumed") from None
+        if capacity < max(self.lengths):
+            raise ValueError(f"Log column file {path} holds fewer entries than were logged, it was overwritten")
+        self.capacity = capacity
+        return np.memmap(path, dtype=dtype, mode="r+", shape=(n_nodes, capacity))
+
+    def reserve(self, row: int, tick: int, n_entries: int = 1) -> int:
+        """Reserve space for new entries of one node
+
+        Args:
+            row (int): Row of the node in the store
+            tick (int): Tick of the first new entry
+            n_entries (int): Number of consecutive entries to reserve
+
+        Returns:
+            int: Position of the first new entry in the node's row
+        """
+        position = self.lengths[row]
+        if position == 0:
+            self.first_tick[row] = tick
+        if position + n_entries > self.capacity:
+            self._grow(position + n_entries)
+        self.lengths[row] = position + n_entries
+        return position
+
+    def reserve_all(self, tick: int) -> int:
+        """Reserve one entry for every node. All nodes must have logged the same number of entries.
+
+        Args:
+            tick (int): Tick of the new entries
+
+        Returns:
+            int: Position of the new entries
+        """
+        position = self.lengths[0] if self.lengths else 0
+        if position == 0:
+            self.first_tick = [tick] * len(self.lengths)
+        if position + 1 > self.capacity:
+            self._grow(position + 1)
+        self.lengths = [position + 1] * len(self.lengths)
+        return position
+
+    def get_column(self, name: str, row: int) -> np.ndarray:
+        """Logged values of a column for one node (view, not a copy)"""
+        return self.columns[name][row, : self.lengths[row]]
+
+    def get_ticks(self, row: int) -> np.ndarray:
+        """Ticks of the logged entries for one node"""
+        return np.arange(self.first_tick[row], self.first_tick[row] + self.lengths[row])
+
+    def iter_entries(self, max_entries: int = 1 << 22) -> Iterator[dict[str, np.ndarray]]:
+        """Logged entries of consecutive blocks of nodes, as flat columns with the tick and node ID
+
+        Only one block of rows is read at a time, so memory mapped logs are processed without loading them.
+
+        Args:
+            max_entries (int): Approximate number of entries per block (at least one node per block)
+
+        Yields:
+            dict[str, np.ndarray]: tick, id and the log columns for the entries of a block of nodes,
+                ordered by node and tick
+        """
+        lengths = np.asarray(self.lengths, dtype=np.int64)
+        first_tick = np.asarray(self.first_tick, dtype=np.int64)
+        n_logged = int(lengths.max(initial=0))
+        positions = np.arange(n_logged)
+        block_size = max(1, max_entries // max(n_logged, 1))
+        for start in range(0, len(lengths), block_size):
+            stop = min(start + block_size, len(lengths))
+            # Nodes of the event engine may have logged fewer entries than others
+            logged = positions < lengths[start:stop, None]
+            entries = {
+                "tick": (first_tick[start:stop, None] + positions)[logged],
+                "id": np.broadcast_to(np.arange(start, stop, dtype=np.int32)[:, None], logged.shape)[logged],
+            }
+            for name, column in self.columns.items():
+                entries[name] = np.asarray(column[start:stop, :n_logged])[logged]
+            yield entries
+
+    def flush(self):
+        """Write memory mapped columns to disk, with the lengths and first ticks needed to open them again"""
+        if self.path is None:
+            return
+        for column in self.columns.values():
+            if isinstance(column, np.memmap):
+                column.flush()
+        meta = {
+            "n_nodes": len(self.lengths),
+            "capacity": self.capacity,
+            "columns": {name: column.dtype.str for name, column in self.columns.items()},
+            "lengths": self.lengths,
+            "first_tick": self.first_tick,
+        }
+        with open(os.path.join(self.path, "log_store.json"), "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def open(cls, path: str, mode: str = "r") -> "LogStore":
+        """Map the column files of a log store written with a path
+
+        Args:
+            path (str): Directory of the column files
+            mode (str): numpy.memmap mode - "r" (read only) or "r+" (read and write)
+
+        Returns:
+            LogStore: Log store backed by the column files
+        """
+        with open(os.path.join(path, "log_store.json")) as f:
+            meta = json.load(f)
+        store = cls.__new__(cls)
+        store.capacity = meta["capacity"]
+        store.path = path
+        store.lengths = meta["lengths"]
+        store.first_tick = meta["first_tick"]
+        shape = (meta["n_nodes"], meta["capacity"])
+        store.columns = {
+            name: np.memmap(store._column_file(name), dtype=dtype, mode=mode, shape=shape)
+            for name, dtype in meta["columns"].items()
+        }
+        return store
+
+    def clear(self):
+        """Remove all entries, keeping the allocated columns. The next entry of each node sets its first tick."""
+        self.lengths = [0] * len(self.lengths)
+
+    def __getstate__(self):
+        # Only save the logged part of the columns. Memory mapped columns stay in their files and are mapped
+        # again on restore, so a resumed run keeps logging to them.
+        state = self.__dict__.copy()
+        if self.path is not None:
+            self.flush()
+            state["columns"] = {name: column.dtype.str for name, column in self.columns.items()}
+            return state
+        n_logged = max(self.lengths, default=0)
+        state["columns"] = {name: np.array(column[:, :n_logged]) for name, column in self.columns.items()}
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("path", None)
+        self.__dict__.update(state)
+        if self.path is not None:
+            self.columns = {name: self._map(name, dtype) for name, dtype in self.columns.items()}
+            return
+        for name, column in self.columns.items():
+            full_column = np.zeros((column.shape[0], self.capacity), dtype=column.dtype)
+            full_column[:, : column.shape[1]] = column
+            self.columns[name] = full_column
+
+    @property
+    def nbytes(self) -> int:
+        """Memory allocated for the log columns (bytes)"""
+        return sum(column.nbytes for column in self.columns.values())
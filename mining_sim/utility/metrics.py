@@ -0,0 +1,427 @@
+"""Online (streaming) metrics for simulation nodes"""
+
+import logging
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from mining_sim.enums.sim_enums import TruckState
+from mining_sim.utility.log_store import LogStore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_ON_ROAD_TO_MINE = TruckState.OnRoad_ToMine.value
+_AT_MINE = TruckState.AtMine.value
+_ON_ROAD_TO_UNLOAD = TruckState.OnRoad_ToUnload.value
+_UNLOADING = TruckState.Unloading.value
+_NO_STATE = -1
+
+
+class _Counter:
+    """Counter of a group of nodes, read and written as an array with one element per node"""
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return obj._to_arrays()[self.name]
+
+    def __set__(self, obj, value):
+        obj._to_arrays()[self.name] = np.asarray(value, dtype=np.int64)
+
+
+class _NodeCounters:
+    """Integer counters of a group of nodes, one row per node
+
+    Nodes that record themselves one at a time update a list of plain ints per node, as NumPy scalar updates cost
+    more than the rest of the tick. Whole-group updates and reads use one array per counter (see _Counter). The
+    counters switch layout when the access pattern changes, which happens a few times per run at most.
+    """
+
+    _initial: dict[str, int] = {}
+    """Initial value of each counter, in row order"""
+
+    def __init__(self, n: int):
+        self._rows: list[list[int]] | None = None
+        self._arrays: dict[str, np.ndarray] | None = {
+            name: np.full(n, value, dtype=np.int64) for name, value in self._initial.items()
+        }
+
+    def _to_rows(self) -> list[list[int]]:
+        """Counters as one list per node"""
+        if self._rows is None:
+            self._rows = [list(x) for x in zip(*(x.tolist() for x in self._arrays.values()))]
+            self._arrays = None
+        return self._rows
+
+    def _to_arrays(self) -> dict[str, np.ndarray]:
+        """Counters as one array per counter"""
+        if self._arrays is None:
+            columns = list(zip(*self._rows)) or [()] * len(self._initial)
+            self._arrays = {name: np.array(x, dtype=np.int64) for name, x in zip(self._initial, columns)}
+            self._rows = None
+        return self._arrays
+
+
+_TRUCK_COUNTERS = {
+    "ticks": 0,
+    "last_tick": -1,
+    "prev_state": _NO_STATE,
+    "time_mining": 0,
+    "time_onroad": 0,
+    "time_unloading": 0,
+    "time_queued": 0,
+    "mining_trips": 0,
+    "unloads": 0,
+    "roundtrips": 0,
+}
+(
+    _TICKS,
+    _LAST_TICK,
+    _PREV_STATE,
+    _TIME_MINING,
+    _TIME_ONROAD,
+    _TIME_UNLOADING,
+    _TIME_QUEUED,
+    _MINING_TRIPS,
+    _UNLOADS,
+    _ROUNDTRIPS,
+) = range(len(_TRUCK_COUNTERS))
+
+
+class TruckMetrics(_NodeCounters):
+    """Running counters for a group of trucks, updated once per logged tick
+
+    Produces the same values as `compute_fleet_truck_metrics` at the last tick of each truck,
+    without keeping the per-tick log. Each truck is a row, indexed by truck ID.
+    """
+
+    _initial = _TRUCK_COUNTERS
+
+    ticks = _Counter()
+    """Number of ticks recorded"""
+    last_tick = _Counter()
+    """Last tick recorded"""
+    prev_state = _Counter()
+    """State recorded on the previous tick"""
+    time_mining = _Counter()
+    time_onroad = _Counter()
+    time_unloading = _Counter()
+    time_queued = _Counter()
+    mining_trips = _Counter()
+    unloads = _Counter()
+    roundtrips = _Counter()
+
+    def __init__(self, n_trucks: int):
+        """Constructor for truck metrics
+
+        Args:
+            n_trucks (int): Number of trucks
+        """
+        super().__init__(n_trucks)
+
+    def record(self, row: int, tick: int, state: int, n_ticks: int = 1):
+        """Record a truck spending n_ticks in a state
+
+        Args:
+            row (int): Truck row (ID)
+            tick (int): First tick being recorded
+            state (int): TruckState value
+            n_ticks (int): Number of consecutive ticks in this state
+        """
+        counters = (self._rows if self._rows is not None else self._to_rows())[row]
+        prev_state = counters[_PREV_STATE]
+        if state == _AT_MINE:
+            counters[_TIME_MINING] += n_ticks
+            if prev_state == _ON_ROAD_TO_MINE or prev_state == _ON_ROAD_TO_UNLOAD:
+                counters[_ROUNDTRIPS] += 1
+        elif state == _UNLOADING:
+            # Only the first tick at the unloading site is spent unloading, the rest is queued
+            if prev_state == _UNLOADING:
+                counters[_TIME_QUEUED] += n_ticks
+            else:
+                counters[_TIME_UNLOADING] += 1
+                counters[_TIME_QUEUED] += n_ticks - 1
+        else:
+            counters[_TIME_ONROAD] += n_ticks
+            if prev_state == _AT_MINE:
+                counters[_MINING_TRIPS] += 1
+            elif prev_state == _UNLOADING:
+                counters[_UNLOADS] += 1
+
+        counters[_PREV_STATE] = state
+        counters[_TICKS] += n_ticks
+        counters[_LAST_TICK] = tick + n_ticks - 1
+
+    def reset(self):
+        """Discard the recorded ticks, e.g. at the end of a warm-up period
+
+        The last state of each truck is kept, so trips and unloads in progress are counted when they end.
+        """
+        for counter in (
+            self.ticks,
+            self.time_mining,
+            self.time_onroad,
+            self.time_unloading,
+            self.time_queued,
+            self.mining_trips,
+            self.unloads,
+            self.roundtrips,
+        ):
+            counter[:] = 0
+
+    def record_all(self, tick: int, state: np.ndarray):
+        """Record one tick for all trucks
+
+        Args:
+            tick (int): Tick being recorded
+            state (np.ndarray): TruckState value of each truck
+        """
+        prev_state = self.prev_state
+        at_mine = state == _AT_MINE
+        unloading = state == _UNLOADING
+        on_road = ~(at_mine | unloading)
+        prev_on_road = (prev_state == _ON_ROAD_TO_MINE) | (prev_state == _ON_ROAD_TO_UNLOAD)
+        queued = unloading & (prev_state == _UNLOADING)
+
+        self.time_mining += at_mine
+        self.time_onroad += on_road
+        self.time_unloading += unloading & ~queued
+        self.time_queued += queued
+        self.mining_trips += on_road & (prev_state == _AT_MINE)
+        self.unloads += on_road & (prev_state == _UNLOADING)
+        self.roundtrips += at_mine & prev_on_road
+
+        self.prev_state[:] = state
+        self.ticks += 1
+        self.last_tick[:] = tick
+
+    def record_log(self, ids: np.ndarray, ticks: np.ndarray, state: np.ndarray):
+        """Record logged ticks of several trucks, continuing the ticks already recorded for each truck
+
+        Args:
+            ids (np.ndarray): Truck ID of each entry, entries of a truck are consecutive
+            ticks (np.ndarray): Tick of each entry, in increasing order for each truck
+            state (np.ndarray): TruckState value of each entry
+        """
+        if not len(ids):
+            return
+        n_trucks = len(self.ticks)
+        first_row = np.r_[True, ids[1:] != ids[:-1]]
+        last_row = np.r_[ids[1:] != ids[:-1], True]
+        prev_state = np.r_[_NO_STATE, state[:-1]].astype(np.int8)
+        prev_state[first_row] = self.prev_state[ids[first_row]]
+
+        at_mine = state == _AT_MINE
+        unloading = state == _UNLOADING
+        on_road = ~(at_mine | unloading)
+        prev_on_road = (prev_state == _ON_ROAD_TO_MINE) | (prev_state == _ON_ROAD_TO_UNLOAD)
+        queued = unloading & (prev_state == _UNLOADING)
+
+        def count(mask: np.ndarray) -> np.ndarray:
+            return np.bincount(ids[mask], minlength=n_trucks)
+
+        self.time_mining += count(at_mine)
+        self.time_onroad += count(on_road)
+        self.time_unloading += count(unloading & ~queued)
+        self.time_queued += count(queued)
+        self.mining_trips += count(on_road & (prev_state == _AT_MINE))
+        self.unloads += count(on_road & (prev_state == _UNLOADING))
+        self.roundtrips += count(at_mine & prev_on_road)
+
+        self.prev_state[ids[last_row]] = state[last_row]
+        self.ticks += np.bincount(ids, minlength=n_trucks)
+        self.last_tick[ids[last_row]] = ticks[last_row]
+
+    def to_df(self) -> "pd.DataFrame":
+        """Metrics at the last recorded tick of each truck, in the layout of compute_fleet_truck_metrics
+
+        Returns:
+            pd.DataFrame: One row per truck (tick, id, Time_* and *_Completed columns)
+        """
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "tick": self.last_tick,
+                "id": np.arange(len(self.ticks)),
+                "Time_Mining": self.time_mining,
+                "Time_OnRoad": self.time_onroad,
+                "Time_Unloading": self.time_unloading,
+                "Time_Queued": self.time_queued,
+                "Mining_Trips_Completed": self.mining_trips,
+                "Unloads_Completed": self.unloads,
+                "Roundtrips_Completed": self.roundtrips,
+            }
+        )
+
+    def summary(self) -> dict:
+        """Average truck stats across all trucks (same values as printed by compute_cumulative_truck_stats)"""
+        total_time = self.time_mining + self.time_onroad + self.time_unloading + self.time_queued
+        return {
+            "Mining_pct": float(np.mean(self.time_mining / total_time * 100)),
+            "OnRoad_pct": float(np.mean(self.time_onroad / total_time * 100)),
+            "Unloading_pct": float(np.mean(self.time_unloading / total_time * 100)),
+            "Queued_pct": float(np.mean(self.time_queued / total_time * 100)),
+            "Efficiency_pct": float(np.mean((total_time - self.time_queued) / total_time * 100)),
+            "Helium_Unloads": float(np.mean(self.time_unloading)),
+        }
+
+
+_STATION_COUNTERS = {"ticks": 0, "wait_time_sum": 0, "wait_time_max": 0, "ticks_queued": 0}
+_STATION_TICKS, _WAIT_TIME_SUM, _WAIT_TIME_MAX, _TICKS_QUEUED = range(len(_STATION_COUNTERS))
+
+
+class StationMetrics(_NodeCounters):
+    """Running counters for a group of unloading stations, updated once per logged tick
+
+    Produces the same values as `compute_station_metrics` without keeping the per-tick log.
+    Each station is a row, indexed by station ID.
+    """
+
+    _initial = _STATION_COUNTERS
+
+    ticks = _Counter()
+    """Number of ticks recorded"""
+    wait_time_sum = _Counter()
+    """Sum of wait times over all recorded ticks"""
+    wait_time_max = _Counter()
+    """Maximum wait time over all recorded ticks"""
+    ticks_queued = _Counter()
+    """Number of ticks with a wait time greater than 2"""
+
+    def __init__(self, m_stations: int):
+        """Constructor for station metrics
+
+        Args:
+            m_stations (int): Number of unloading stations
+        """
+        super().__init__(m_stations)
+
+    def record(self, row: int, wait_time: int, n_ticks: int = 1):
+        """Record a station with the same wait time for n_ticks
+
+        Args:
+            row (int): Station row (ID)
+            wait_time (int): Wait time at the end of the tick
+            n_ticks (int): Number of consecutive ticks with this wait time
+        """
+        counters = (self._rows if self._rows is not None else self._to_rows())[row]
+        counters[_STATION_TICKS] += n_ticks
+        counters[_WAIT_TIME_SUM] += wait_time * n_ticks
+        if wait_time > counters[_WAIT_TIME_MAX]:
+            counters[_WAIT_TIME_MAX] = wait_time
+        if wait_time > 2:
+            counters[_TICKS_QUEUED] += n_ticks
+
+    def reset(self):
+        """Discard the recorded ticks, e.g. at the end of a warm-up period"""
+        for counter in (self.ticks, self.wait_time_sum, self.wait_time_max, self.ticks_queued):
+            counter[:] = 0
+
+    def record_all(self, wait_time: np.ndarray):
+        """Record one tick for all stations
+
+        Args:
+            wait_time (np.ndarray): Wait time of each station at the end of the tick
+        """
+        self.ticks += 1
+        self.wait_time_sum += wait_time
+        np.maximum(self.wait_time_max, wait_time, out=self.wait_time_max)
+        self.ticks_queued += wait_time > 2
+
+    def record_log(self, ids: np.ndarray, wait_time: np.ndarray):
+        """Record logged ticks of several stations
+
+        Args:
+            ids (np.ndarray): Station ID of each entry
+            wait_time (np.ndarray): Wait time of each entry
+        """
+        m_stations = len(self.ticks)
+        self.ticks += np.bincount(ids, minlength=m_stations)
+        self.wait_time_sum += np.bincount(ids, weights=wait_time, minlength=m_stations).astype(np.int64)
+        np.maximum.at(self.wait_time_max, ids, wait_time)
+        self.ticks_queued += np.bincount(ids[wait_time > 2], minlength=m_stations)
+
+    def summary(self) -> dict:
+        """Average station stats across all stations (same values as printed by save_station_stats)"""
+        return {
+            "average_wait_time": float(np.mean(self.wait_time_sum / self.ticks)),
+            "max_wait_time": float(np.mean(self.wait_time_max)),
+            "efficiency_pct": float(np.mean((1 - self.ticks_queued / self.ticks) * 100)),
+        }
+
+    def to_results(self) -> list[dict]:
+        """Station metrics in the format of compute_station_metrics (station_stats.json)"""
+        results = []
+        for station_id, (ticks, wait_time_sum, wait_time_max, ticks_queued) in enumerate(
+            zip(
+                self.ticks.tolist(),
+                self.wait_time_sum.tolist(),
+                self.wait_time_max.tolist(),
+                self.ticks_queued.tolist(),
+            )
+        ):
+            results.append(
+                {
+                    "station_id": station_id,
+                    "average_wait_time": float(wait_time_sum / ticks),
+                    "max_wait_time": float(wait_time_max),
+                    "efficiency_pct": float((1 - (ticks_queued / ticks)) * 100),
+                }
+            )
+        return results
+
+
+def compute_chunked_metrics(
+    truck_chunks, station_chunks, n_trucks: int, m_stations: int
+) -> tuple[TruckMetrics, StationMetrics]:
+    """Compute truck and station metrics from logs read one chunk at a time
+
+    Chunks are only read once, so logs larger than memory (memory mapped log stores, log files) are analyzed
+    without loading them. The entries of a node must be in tick order, across chunks.
+
+    Args:
+        truck_chunks (Iterable): Truck log chunks with id, tick and state (state code) columns
+        station_chunks (Iterable): Station log chunks with id and wait_time columns
+        n_trucks (int): Number of trucks
+        m_stations (int): Number of unloading stations
+
+    Returns:
+        tuple[TruckMetrics, StationMetrics]: Metrics at the last logged tick of each node, in the layout of the
+            online metrics (TruckMetrics.to_df() has the columns of compute_fleet_truck_metrics)
+    """
+    truck_metrics = TruckMetrics(n_trucks)
+    for chunk in truck_chunks:
+        truck_metrics.record_log(np.asarray(chunk["id"]), np.asarray(chunk["tick"]), np.asarray(chunk["state"]))
+    station_metrics = StationMetrics(m_stations)
+    for chunk in station_chunks:
+        station_metrics.record_log(np.asarray(chunk["id"]), np.asarray(chunk["wait_time"]))
+    return truck_metrics, station_metrics
+
+
+def compute_log_store_metrics(
+    truck_log: LogStore, station_log: LogStore, max_entries: int = 1 << 22
+) -> tuple[TruckMetrics, StationMetrics]:
+    """Compute truck and station metrics from log stores, one block of nodes at a time
+
+    Args:
+        truck_log (LogStore): Truck log store, e.g. memory mapped with LogStore.open()
+        station_log (LogStore): Station log store
+        max_entries (int): Approximate number of log entries read at a time
+
+    Returns:
+        tuple[TruckMetrics, StationMetrics]: See compute_chunked_metrics
+    """
+    return compute_chunked_metrics(
+        truck_log.iter_entries(max_entries),
+        station_log.iter_entries(max_entries),
+        len(truck_log.lengths),
+        len(station_log.lengths),
+    )
@@ -0,0 +1,141 @@
+"""Per-phase timing of simulation ticks and analysis"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseProfiler:
+    """Wall time, call counts and items processed for each phase of the simulation
+
+    A tick is measured as a sequence of laps: `start_tick()` starts the clock, each `lap(phase, items)`
+    records the time since the previous lap under `phase`, and `end_tick(tick)` closes the tick at its last lap. Phases
+    outside of ticks (analysis) are measured with the `measure(phase)` context manager.
+    """
+
+    def __init__(self, callback: Callable[[int, dict[str, float]], None] | None = None):
+        """Constructor for the phase profiler
+
+        Args:
+            callback (Callable): Called as callback(tick, phase_seconds) at the end of every tick,
+                with the wall time (seconds) of each phase in that tick
+        """
+        self.callback = callback
+        """Per tick callback"""
+        self.seconds: dict[str, float] = {}
+        """Cumulative wall time of each phase (seconds)"""
+        self.calls: dict[str, int] = {}
+        """Number of times each phase was run"""
+        self.items: dict[str, int] = {}
+        """Number of items (trucks, stations) processed by each phase"""
+        self.max_seconds: dict[str, float] = {}
+        """Longest single run of each phase (seconds)"""
+        self.tick_seconds: list[float] = []
+        """Wall time of each tick (seconds)"""
+        self._tick_start = 0.0
+        self._lap_start = 0.0
+        self._tick_phases: dict[str, float] = {}
+        self._lap_phases: set[str] = set()
+
+    def __getstate__(self):
+        # Callbacks are not saved with simulation snapshots
+        state = self.__dict__.copy()
+        state["callback"] = None
+        return state
+
+    def record(self, phase: str, seconds: float, items: int = 0):
+        """Add one run of a phase"""
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        self.items[phase] = self.items.get(phase, 0) + items
+        if seconds > self.max_seconds.get(phase, 0.0):
+            self.max_seconds[phase] = seconds
+
+    def start_tick(self):
+        """Start timing a tick"""
+        self._tick_start = self._lap_start = time.perf_counter()
+        self._tick_phases = {}
+
+    def lap(self, phase: str, items: int = 0):
+        """Record the time since the previous lap (or the start of the tick) under `phase`"""
+        now = time.perf_counter()
+        seconds = now - self._lap_start
+        self._lap_start = now
+        self._tick_phases[phase] = seconds
+        self._lap_phases.add(phase)
+        self.record(phase, seconds, items)
+
+    def end_tick(self, tick: int):
+        """Finish timing a tick and call the per tick callback"""
+        # The tick ends with its last lap
+        self.tick_seconds.append(self._lap_start - self._tick_start)
+        if self.callback is not None:
+            self.callback(tick, self._tick_phases)
+
+    @contextmanager
+    def measure(self, phase: str, items: int = 0):
+        """Context manager recording the wall time of the enclosed block under `phase`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start, items)
+
+    def report(self) -> dict:
+        """Structured timing report
+
+        Returns:
+            dict: "ticks" (count, total, mean, p50, p95 and max seconds per tick) and "phases" (for each phase:
+                seconds, share of tick time for tick phases, calls, items, mean/max seconds per call and items/sec)
+        """
+        tick_seconds = np.asarray(self.tick_seconds)
+        total_tick_seconds = float(tick_seconds.sum())
+        ticks = {"count": len(tick_seconds), "total_s": total_tick_seconds}
+        if len(tick_seconds):
+            ticks.update(
+                {
+                    "mean_s": float(tick_seconds.mean()),
+                    "p50_s": float(np.percentile(tick_seconds, 50)),
+                    "p95_s": float(np.percentile(tick_seconds, 95)),
+                    "max_s": float(tick_seconds.max()),
+                }
+            )
+
+        phases = {}
+        for phase, seconds in self.seconds.items():
+            calls, items = self.calls[phase], self.items[phase]
+            phases[phase] = {
+                "seconds": seconds,
+                "tick_pct": (
+                    100 * seconds / total_tick_seconds if phase in self._lap_phases and total_tick_seconds > 0 else None
+                ),
+                "calls": calls,
+                "items": items,
+                "mean_s": seconds / calls,
+                "max_s": self.max_seconds.get(phase, 0.0),
+                "items_per_s": items / seconds if items and seconds > 0 else None,
+            }
+        return {"ticks": ticks, "phases": phases}
+
+    def format_report(self) -> str:
+        """Report as a text table"""
+        report = self.report()
+        lines = [f"{'phase':<24} {'seconds':>10} {'% tick':>7} {'calls':>8} {'items':>10} {'mean (us)':>10}"]
+        for phase, stats in report["phases"].items():
+            tick_pct = "" if stats["tick_pct"] is None else f"{stats['tick_pct']:.1f}"
+            lines.append(
+                f"{phase:<24} {stats['seconds']:>10.4f} {tick_pct:>7} {stats['calls']:>8} "
+                f"{stats['items']:>10} {1e6 * stats['mean_s']:>10.1f}"
+            )
+        ticks = report["ticks"]
+        if ticks["count"]:
+            lines.append(
+                f"{ticks['count']} ticks in {ticks['total_s']:.4f} s (mean {1e6 * ticks['mean_s']:.1f} us, "
+                f"p95 {1e6 * ticks['p95_s']:.1f} us, max {1e6 * ticks['max_s']:.1f} us)"
+            )
+        return "\n".join(lines)
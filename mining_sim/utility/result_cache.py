@@ -0,0 +1,308 @@
+"""Content-addressed on-disk cache of simulation results
+
+An entry is keyed by a hash of everything that determines the results of a run: the simulator arguments, the
+seed, the source code of the mining_sim package and the NumPy version (random streams). Each entry is stored as:
+    <key>.json: summary metrics (MiningSimulator.summarize) and the final tick
+    <key>.metrics.npz: per truck and per station running metrics, from which the stats files are written
+    <key>.logs.npz: per tick logs, compressed (optional, log metrics mode)
+
+Files are written to a temporary name and renamed, and the summary is renamed last, so readers in other processes
+only see complete entries. Reads refresh the modification time of the summary, and puts evict the least recently
+used entries once the cache is larger than max_bytes. Files removed by another process while reading count as
+a miss.
+
+Usage:
+    cache = ResultCache("~/.cache/mining_sim", max_bytes=2**30)
+    sim = MiningSimulator(n_trucks=500, m_stations=20, seed=1, cache=cache)
+    sim.run()  # Restores the metrics instead of simulating if the same run is cached
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from mining_sim.utility.log_store import LogStore
+from mining_sim.utility.metrics import StationMetrics, TruckMetrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+"""Version of the cache entry format, part of every key"""
+
+CACHE_ENV = "MINING_SIM_CACHE"
+"""Environment variable with the cache directory of batch runners (see ResultCache.from_env)"""
+
+_TRUCK_COUNTERS = (
+    "ticks",
+    "last_tick",
+    "prev_state",
+    "time_mining",
+    "time_onroad",
+    "time_unloading",
+    "time_queued",
+    "mining_trips",
+    "unloads",
+    "roundtrips",
+)
+_STATION_COUNTERS = ("ticks", "wait_time_sum", "wait_time_max", "ticks_queued")
+_STALE_TEMP_S = 3600
+"""Age after which temporary files of interrupted writes are removed by eviction (seconds)"""
+
+
+@functools.cache
+def code_version() -> str:
+    """Hash of the source files of the mining_sim package and of the NumPy version, computed once per process"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256(np.__version__.encode())
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, root).encode())
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def cache_key(config: dict) -> str:
+    """Key of a simulation run
+
+    Args:
+        config (dict): JSON serializable arguments that determine the results (see MiningSimulator.cache_config)
+
+    Returns:
+        str: Hex digest of the config, the code version and the cache format
+    """
+    data = {"config": config, "code": code_version(), "format": CACHE_FORMAT_VERSION}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """Size-bounded LRU cache of simulation results on local disk, shared by processes"""
+
+    def __init__(self, path: str, max_bytes: int = 1 << 30, include_logs: bool = False):
+        """Constructor for the result cache
+
+        Args:
+            path (str): Cache directory (created if needed)
+            max_bytes (int): Size above which the least recently used entries are evicted
+            include_logs (bool): Also store the per tick logs of log metrics runs, and only use entries with logs
+                for them
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        self.path = os.path.abspath(os.path.expanduser(path))
+        """Cache directory"""
+        self.max_bytes = max_bytes
+        """Size above which entries are evicted (bytes)"""
+        self.include_logs = include_logs
+        """Store and require the per tick logs of log metrics runs"""
+        self.hits = 0
+        """Number of lookups found in the cache"""
+        self.misses = 0
+        """Number of lookups not found in the cache"""
+        os.makedirs(self.path, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "ResultCache | None":
+        """Cache in the directory of the MINING_SIM_CACHE environment variable (None if it is not set)"""
+        path = os.environ.get(CACHE_ENV)
+        return cls(path) if path else None
+
+    def _file(self, key: str, suffix: str) -> str:
+        return os.path.join(self.path, key[:2], key + suffix)
+
+    def get(self, key: str) -> dict | None:
+        """Summary of a cached run
+
+        Args:
+            key (str): Key of the run (see cache_key)
+
+        Returns:
+            dict | None: summary (summary metrics) and tick (final tick), None if the run is not cached
+        """
+        path = self._file(key, ".json")
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def get_metrics(self, key: str) -> tuple[TruckMetrics, StationMetrics] | None:
+        """Truck and station metrics of a cached run (None if the run is not cached)"""
+        try:
+            with np.load(self._file(key, ".metrics.npz")) as data:
+                truck_metrics = TruckMetrics(len(data["truck_ticks"]))
+                for name in _TRUCK_COUNTERS:
+                    setattr(truck_metrics, name, data[f"truck_{name}"])
+                station_metrics = StationMetrics(len(data["station_ticks"]))
+                for name in _STATION_COUNTERS:
+                    setattr(station_metrics, name, data[f"station_{name}"])
+        except (FileNotFoundError, OSError, KeyError, ValueError):
+            return None
+        return truck_metrics, station_metrics
+
+    def get_logs(self, key: str, truck_log: LogStore, station_log: LogStore) -> bool:
+        """Restore the logs of a cached run into log stores, in place
+
+        Args:
+            key (str): Key of the run
+            truck_log (LogStore): Truck log store of the simulation
+            station_log (LogStore): Station log store of the simulation
+
+        Returns:
+            bool: True if the logs were cached and restored
+        """
+        try:
+            with np.load(self._file(key, ".logs.npz")) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return False
+        for prefix, store in (("truck", truck_log), ("station", station_log)):
+            columns = {name: arrays[f"{prefix}/{name}"] for name in store.columns}
+            n_logged = max((x.shape[1] for x in columns.values()), default=0)
+            store.__setstate__(
+                {
+                    "capacity": max(store.capacity, n_logged),
+                    "path": None,
+                    "columns": columns,
+                    "lengths": arrays[f"{prefix}_lengths"].tolist(),
+                    "first_tick": arrays[f"{prefix}_first_tick"].tolist(),
+                }
+            )
+        return True
+
+    def put(
+        self,
+        key: str,
+        summary: dict,
+        tick: int,
+        truck_metrics: TruckMetrics,
+        station_metrics: StationMetrics,
+        truck_log: LogStore | None = None,
+        station_log: LogStore | None = None,
+    ):
+        """Store the results of a run, then evict the least recently used entries if the cache is too large
+
+        Args:
+            key (str): Key of the run (see cache_key)
+            summary (dict): Summary metrics (see MiningSimulator.summarize)
+            tick (int): Final tick of the run
+            truck_metrics (TruckMetrics): Truck metrics of the run
+            station_metrics (StationMetrics): Station metrics of the run
+            truck_log (LogStore): Truck logs, stored if include_logs
+            station_log (LogStore): Station logs, stored if include_logs
+        """
+        os.makedirs(os.path.join(self.path, key[:2]), exist_ok=True)
+        metrics = {f"truck_{x}": getattr(truck_metrics, x) for x in _TRUCK_COUNTERS}
+        metrics.update({f"station_{x}": getattr(station_metrics, x) for x in _STATION_COUNTERS})
+        self._write(self._file(key, ".metrics.npz"), lambda f: np.savez_compressed(f, **metrics))
+
+        if self.include_logs and truck_log is not None and station_log is not None:
+            logs = {}
+            for prefix, store in (("truck", truck_log), ("station", station_log)):
+                state = store.__getstate__()
+                logs.update({f"{prefix}/{name}": column for name, column in state["columns"].items()})
+                logs[f"{prefix}_lengths"] = np.asarray(store.lengths, dtype=np.int64)
+                logs[f"{prefix}_first_tick"] = np.asarray(store.first_tick, dtype=np.int64)
+            self._write(self._file(key, ".logs.npz"), lambda f: np.savez_compressed(f, **logs))
+
+        # The summary is written last: its presence marks a complete entry
+        entry = {"summary": summary, "tick": tick}
+        self._write(self._file(key, ".json"), lambda f: f.write(json.dumps(entry).encode()))
+        self.evict()
+
+    def _write(self, path: str, write):
+        """Write a file atomically: to a temporary file in the same directory, then renamed"""
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _scan(self) -> tuple[dict[str, list], int]:
+        """Files of each entry (and stale temporary files under the key ""), and the total size"""
+        entries: dict[str, list] = {}
+        total = 0
+        now = time.time()
+        for directory in os.scandir(self.path):
+            if not directory.is_dir():
+                continue
+            for file in os.scandir(directory.path):
+                try:
+                    stat = file.stat()
+                except FileNotFoundError:
+                    continue
+                if file.name.startswith(".tmp-"):
+                    if now - stat.st_mtime > _STALE_TEMP_S:
+                        entries.setdefault("", []).append((file.path, stat))
+                    continue
+                total += stat.st_size
+                entries.setdefault(file.name.split(".")[0], []).append((file.path, stat))
+        return entries, total
+
+    def size(self) -> int:
+        """Total size of the cached entries (bytes)"""
+        return self._scan()[1]
+
+    def evict(self, max_bytes: int | None = None) -> int:
+        """Remove the least recently used entries until the cache is within max_bytes
+
+        Args:
+            max_bytes (int): Size to evict to (defaults to the max_bytes of the cache)
+
+        Returns:
+            int: Number of entries removed
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries, total = self._scan()
+        for path, _ in entries.pop("", []):
+            _remove(path)
+        if total <= max_bytes:
+            return 0
+
+        def last_used(files: list) -> float:
+            # Entries without a summary are incomplete (being written or partly removed): oldest data file
+            summaries = [stat.st_mtime for path, stat in files if path.endswith(".json")]
+            return summaries[0] if summaries else min(stat.st_mtime for _, stat in files)
+
+        n_removed = 0
+        for key, files in sorted(entries.items(), key=lambda x: last_used(x[1])):
+            if total <= max_bytes:
+                break
+            # Remove the summary first, so that the entry is a miss for readers
+            for path, stat in sorted(files, key=lambda x: not x[0].endswith(".json")):
+                _remove(path)
+                total -= stat.st_size
+            n_removed += 1
+        logger.debug(f"Evicted {n_removed} cache entries, {total} bytes left")
+        return n_removed
+
+    def clear(self):
+        """Remove all entries"""
+        self.evict(0)
+
+
+def _remove(path: str):
+    """Remove a file that another process may have removed already"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
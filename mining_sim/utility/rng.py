@@ -0,0 +1,69 @@
+"""Random number streams for the simulation"""
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MIN_MINING_STEPS = 2
+"""Minimum mining time in 30-minute steps (1 hour)"""
+MAX_MINING_STEPS = 10
+"""Maximum mining time in 30-minute steps (5 hours)"""
+TICKS_PER_MINING_STEP = 6
+"""Ticks per 30-minute mining step"""
+
+
+class MiningDurationSampler:
+    """Mining durations drawn in pre-generated blocks from a NumPy random generator
+
+    Durations are generated block by block, so the sequence of durations only depends on
+    the generator and not on whether they are taken one at a time (`next()`) or in batches
+    (`take()`). This keeps all simulation engines on the same random stream.
+    """
+
+    def __init__(self, rng: int | np.random.Generator | None = None, block_size: int = 4096):
+        """Constructor for the mining duration sampler
+
+        Args:
+            rng (int | np.random.Generator): Seed or generator for the random stream. None for an unseeded stream.
+            block_size (int): Number of durations generated at a time
+        """
+        self.rng = np.random.default_rng(rng)
+        """Random generator for mining durations"""
+        self.block_size = block_size
+        """Number of durations generated at a time"""
+        self._block = np.empty(0, dtype=np.int64)
+        self._block_list: list[int] = []
+        self._position = 0
+
+    def _refill(self):
+        """Generate the next block of durations"""
+        steps = self.rng.integers(MIN_MINING_STEPS, MAX_MINING_STEPS + 1, size=self.block_size)
+        self._block = TICKS_PER_MINING_STEP * steps
+        self._block_list = self._block.tolist()
+        self._position = 0
+
+    def next(self) -> int:
+        """Next mining duration (in ticks)"""
+        if self._position == len(self._block_list):
+            self._refill()
+        duration = self._block_list[self._position]
+        self._position += 1
+        return duration
+
+    def take(self, n: int) -> np.ndarray:
+        """Next n mining durations (in ticks)"""
+        chunks = []
+        while n > 0:
+            if self._position == len(self._block):
+                self._refill()
+            chunk = self._block[self._position : self._position + n]
+            self._position += len(chunk)
+            n -= len(chunk)
+            chunks.append(chunk)
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+
+DEFAULT_SAMPLER = MiningDurationSampler()
+"""Unseeded sampler for trucks created outside of a simulator"""
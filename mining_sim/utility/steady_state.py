@@ -0,0 +1,197 @@
+"""Steady-state detection with warm-up deletion and early termination
+
+All trucks start empty at the mine, so the first hours of a run are a transient (no queues, then a burst of
+arrivals at the unloading site) that skews the averages of the whole run. A `SteadyStateDetector` attached to
+a simulation with online metrics observes hourly batch means of fleet-level series:
+    queue_length: average number of trucks waiting per station
+    utilization: fraction of station time spent unloading a truck
+    throughput: unloads completed per hour
+
+Once the Marginal Standard Error Rule (MSER) places the end of the warm-up in the first half of every series,
+the online metrics are reset, so the reported KPIs (summarize(), truck and station stats) only cover the
+steady state. With `stop_when_stable`, the run then ends as soon as the batch means confidence interval of
+every series is within the requested precision.
+
+Usage:
+    sim = MiningSimulator(..., metrics="online", steady_state=SteadyStateDetector(stop_when_stable=True))
+    sim.run()
+    sim.summarize()  # KPIs after the warm-up
+    sim.steady_state.report()
+"""
+
+import logging
+
+import numpy as np
+
+from mining_sim.utility.intervals import batch_means_interval, mser_truncation
+from mining_sim.utility.metrics import TruckMetrics, StationMetrics
+
+logger = logging.getLogger(__name__)
+
+STEADY_STATE_SERIES = ("queue_length", "utilization", "throughput")
+"""Fleet-level series observed by the steady-state detector"""
+
+DEFAULT_ABS_PRECISION = {"queue_length": 0.05}
+"""Default maximum half-width of series whose mean can be close to 0 (trucks waiting per station)"""
+
+
+def _fleet_totals(truck_metrics: TruckMetrics, station_metrics: StationMetrics) -> np.ndarray:
+    """Cumulative station ticks, wait time, ticks unloading and unloads of the fleet"""
+    return np.array(
+        [
+            station_metrics.ticks.sum(),
+            station_metrics.wait_time_sum.sum(),
+            truck_metrics.time_unloading.sum(),
+            truck_metrics.unloads.sum(),
+        ],
+        dtype=np.float64,
+    )
+
+
+class SteadyStateDetector:
+    """Detects the end of the warm-up of a simulation and, optionally, when its estimates are stable
+
+    Pass it to `MiningSimulator(..., metrics="online", steady_state=SteadyStateDetector())`. The simulator calls
+    observe() after every tick of run().
+    """
+
+    def __init__(
+        self,
+        batch_hr: float = 1,
+        min_batches: int = 10,
+        stop_when_stable: bool = False,
+        min_steady_hr: float = 24,
+        rel_precision: float = 0.05,
+        abs_precision: dict[str, float] | None = None,
+        confidence: float = 0.95,
+        n_batches: int = 10,
+    ):
+        """Constructor for the steady-state detector
+
+        Args:
+            batch_hr (float): Simulated time of each observation (hours)
+            min_batches (int): Observations before the warm-up can end
+            stop_when_stable (bool): End the run once the estimates of all series are within the precision
+            min_steady_hr (float): Simulated time after the warm-up before the run can stop (hours), so that
+                the batches are long compared to a truck cycle
+            rel_precision (float): Maximum confidence interval half-width relative to the mean of a series
+            abs_precision (dict[str, float]): Maximum half-width of some series, in the units of the series
+                (for means close to 0, e.g. the queue length with many stations). Defaults to
+                DEFAULT_ABS_PRECISION.
+            confidence (float): Confidence level of the intervals
+            n_batches (int): Number of batches of the batch means intervals
+        """
+        if batch_hr <= 0:
+            raise ValueError(f"batch_hr must be positive, got {batch_hr}")
+        if min_batches < 5:
+            raise ValueError(f"min_batches must be at least 5, got {min_batches}")
+        if n_batches < 2:
+            raise ValueError(f"n_batches must be at least 2, got {n_batches}")
+        if abs_precision is None:
+            abs_precision = DEFAULT_ABS_PRECISION
+        unknown = set(abs_precision) - set(STEADY_STATE_SERIES)
+        if unknown:
+            raise ValueError(f"Unknown series: {sorted(unknown)}. Expected some of {STEADY_STATE_SERIES}")
+        self.batch_ticks = max(1, int(batch_hr * 60 / 5))
+        """Simulated time of each observation (ticks)"""
+        self.min_batches = min_batches
+        """Observations required before the warm-up can end"""
+        self.stop_when_stable = stop_when_stable
+        """End the run once the estimates are stable"""
+        self.min_steady_batches = max(n_batches, int(min_steady_hr * 60 / 5) // self.batch_ticks)
+        """Observations required after the warm-up before the estimates are available"""
+        self.rel_precision = rel_precision
+        """Maximum half-width relative to the mean"""
+        self.abs_precision = dict(abs_precision)
+        """Maximum half-width of some series"""
+        self.confidence = confidence
+        """Confidence level of the intervals"""
+        self.n_batches = n_batches
+        """Number of batches of the batch means intervals"""
+        self.warmup_tick: int | None = None
+        """Tick at which the metrics were reset (None while warming up)"""
+        self.stable_tick: int | None = None
+        """Tick at which the estimates were stable (None if not reached)"""
+        self.series: dict[str, list[float]] = {name: [] for name in STEADY_STATE_SERIES}
+        """Batch means of each series (since the warm-up once it has ended)"""
+        self._totals = np.zeros(4)
+
+    def observe(self, sim) -> bool:
+        """Record a batch mean every batch_ticks, ending the warm-up or checking stability (called by the simulator)
+
+        Args:
+            sim (MiningSimulator): Simulation with online metrics, after a tick
+
+        Returns:
+            bool: True if the run should stop because the estimates are stable
+        """
+        if sim.current_tick % self.batch_ticks != 0 or self.stable_tick is not None:
+            return False
+        sim.sync_nodes()
+        totals = _fleet_totals(sim.truck_metrics, sim.station_metrics)
+        station_ticks, wait_time, unloading, unloads = totals - self._totals
+        self._totals = totals
+        self.series["queue_length"].append(wait_time / station_ticks)
+        self.series["utilization"].append(unloading / station_ticks)
+        self.series["throughput"].append(unloads / (self.batch_ticks * 5 / 60))
+
+        n = len(self.series["queue_length"])
+        if n < self.min_batches:
+            return False
+        if self.warmup_tick is None:
+            if all(mser_truncation(values) <= n // 2 for values in self.series.values()):
+                self._end_warmup(sim)
+            return False
+        if self.stop_when_stable and self.is_stable():
+            self.stable_tick = sim.current_tick
+            logger.info(f"Steady-state estimates stable at T={self.stable_tick}")
+            return True
+        return False
+
+    def _end_warmup(self, sim):
+        self.warmup_tick = sim.current_tick
+        sim.truck_metrics.reset()
+        sim.station_metrics.reset()
+        self._totals = np.zeros(4)
+        self.series = {name: [] for name in STEADY_STATE_SERIES}
+        logger.info(f"Warm-up ended at T={self.warmup_tick}, metrics reset")
+
+    def estimates(self) -> dict:
+        """Mean and confidence interval half-width of each series since the warm-up (batch means)
+
+        Returns:
+            dict: {series: (mean, half_width)}, empty until there are min_steady_batches observations after the
+                warm-up
+        """
+        if self.warmup_tick is None or len(self.series["queue_length"]) < self.min_steady_batches:
+            return {}
+        return {
+            name: batch_means_interval(values, self.n_batches, self.confidence) for name, values in self.series.items()
+        }
+
+    def is_stable(self) -> bool:
+        """Whether the estimate of every series is within the requested precision"""
+        estimates = self.estimates()
+        if not estimates:
+            return False
+        return all(
+            half_width <= self.rel_precision * abs(mean) or half_width <= self.abs_precision.get(name, 0)
+            for name, (mean, half_width) in estimates.items()
+        )
+
+    def report(self) -> dict:
+        """Warm-up end, stable tick and steady-state estimates
+
+        Returns:
+            dict: warmup_tick, stable_tick, batches (observations since the warm-up) and
+                <series>_mean / <series>_half_width for each series once estimates are available
+        """
+        report = {
+            "warmup_tick": self.warmup_tick,
+            "stable_tick": self.stable_tick,
+            "batches": len(self.series["queue_length"]) if self.warmup_tick is not None else 0,
+        }
+        for name, (mean, half_width) in self.estimates().items():
+            report[f"{name}_mean"] = mean
+            report[f"{name}_half_width"] = half_width
+        return report
@@ -0,0 +1,215 @@
+"""Structured tracing of simulation events
+
+Trucks, stations and engines emit typed events only when a `Tracer` is attached, so normal runs
+pay a single `is None` check on the code paths where events happen. Events are kept in a bounded
+ring buffer (the most recent `capacity` events) or streamed to a binary trace file.
+
+Usage:
+    tracer = sim.enable_tracing(path="trace.bin", trucks={42})
+    sim.run()
+    sim.disable_tracing()
+
+    python -m mining_sim.utility.tracing trace.bin [--truck 42] [--station N] [--event Dequeue] [--limit N]
+"""
+
+import argparse
+import logging
+from enum import IntEnum
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from mining_sim.enums.sim_enums import TruckState
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TRACE_MAGIC = b"MSIMTRC1"
+"""Header of a binary trace file"""
+
+TRACE_DTYPE = np.dtype(
+    [("tick", "<i8"), ("event", "u1"), ("truck", "<i4"), ("station", "<i4"), ("arg0", "<i4"), ("arg1", "<i4")]
+)
+"""Record layout of a trace event (-1 for unused fields)"""
+
+
+class TraceEvent(IntEnum):
+    """Traced event types
+
+    StateTransition: truck changed state. station: unload site before the transition,
+        arg0: previous state code, arg1: new state code
+    Enqueue: truck entered the unload queue of station. arg0: queue length after the truck was added
+    Dequeue: truck finished unloading at station. arg0: queue length after the truck left
+    Assignment: truck was assigned to station
+    """
+
+    StateTransition = 0
+    Enqueue = 1
+    Dequeue = 2
+    Assignment = 3
+
+
+class Tracer:
+    """Bounded buffer of trace events, optionally streamed to a binary file
+
+    Without a file, the buffer is a ring: once `capacity` events have been recorded, each new event
+    replaces the oldest one. With a file, the buffer is written to the file whenever it is full.
+    """
+
+    def __init__(self, capacity: int = 65536, path: str | None = None, trucks=None, stations=None):
+        """Constructor for the tracer
+
+        Args:
+            capacity (int): Number of events kept in memory
+            path (str): Binary trace file. Events are appended to it when the buffer is full and on flush()
+            trucks (Iterable[int]): Only record events of these truck IDs (all trucks if None)
+            stations (Iterable[int]): Only record events of these station IDs (all stations if None)
+        """
+        if capacity < 1:
+            raise ValueError(f"Trace capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        """Number of events kept in memory"""
+        self.path = path
+        """Binary trace file (None for an in-memory ring buffer)"""
+        self.trucks: set[int] | None = None if trucks is None else set(trucks)
+        """Truck IDs to record (None for all)"""
+        self.stations: set[int] | None = None if stations is None else set(stations)
+        """Station IDs to record (None for all)"""
+        self.n_events = 0
+        """Number of events recorded"""
+        self.dropped = 0
+        """Number of events overwritten in the ring buffer"""
+        self._buffer: list[tuple] = [None] * capacity
+        self._position = 0
+        self._size = 0
+        self._file = None
+        if path is not None:
+            self._file = open(path, "wb")
+            self._file.write(TRACE_MAGIC)
+
+    def __getstate__(self):
+        # Trace files are not saved with simulation snapshots
+        state = self.__dict__.copy()
+        state["path"] = state["_file"] = None
+        return state
+
+    def _accept(self, truck: int, station: int) -> bool:
+        return (self.trucks is None or truck in self.trucks) and (self.stations is None or station in self.stations)
+
+    def emit(self, tick: int, event: TraceEvent, truck: int, station: int = -1, arg0: int = -1, arg1: int = -1):
+        """Record one event"""
+        if (self.trucks is not None or self.stations is not None) and not self._accept(truck, station):
+            return
+        if self._position == self.capacity:
+            if self._file is not None:
+                self.flush()
+            else:
+                self._position = 0
+        if self._size == self.capacity:
+            self.dropped += 1
+        else:
+            self._size += 1
+        self._buffer[self._position] = (tick, event, truck, station, arg0, arg1)
+        self._position += 1
+        self.n_events += 1
+
+    def emit_many(self, tick: int, event: TraceEvent, truck, station, arg0=-1, arg1=-1):
+        """Record one event per truck (array arguments are broadcast against the truck IDs)"""
+        columns = np.broadcast_arrays(np.asarray(truck), np.asarray(station), np.asarray(arg0), np.asarray(arg1))
+        for truck_id, station_id, value0, value1 in zip(*[x.tolist() for x in columns]):
+            self.emit(tick, event, truck_id, station_id, value0, value1)
+
+    def events(self) -> np.ndarray:
+        """Events currently held in memory, oldest first"""
+        if self._size == self.capacity:
+            records = self._buffer[self._position :] + self._buffer[: self._position]
+        else:
+            records = self._buffer[: self._position]
+        return np.array(records, dtype=TRACE_DTYPE)
+
+    def drain(self) -> np.ndarray:
+        """Events currently held in memory, oldest first, removing them from memory"""
+        events = self.events()
+        self._position = self._size = 0
+        return events
+
+    def flush(self):
+        """Write buffered events to the trace file"""
+        if self._file is None:
+            return
+        self._file.write(self.drain().tobytes())
+        self._file.flush()
+
+    def close(self):
+        """Flush and close the trace file"""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+def read_trace(path: str) -> np.ndarray:
+    """Read the events of a binary trace file
+
+    Args:
+        path (str): Trace file written by a Tracer
+
+    Returns:
+        np.ndarray: Structured array of events (TRACE_DTYPE)
+    """
+    with open(path, "rb") as f:
+        if f.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError(f"{path} is not a simulation trace file")
+        return np.frombuffer(f.read(), dtype=TRACE_DTYPE)
+
+
+def trace_to_df(events: np.ndarray) -> "pd.DataFrame":
+    """Trace events as a data frame, with event names"""
+    import pandas as pd
+
+    df = pd.DataFrame(events)
+    df["event"] = pd.Categorical.from_codes(df["event"], categories=[x.name for x in TraceEvent])
+    return df
+
+
+def render_event(event) -> str:
+    """Human readable line for one trace event"""
+    tick, event_type, truck, station, arg0, arg1 = (int(x) for x in event)
+    prefix = f"T={tick:>6} ({tick * 5 / 60:7.2f} h)"
+    if event_type == TraceEvent.StateTransition:
+        at_station = f" (station {station})" if station >= 0 else ""
+        return f"{prefix} Truck-ID-{truck}: {TruckState(arg0).name} -> {TruckState(arg1).name}{at_station}"
+    if event_type == TraceEvent.Enqueue:
+        return f"{prefix} Station-ID-{station}: queued Truck-ID-{truck}, queue length {arg0}"
+    if event_type == TraceEvent.Dequeue:
+        return f"{prefix} Station-ID-{station}: Truck-ID-{truck} finished unloading, queue length {arg0}"
+    return f"{prefix} Truck-ID-{truck}: assigned to Station-ID-{station}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a simulation trace file")
+    parser.add_argument("path", help="Binary trace file")
+    parser.add_argument("--truck", type=int, action="append", help="Only show events of this truck (repeatable)")
+    parser.add_argument("--station", type=int, action="append", help="Only show events of this station (repeatable)")
+    parser.add_argument("--event", choices=[x.name for x in TraceEvent], action="append", help="Event types to show")
+    parser.add_argument("--limit", type=int, help="Maximum number of events to show")
+    args = parser.parse_args()
+
+    events = read_trace(args.path)
+    mask = np.ones(len(events), dtype=bool)
+    if args.truck:
+        mask &= np.isin(events["truck"], args.truck)
+    if args.station:
+        mask &= np.isin(events["station"], args.station)
+    if args.event:
+        mask &= np.isin(events["event"], [TraceEvent[x].value for x in args.event])
+    events = events[mask]
+    for event in events[: args.limit]:
+        print(render_event(event))
+    print(f"{len(events)} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import bisect
+import logging
+import random
+
+import pytest
+
+from mining_sim.simulator import MiningSimulator
+from mining_sim.utility.assignment import StationAssigner
+
+logger = logging.getLogger(__name__)
+
+
+def reference_assign(new_trucks: list[int], station_infos: list[dict]) -> list[dict]:
+    """Original round robin assignment loop (sort, pop(0), insort), kept as the reference behaviour"""
+    station_infos.sort(key=lambda x: x["wait_time"] + len(x["q_trucks"]))
+    while new_trucks:
+        min_wait_time = station_infos[0]["wait_time"] + len(station_infos[0]["q_trucks"])
+        stations_with_min_wait = []
+        while station_infos and (station_infos[0]["wait_time"] + len(station_infos[0]["q_trucks"])) == min_wait_time:
+            stations_with_min_wait.append(station_infos.pop(0))
+        for station in stations_with_min_wait:
+            if new_trucks:
+                station["q_trucks"].append(new_trucks.pop(0))
+            else:
+                break
+        for station in stations_with_min_wait:
+            bisect.insort(station_infos, station, key=lambda x: x["wait_time"] + len(x["q_trucks"]))
+
+    station_infos.sort(key=lambda x: x["station_id"])
+    return station_infos
+
+
+def make_station_infos(wait_times: list[int]) -> list[dict]:
+    """Create station infos dict list from wait times"""
+    return [{"station_id": idx, "wait_time": wait_time, "q_trucks": []} for idx, wait_time in enumerate(wait_times)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_assign_stations_algo_matches_reference(seed):
+    """Test that the heap based assign_stations_algo gives the same assignments as the original loop"""
+    rng = random.Random(seed)
+    sim = MiningSimulator(n_trucks=1, m_stations=rng.randint(1, 30))
+    station_infos = make_station_infos([rng.randint(0, 5) for _ in range(sim.num_stations)])
+    rng.shuffle(station_infos)
+    new_trucks = list(range(rng.randint(1, 100)))
+
+    expected = reference_assign(new_trucks[:], [dict(x, q_trucks=[]) for x in station_infos])
+    actual, truck_infos = sim.assign_stations_algo(new_trucks[:], station_infos)
+
+    assert actual == expected
+    assert len(truck_infos) == len(new_trucks)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_station_assigner_matches_reference_across_ticks(seed):
+    """Test that the persistent station assigner matches the original loop over many ticks"""
+    rng = random.Random(seed)
+    m_stations = rng.randint(1, 40)
+    assigner = StationAssigner(m_stations)
+    queue_sizes = [0] * m_stations
+    truck_id = 0
+
+    for current_tick in range(1, 300):
+        new_trucks = list(range(truck_id, truck_id + rng.choice([0, 0, 1, 2, 5, 3 * m_stations])))
+        truck_id += len(new_trucks)
+
+        expected = {
+            x["station_id"]: x["q_trucks"]
+            for x in reference_assign(new_trucks[:], make_station_infos(queue_sizes))
+            if x["q_trucks"]
+        }
+        actual = assigner.assign(current_tick, new_trucks)
+        assert actual == expected
+
+        # Each station unloads one truck per tick
+        for station_id in range(m_stations):
+            queue_sizes[station_id] = max(0, queue_sizes[station_id] + len(expected.get(station_id, [])) - 1)
+            assert assigner.get_wait_time(station_id, current_tick + 1) == queue_sizes[station_id]
+
+
+def test_station_assigner_from_wait_times():
+    """Test that a station assigner created from wait times assigns like the original loop"""
+    wait_times = [3, 0, 2, 0, 5]
+    assigner = StationAssigner.from_wait_times(wait_times, current_tick=10)
+    new_trucks = list(range(12))
+
+    expected = {x["station_id"]: x["q_trucks"] for x in reference_assign(new_trucks[:], make_station_infos(wait_times))}
+    assert assigner.assign(11, new_trucks) == {k: v for k, v in expected.items() if v}
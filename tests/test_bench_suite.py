@@ -0,0 +1,63 @@
+import logging
+
+import pytest
+
+from benchmarks.bench_suite import (
+    compare_metrics_modes,
+    compare_to_baseline,
+    fit_scaling_exponents,
+    make_cases,
+    run_suite,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def setup():
+    """Setup function for benchmark suite test cases: results of a small grid"""
+    grid = {"trucks": [10, 40], "stations": [2, 4], "hours": [1, 2], "engines": ["tick", "vector"]}
+    cases = make_cases(grid, max_truck_ticks=40 * 12)
+    return run_suite(cases, isolate=False, repeat=1)
+
+
+def test_run_suite(setup):
+    """Test that every phase is timed and the truck tick budget is respected"""
+    results_df = setup
+    assert set(results_df["phase"]) == {
+        "sim_tick",
+        "online_metrics",
+        "log_metrics",
+        "station_assigner",
+        "station_tick",
+        "convert_log_to_df",
+        "compute_truck_metrics",
+        "compute_station_metrics",
+    }
+    assert (results_df["seconds"] > 0).all()
+    # 40 trucks x 2 hours is above the budget
+    sim_df = results_df[results_df["phase"] == "sim_tick"]
+    assert (sim_df["n_trucks"] * sim_df["hours"]).max() == 40
+    assert set(sim_df["engine"]) == {"tick", "vector"}
+    assert sim_df["truck_ticks_per_s"].tolist() == pytest.approx((sim_df["ticks_per_s"] * sim_df["n_trucks"]).tolist())
+
+    metrics_df = compare_metrics_modes(results_df)
+    assert len(metrics_df) == len(sim_df) // 2
+    assert (metrics_df["ratio"] > 0).all()
+
+    exponents = fit_scaling_exponents(results_df)
+    assert set(exponents["station_tick"]) == {"m_stations", "hours"}
+    assert set(exponents["sim_tick/tick"]) == {"n_trucks", "m_stations", "hours"}
+
+
+def test_compare_to_baseline(setup):
+    """Test that slowdowns above the tolerance are reported as regressions"""
+    results_df = setup
+    baseline = {"results": results_df.to_dict(orient="records")}
+    assert not compare_to_baseline(results_df, baseline)["regression"].any()
+
+    slower_df = results_df.copy()
+    slower_df.loc[slower_df["phase"] == "station_tick", "seconds"] += 1.0
+    comparison_df = compare_to_baseline(slower_df, baseline, tolerance=0.5)
+    assert len(comparison_df) == len(results_df)
+    assert (comparison_df["regression"] == (comparison_df["phase"] == "station_tick")).all()
@@ -0,0 +1,137 @@
+import functools
+import logging
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from mining_sim import checkpoint
+from mining_sim.checkpoint import restore, snapshot
+from mining_sim.simulator import MiningSimulator
+
+logger = logging.getLogger(__name__)
+
+
+def run_ticks(sim: MiningSimulator, n_ticks: int) -> MiningSimulator:
+    for _ in range(n_ticks):
+        sim.tick()
+    return sim
+
+
+def assert_same_state(sim: MiningSimulator, expected: MiningSimulator):
+    """Compare node state, logs and online metrics of two simulations"""
+    sim.sync_nodes()
+    expected.sync_nodes()
+    assert sim.current_tick == expected.current_tick
+    for truck, expected_truck in zip(sim.mining_trucks, expected.mining_trucks):
+        assert truck.get_state() == expected_truck.get_state()
+        assert truck._remaining_time_in_state == expected_truck._remaining_time_in_state
+        assert truck.unload_site_id == expected_truck.unload_site_id
+        assert truck._data_log_list == expected_truck._data_log_list
+    for station, expected_station in zip(sim.unloading_stations, expected.unloading_stations):
+        assert list(station.unload_queue) == list(expected_station.unload_queue)
+        assert station._data_log_list == expected_station._data_log_list
+    if expected.metrics == "online":
+        assert sim.summarize() == expected.summarize()
+
+
+@pytest.fixture
+def setup():
+    """Setup function for checkpoint test cases: a warm simulation"""
+    return run_ticks(MiningSimulator(n_trucks=40, m_stations=3, stop_time_hr=20, seed=9), 100)
+
+
+@pytest.mark.parametrize("engine", ["tick", "event", "vector"])
+@pytest.mark.parametrize("metrics", ["log", "online"])
+def test_restore_continues_identically(engine, metrics):
+    """Test that a restored simulation continues exactly like the uninterrupted simulation"""
+    sim = run_ticks(MiningSimulator(n_trucks=40, m_stations=3, engine=engine, metrics=metrics, seed=9), 100)
+    data = snapshot(sim)
+    run_ticks(sim, 150)
+
+    restored = run_ticks(MiningSimulator.restore(data), 150)
+    assert_same_state(restored, sim)
+
+
+def test_snapshot_without_logs(setup: MiningSimulator):
+    """Test that a snapshot without logs is smaller and logs only the ticks after the snapshot"""
+    sim = setup
+    data = snapshot(sim, include_logs=False)
+    assert len(data) < len(snapshot(sim))
+
+    restored = run_ticks(restore(data), 50)
+    run_ticks(sim, 50)
+    for truck, expected_truck in zip(restored.mining_trucks, sim.mining_trucks):
+        assert truck._data_log_list == expected_truck._data_log_list[100:]
+    for station, expected_station in zip(restored.unloading_stations, sim.unloading_stations):
+        assert station._data_log_list == expected_station._data_log_list[100:]
+
+
+def test_checkpoint_resume(tmp_path):
+    """Test that a run resumed from a periodic checkpoint gives the same logs as the full run"""
+    path = str(tmp_path / "sim.ckpt")
+    sim = MiningSimulator(n_trucks=30, m_stations=2, stop_time_hr=10, seed=4, queue_backend="locked")
+    sim.run(verbose=False, checkpoint_path=path, checkpoint_interval_hr=4)
+
+    # Last checkpoint was written at 8 hours
+    resumed = MiningSimulator.load_checkpoint(path)
+    assert resumed.current_tick == 96
+    resumed.run(verbose=False)
+    assert_same_state(resumed, sim)
+
+
+def branch_truck_logs(n_ticks: int, sim: MiningSimulator) -> list:
+    """Branch that runs n_ticks more and returns the truck logs (module level, so it can be pickled)"""
+    return [truck._data_log_list for truck in run_ticks(sim, n_ticks).mining_trucks]
+
+
+def branch_current_tick(sim: MiningSimulator) -> int:
+    """Branch that returns the current tick"""
+    return sim.current_tick
+
+
+def failing_branch(sim: MiningSimulator):
+    """Branch that raises"""
+    raise KeyError("no such station")
+
+
+def use_fork(use: bool, monkeypatch):
+    """Run branches in forked processes, or in a process pool on restored snapshots as where fork is not available"""
+    if use and "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("fork is not available")
+    if not use:
+        monkeypatch.setattr(checkpoint.multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+
+
+@pytest.mark.parametrize("fork", [True, False])
+def test_fork_branches(setup: MiningSimulator, fork, monkeypatch):
+    """Test that branches run on independent copies of the warm simulation, with and without fork"""
+    use_fork(fork, monkeypatch)
+    sim = setup
+    data = snapshot(sim)
+
+    branches = [functools.partial(branch_truck_logs, n_ticks) for n_ticks in [10, 50, 0]]
+    results = sim.fork(branches, max_workers=2)
+
+    for n_ticks, result in zip([10, 50, 0], results):
+        expected = run_ticks(restore(data), n_ticks)
+        assert result == [truck._data_log_list for truck in expected.mining_trucks]
+    # The warm simulation is not modified by the branches
+    assert_same_state(sim, restore(data))
+
+
+@pytest.mark.parametrize("fork", [True, False])
+def test_fork_branch_error(setup: MiningSimulator, fork, monkeypatch):
+    """Test that errors in a branch are raised in the parent process"""
+    use_fork(fork, monkeypatch)
+
+    with pytest.raises(RuntimeError, match="no such station"):
+        setup.fork([branch_current_tick, failing_branch], max_workers=1)
+
+
+def test_restore_invalid_data():
+    """Test that data which is not a snapshot is rejected"""
+    with pytest.raises(ValueError):
+        restore(b"not a snapshot")
+    with pytest.raises(ValueError):
+        MiningSimulator.restore(snapshot(np.arange(3)))
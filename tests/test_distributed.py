@@ -0,0 +1,175 @@
+import json
+import logging
+import socket
+import threading
+import time
+
+import pytest
+
+from mining_sim.distributed import (
+    MAX_MESSAGE_BYTES,
+    Coordinator,
+    LocalTransport,
+    SocketTransport,
+    Transport,
+    run_distributed_sweep,
+    run_worker,
+    task_id,
+)
+from mining_sim.sweep import make_sweep_configs, run_config
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def setup():
+    """Setup function for distributed sweep test cases: a small grid of short runs"""
+    return make_sweep_configs([20, 40], [1, 2], n_replicates=2, stop_time_hr=6)
+
+
+def _metrics(result):
+    return {k: v for k, v in result.items() if k != "runtime_s"}
+
+
+def test_coordinator_protocol(setup):
+    """Test that tasks are handed out once, duplicate results are ignored and the coordinator finishes"""
+    coordinator = Coordinator(setup + setup[:2])
+    assert len({task_id(x) for x in coordinator.configs}) == len(setup)
+
+    handed_out = []
+    while (reply := coordinator.handle({"type": "get", "worker": "a"}))["type"] == "task":
+        handed_out.append(reply["task_id"])
+    assert reply["type"] == "wait"
+    assert len(handed_out) == len(set(handed_out)) == len(setup)
+
+    for key, config in zip(handed_out, setup):
+        result = {"type": "result", "worker": "a", "task_id": key, "result": {"seed": config["seed"]}}
+        assert coordinator.handle(result) == {"type": "ack", "duplicate": False}
+    assert coordinator.handle(result) == {"type": "ack", "duplicate": True}
+    assert coordinator.finished and coordinator.wait(0)
+    assert coordinator.handle({"type": "get", "worker": "a"}) == {"type": "done"}
+    assert [x["seed"] for x in coordinator.results()] == [x["seed"] for x in setup + setup[:2]]
+
+    assert coordinator.handle({"type": "result", "worker": "a", "task_id": "nope"})["type"] == "error"
+    assert coordinator.handle({"type": "bogus"})["type"] == "error"
+
+
+def test_failed_tasks_are_retried_then_given_up(setup):
+    """Test that a task that keeps raising is retried max_attempts times and the sweep still finishes"""
+    configs = setup[:2] + [{**setup[0], "engine": "bogus"}]
+    coordinator = Coordinator(configs, max_attempts=2)
+
+    assert run_worker(LocalTransport(coordinator), "a") == 2 + 2
+    assert coordinator.finished
+    assert list(coordinator.failed) == [task_id(configs[2])]
+    assert len(coordinator.results()) == 2
+
+
+def test_lost_task_is_handed_out_again(setup):
+    """Test that the task of a worker that stops responding is run by another worker after its lease"""
+    coordinator = Coordinator(setup[:3], lease_s=0.2, poll_s=0.05)
+    lost = coordinator.handle({"type": "get", "worker": "lost"})
+
+    assert run_worker(LocalTransport(coordinator), "b") == 3
+    assert coordinator.finished and not coordinator.failed
+    results = dict(zip(coordinator.task_ids, coordinator.results()))
+    assert _metrics(results[lost["task_id"]]) == _metrics(run_config(lost["config"]))
+
+    # The lost worker comes back: its result is a duplicate
+    late = {"type": "result", "worker": "lost", "task_id": lost["task_id"], "result": {}}
+    assert coordinator.handle(late)["duplicate"]
+
+
+def test_heartbeats_keep_long_tasks(setup):
+    """Test that heartbeats extend the lease of a task running longer than the lease"""
+    coordinator = Coordinator(setup[:1], lease_s=0.2, max_attempts=1)
+    reply = coordinator.handle({"type": "get", "worker": "a"})
+    for _ in range(5):
+        time.sleep(0.1)
+        coordinator.handle({"type": "heartbeat", "worker": "a", "task_id": reply["task_id"]})
+    assert coordinator.handle({"type": "get", "worker": "b"})["type"] == "wait"
+    assert not coordinator.failed
+
+
+def test_socket_workers_match_sweep(setup):
+    """Test that threads talking to a localhost coordinator over TCP give the results of sequential runs"""
+    coordinator = Coordinator(setup, poll_s=0.05, token="secret")
+    host, port = coordinator.serve()
+    try:
+        with pytest.raises(RuntimeError):
+            run_worker(SocketTransport(host, port), "intruder", token="wrong")
+        workers = [
+            threading.Thread(target=run_worker, args=(SocketTransport(host, port), f"w{i}", "secret")) for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        assert coordinator.wait(30)
+        for worker in workers:
+            worker.join(5)
+    finally:
+        coordinator.close()
+
+    assert [_metrics(x) for x in coordinator.results()] == [_metrics(run_config(x)) for x in setup]
+
+
+def test_run_distributed_sweep_local_workers(setup):
+    """Test a sweep on worker processes of this host against a localhost coordinator"""
+    results_df = run_distributed_sweep(setup, local_workers=2, timeout=60)
+
+    assert len(results_df) == len(setup)
+    for config, (_, row) in zip(setup, results_df.iterrows()):
+        expected = run_config(config)
+        for key in ["n_trucks", "m_stations", "seed", "Efficiency_pct", "average_wait_time"]:
+            assert row[key] == expected[key]
+
+
+def test_transport_requires_request():
+    """Test that a transport without request() cannot be created"""
+
+    class Incomplete(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_oversized_message_gets_one_reply(setup):
+    """Test that a message longer than the limit gets a single error reply and the connection is closed"""
+    coordinator = Coordinator(setup)
+    host, port = coordinator.serve()
+    try:
+        with socket.create_connection((host, port), timeout=5) as connection:
+            stream = connection.makefile("rwb")
+            stream.write(b'{"type": "get", "worker": "' + b"x" * (MAX_MESSAGE_BYTES + 10) + b'"}\n')
+            stream.flush()
+            assert json.loads(stream.readline())["type"] == "error"
+            assert stream.readline() == b""
+        # The coordinator still answers other workers
+        assert SocketTransport(host, port).request({"type": "get", "worker": "a"})["type"] == "task"
+    finally:
+        coordinator.close()
+
+
+def test_malformed_reply_raises_connection_error():
+    """Test that a malformed reply makes the socket transport reconnect, then raise ConnectionError"""
+    server = socket.create_server(("127.0.0.1", 0))
+    connections = []
+
+    def serve():
+        for _ in range(2):
+            connection, _ = server.accept()
+            connection.makefile("rb").readline()
+            connection.sendall(b"not json\n")
+            connections.append(connection)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    try:
+        with pytest.raises(ConnectionError):
+            SocketTransport(*server.getsockname(), retries=2, retry_s=0).request({"type": "get"})
+        thread.join(5)
+        assert len(connections) == 2
+    finally:
+        for connection in connections:
+            connection.close()
+        server.close()
@@ -0,0 +1,41 @@
+import logging
+
+import numpy as np
+import pytest
+
+from mining_sim.utility.intervals import batch_means_interval, mser_truncation, t_quantile
+
+logger = logging.getLogger(__name__)
+
+
+def test_t_quantile():
+    """Test the Student t quantiles against tabulated values"""
+    for confidence, dof, expected in [(0.95, 1, 12.706), (0.95, 2, 4.303), (0.95, 4, 2.776), (0.99, 9, 3.250)]:
+        assert t_quantile(confidence, dof) == pytest.approx(expected, rel=1e-3)
+    assert t_quantile(0.95, 10000) == pytest.approx(1.960, rel=1e-3)
+    with pytest.raises(ValueError):
+        t_quantile(1.0, 4)
+    with pytest.raises(ValueError):
+        t_quantile(0.95, 0)
+
+
+def test_batch_means_interval():
+    """Test that batch means use the most recent values that fill the batches"""
+    values = np.r_[100.0, np.repeat([1.0, 3.0], 5)]
+    mean, half_width = batch_means_interval(values, n_batches=2)
+    assert mean == 2
+    assert half_width == pytest.approx(t_quantile(0.95, 1) * np.std([1, 3], ddof=1) / np.sqrt(2))
+    assert batch_means_interval(np.ones(20)) == (1, 0)
+    with pytest.raises(ValueError):
+        batch_means_interval(np.ones(5), n_batches=10)
+
+
+def test_mser_truncation():
+    """Test that MSER truncates an initial transient and nothing from a stationary series"""
+    rng = np.random.default_rng(1)
+    stationary = rng.normal(5, 1, size=100)
+    transient = np.r_[np.linspace(0, 5, 20), stationary]
+
+    assert mser_truncation(stationary) < 10
+    assert 15 <= mser_truncation(transient) <= 30
+    assert mser_truncation(np.zeros(10)) == 0
@@ -0,0 +1,76 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from mining_sim.simulator import MiningSimulator
+from mining_sim.utility.analysis import convert_fleet_log_to_df, convert_log_to_df
+
+pytest.importorskip("pyarrow")
+
+from mining_sim.utility.log_sink import LogSink, compute_log_file_metrics, read_log_meta, scan_log  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def read_log(path, name: str) -> pd.DataFrame:
+    df = pd.concat(scan_log(path, name), ignore_index=True)
+    return df.sort_values(["id", "tick"], kind="stable").reset_index(drop=True)
+
+
+@pytest.fixture
+def setup():
+    """Setup function for log sink test cases: the in-memory logs of a reference run"""
+    sim = MiningSimulator(n_trucks=30, m_stations=3, stop_time_hr=20, seed=11)
+    sim.run(verbose=False)
+    return sim
+
+
+@pytest.mark.parametrize("engine", ["tick", "event", "vector"])
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_log_files_match_memory_logs(setup: MiningSimulator, tmp_path, engine, format):
+    """Test that the chunked log files hold the same entries as the in-memory logs"""
+    sim = MiningSimulator(
+        n_trucks=30, m_stations=3, stop_time_hr=20, seed=11, engine=engine, log_sink=LogSink(tmp_path, format, 7)
+    )
+    sim.run(verbose=False)
+
+    # Only one chunk is kept in memory
+    assert sim.truck_log.capacity == 7 * 12 + 2
+    assert read_log_meta(tmp_path)["n_parts"] == 3
+    expected_trucks = convert_fleet_log_to_df(setup.mining_trucks)
+    pd.testing.assert_frame_equal(read_log(tmp_path, "truck_log"), expected_trucks, check_dtype=False)
+    expected_stations = pd.concat(convert_log_to_df(setup.unloading_stations), ignore_index=True)
+    pd.testing.assert_frame_equal(read_log(tmp_path, "station_log"), expected_stations, check_dtype=False)
+
+
+def test_scan_single_truck(setup: MiningSimulator, tmp_path):
+    """Test that a scan can select the columns of a single truck"""
+    sim = MiningSimulator(n_trucks=30, m_stations=3, stop_time_hr=20, seed=11, log_sink=LogSink(tmp_path, chunk_hr=5))
+    sim.run(verbose=False)
+
+    df = pd.concat(scan_log(tmp_path, "truck_log", columns=["tick", "state"], ids=[4]), ignore_index=True)
+    expected = pd.DataFrame(setup.mining_trucks[4].get_log_columns())[["tick", "state"]]
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+
+
+def test_log_file_metrics(tmp_path):
+    """Test that metrics computed from the log files match online metrics"""
+    sim = MiningSimulator(n_trucks=30, m_stations=3, stop_time_hr=20, seed=11, log_sink=LogSink(tmp_path, chunk_hr=3))
+    sim.run(verbose=False)
+    online = MiningSimulator(n_trucks=30, m_stations=3, stop_time_hr=20, seed=11, metrics="online")
+    online.run(verbose=False)
+
+    truck_metrics, station_metrics = compute_log_file_metrics(tmp_path)
+    pd.testing.assert_frame_equal(truck_metrics.to_df(), online.truck_metrics.to_df())
+    assert station_metrics.to_results() == online.station_metrics.to_results()
+
+
+def test_invalid_log_sink(tmp_path):
+    """Test that invalid log sink arguments are rejected"""
+    with pytest.raises(ValueError):
+        LogSink(tmp_path, format="csv")
+    with pytest.raises(ValueError):
+        LogSink(tmp_path, chunk_hr=0)
+    with pytest.raises(ValueError):
+        MiningSimulator(n_trucks=3, m_stations=1, metrics="online", log_sink=LogSink(tmp_path))
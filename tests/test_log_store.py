@@ -0,0 +1,150 @@
+import gc
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mining_sim.nodes.truck import MiningTruck
+from mining_sim.simulator import MiningSimulator
+from mining_sim.utility.analysis import convert_log_to_df
+from mining_sim.utility.metrics import compute_log_store_metrics
+from mining_sim.utility.log_store import LogStore
+
+logger = logging.getLogger(__name__)
+
+
+def test_log_store_reserve_and_grow():
+    """Test that entries are written by index and the store grows when full"""
+    store = LogStore(2, {"value": "int32"}, capacity=2)
+
+    for tick in range(5):
+        position = store.reserve(1, tick)
+        store.columns["value"][1, position] = 10 * tick
+
+    assert store.capacity >= 5
+    assert store.lengths == [0, 5]
+    assert store.get_column("value", 1).tolist() == [0, 10, 20, 30, 40]
+    assert store.get_ticks(1).tolist() == [0, 1, 2, 3, 4]
+    assert store.get_column("value", 0).tolist() == []
+
+
+def test_log_store_reserve_all():
+    """Test that one entry can be reserved for all nodes at once"""
+    store = LogStore(3, {"value": "int8"}, capacity=1)
+    for tick in range(1, 4):
+        position = store.reserve_all(tick)
+        store.columns["value"][:, position] = tick
+
+    for row in range(3):
+        assert store.get_column("value", row).tolist() == [1, 2, 3]
+        assert store.get_ticks(row).tolist() == [1, 2, 3]
+
+
+def test_convert_log_to_df_wraps_log_store():
+    """Test that converting truck logs to data frames does not copy the log columns"""
+    store = LogStore(2, MiningTruck.log_columns, capacity=100)
+    trucks = [MiningTruck(idx, log_store=store) for idx in range(2)]
+    for _ in range(20):
+        for truck in trucks:
+            truck.tick()
+
+    df_list = convert_log_to_df(trucks)
+    for truck, df in zip(trucks, df_list):
+        assert df["tick"].tolist() == list(range(20))
+        assert (df["id"] == truck.idx).all()
+        assert df["state"].tolist() == [x["state"] for x in truck._data_log_list]
+        assert np.shares_memory(df["assigned_station"].to_numpy(), store.columns["assigned_station"])
+
+
+def test_memory_mapped_log_store(tmp_path):
+    """Test that a log store with a path grows, flushes and opens again from its column files"""
+    store = LogStore(2, {"value": "int32"}, capacity=2, path=str(tmp_path))
+    for tick in range(5):
+        position = store.reserve_all(tick + 1)
+        store.columns["value"][:, position] = [tick, 10 * tick]
+    store.flush()
+
+    opened = LogStore.open(str(tmp_path))
+    assert isinstance(opened.columns["value"], np.memmap)
+    assert opened.get_column("value", 1).tolist() == [0, 10, 20, 30, 40]
+    assert opened.get_ticks(0).tolist() == [1, 2, 3, 4, 5]
+
+    entries = list(opened.iter_entries(max_entries=5))
+    assert len(entries) == 2
+    assert entries[1]["id"].tolist() == [1] * 5
+    assert entries[1]["tick"].tolist() == [1, 2, 3, 4, 5]
+    assert entries[1]["value"].tolist() == [0, 10, 20, 30, 40]
+
+
+@pytest.mark.parametrize("engine", ["tick", "event", "vector"])
+def test_simulation_log_dir(tmp_path, engine):
+    """Test that memory mapped simulation logs match in-memory logs and give the online metrics"""
+    sim = MiningSimulator(n_trucks=20, m_stations=2, stop_time_hr=10, seed=3, engine=engine, log_dir=str(tmp_path))
+    sim.run(verbose=False)
+    expected = MiningSimulator(n_trucks=20, m_stations=2, stop_time_hr=10, seed=3, engine=engine)
+    expected.run(verbose=False)
+    for truck, expected_truck in zip(sim.mining_trucks, expected.mining_trucks):
+        assert truck._data_log_list == expected_truck._data_log_list
+
+    online = MiningSimulator(n_trucks=20, m_stations=2, stop_time_hr=10, seed=3, engine=engine, metrics="online")
+    online.run(verbose=False)
+    truck_log, station_log = LogStore.open(str(tmp_path / "truck_log")), LogStore.open(str(tmp_path / "station_log"))
+    truck_metrics, station_metrics = compute_log_store_metrics(truck_log, station_log, max_entries=100)
+    pd.testing.assert_frame_equal(truck_metrics.to_df(), online.truck_metrics.to_df())
+    assert station_metrics.to_results() == online.station_metrics.to_results()
+
+
+def test_memory_mapped_log_store_grow(tmp_path):
+    """Test that growing a memory mapped store replaces its column files and keeps them mapped"""
+    store = LogStore(3, {"value": "int16"}, capacity=1, path=str(tmp_path))
+    for tick in range(10):
+        position = store.reserve_all(tick)
+        store.columns["value"][:, position] = tick
+
+    assert isinstance(store.columns["value"], np.memmap)
+    assert sorted(x.name for x in tmp_path.iterdir()) == ["value.bin"]
+    assert store.get_column("value", 2).tolist() == list(range(10))
+
+
+@pytest.mark.parametrize("engine", ["tick", "event", "vector"])
+def test_resume_log_dir(tmp_path, engine):
+    """Test that a run with a log_dir restored from a snapshot keeps logging to its files"""
+    sim = MiningSimulator(n_trucks=20, m_stations=2, stop_time_hr=10, seed=3, engine=engine, log_dir=str(tmp_path))
+    for _ in range(50):
+        sim.tick()
+    data = sim.snapshot(include_logs=False)
+    for _ in range(20):
+        sim.tick()
+
+    restored = MiningSimulator.restore(data)
+    assert isinstance(restored.truck_log.columns["state"], np.memmap)
+    restored.run(verbose=False)
+    expected = MiningSimulator(n_trucks=20, m_stations=2, stop_time_hr=10, seed=3, engine=engine)
+    expected.run(verbose=False)
+
+    truck_log = LogStore.open(str(tmp_path / "truck_log"))
+    assert truck_log.lengths == expected.truck_log.lengths
+    for row in range(20):
+        np.testing.assert_array_equal(truck_log.get_column("state", row), expected.truck_log.get_column("state", row))
+
+
+def test_resume_log_dir_missing_files(tmp_path):
+    """Test that restoring a run whose log files were removed raises an error"""
+    sim = MiningSimulator(n_trucks=5, m_stations=2, stop_time_hr=2, log_dir=str(tmp_path / "logs"))
+    sim.tick()
+    data = sim.snapshot()
+    # Unmap the column files, which cannot be removed while mapped on Windows
+    del sim
+    gc.collect()
+    (tmp_path / "logs" / "truck_log" / "state.bin").unlink()
+
+    with pytest.raises(ValueError, match="missing"):
+        MiningSimulator.restore(data)
+
+
+def test_fork_log_dir(tmp_path):
+    """Test that a run with a log_dir cannot be forked, as its branches would share the log files"""
+    sim = MiningSimulator(n_trucks=5, m_stations=2, stop_time_hr=2, log_dir=str(tmp_path))
+    with pytest.raises(ValueError, match="log_dir"):
+        sim.fork([len])
@@ -0,0 +1,52 @@
+import json
+import logging
+
+import pytest
+
+from mining_sim.simulator import MiningSimulator
+
+logger = logging.getLogger(__name__)
+
+
+def run_and_analyze(engine: str, metrics: str) -> tuple[dict, list]:
+    """Run a short simulation and return the contents of truck_stats.json and station_stats.json"""
+    sim = MiningSimulator(n_trucks=60, m_stations=3, stop_time_hr=15, engine=engine, metrics=metrics, seed=21)
+    for _ in range(sim.stop_time):
+        sim.tick()
+    sim.analyze_simulation_logs()
+
+    with open("./results/truck_stats.json") as f:
+        truck_stats = json.load(f)
+    with open("./results/station_stats.json") as f:
+        station_stats = json.load(f)
+    return truck_stats, station_stats
+
+
+@pytest.mark.parametrize("engine", ["tick", "event", "vector"])
+def test_online_metrics_match_log_analysis(engine, tmp_path, monkeypatch):
+    """Test that online metrics produce the same stats files as analyzing the full logs"""
+    monkeypatch.chdir(tmp_path)
+    expected = run_and_analyze(engine, "log")
+    actual = run_and_analyze(engine, "online")
+
+    assert actual == expected
+
+
+def test_online_metrics_keep_no_logs():
+    """Test that no per tick logs are kept with online metrics"""
+    sim = MiningSimulator(n_trucks=5, m_stations=2, stop_time_hr=2, metrics="online")
+    for _ in range(10):
+        sim.tick()
+
+    assert sim.truck_log is None and sim.station_log is None
+    assert sim.mining_trucks[0]._data_log_list == []
+    with pytest.raises(ValueError):
+        sim.mining_trucks[0].get_log_columns()
+    assert sim.truck_metrics.ticks.tolist() == [10] * 5
+    assert sim.station_metrics.ticks.tolist() == [10] * 2
+
+
+def test_unknown_metrics_mode():
+    """Test that an unknown metrics mode is rejected"""
+    with pytest.raises(ValueError):
+        MiningSimulator(n_trucks=1, m_stations=1, metrics="unknown")
@@ -0,0 +1,70 @@
+import logging
+
+import pytest
+
+from mining_sim.optimize import CandidateEvaluator, find_max_trucks, find_min_stations, search_min
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def setup():
+    """Setup function for optimizer test cases: a short horizon and an SLA"""
+    return {"sla": {"Queued_pct": 2.0, "average_wait_time": 0.5}, "stop_time_hr": 24}
+
+
+@pytest.mark.parametrize("width", [1, 3])
+@pytest.mark.parametrize("threshold", [1, 7, 50, 1000])
+def test_search_min(width, threshold):
+    """Test that the search finds the threshold of a monotone check with few checks"""
+    checked = []
+
+    def check(values):
+        checked.extend(values)
+        return {x: x >= threshold for x in values}
+
+    assert search_min(check, 1, 1000, guess=10, width=width) == threshold
+    assert len(checked) <= 30
+    if threshold > 1:
+        assert search_min(check, 1, threshold - 1, guess=10, width=width) is None
+
+
+def test_find_min_stations(setup):
+    """Test that the answer is the first station count meeting the SLA, with a handful of runs"""
+    results = find_min_stations(200, **setup)
+    answer = results["answer"]
+
+    evaluator = CandidateEvaluator(setup["sla"], stop_time_hr=24)
+    assert evaluator.evaluate([(200, answer - 1), (200, answer)]) == {(200, answer - 1): False, (200, answer): True}
+    assert results["runs"] <= 6
+    assert len(results["evaluations"]) == results["runs"]
+
+
+def test_parallel_search_matches(setup):
+    """Test that evaluating several candidates per round in a process pool gives the same answer"""
+    sequential = find_min_stations(200, **setup, n_replicates=2)
+    parallel = find_min_stations(200, **setup, n_replicates=2, max_workers=3)
+
+    assert parallel["answer"] == sequential["answer"]
+    common = {(x["n_trucks"], x["m_stations"]): x for x in sequential["evaluations"]}
+    for evaluation in parallel["evaluations"]:
+        key = (evaluation["n_trucks"], evaluation["m_stations"])
+        if key in common:
+            assert evaluation == common[key]
+
+
+def test_find_max_trucks(setup):
+    """Test that the largest fleet meets the SLA and one more truck does not"""
+    results = find_max_trucks(3, **setup)
+    answer = results["answer"]
+
+    evaluator = CandidateEvaluator(setup["sla"], stop_time_hr=24)
+    assert evaluator.evaluate([(answer, 3), (answer + 1, 3)]) == {(answer, 3): True, (answer + 1, 3): False}
+
+
+def test_invalid_sla():
+    """Test that SLAs on unknown or non-queueing metrics are rejected"""
+    with pytest.raises(ValueError):
+        find_min_stations(10, sla={})
+    with pytest.raises(ValueError):
+        find_min_stations(10, sla={"Efficiency_pct": 95})
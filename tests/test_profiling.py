@@ -0,0 +1,79 @@
+import logging
+
+import pytest
+
+from mining_sim.simulator import MiningSimulator
+
+logger = logging.getLogger(__name__)
+
+TICK_PHASES = ["collect_arrivals", "assign", "tick_trucks", "tick_stations", "apply_assignments", "tick_queued_trucks"]
+
+
+@pytest.fixture
+def setup():
+    """Setup function for profiling test cases"""
+    sim = MiningSimulator(n_trucks=50, m_stations=2, stop_time_hr=5, seed=3)
+
+    return sim
+
+
+def test_run_profile(setup: MiningSimulator):
+    """Test function for the phase timing report returned by run()"""
+    sim = setup
+    tick_phases = []
+    report = sim.run(verbose=False, profile_callback=lambda tick, phases: tick_phases.append((tick, phases.copy())))
+
+    n_ticks = sim.current_tick
+    assert report["ticks"]["count"] == n_ticks
+    assert list(report["phases"]) == TICK_PHASES
+    for phase in TICK_PHASES:
+        assert report["phases"][phase]["calls"] == n_ticks
+    assert report["phases"]["tick_stations"]["items"] == n_ticks * 2
+    # Every truck is ticked once per tick, either while moving or while queued
+    moving_trucks = report["phases"]["tick_trucks"]["items"]
+    assert moving_trucks + report["phases"]["tick_queued_trucks"]["items"] == n_ticks * 50
+    assert report["phases"]["assign"]["items"] == report["phases"]["apply_assignments"]["items"] > 0
+    assert sum(x["tick_pct"] for x in report["phases"].values()) == pytest.approx(100)
+
+    # Callback receives the phase times of every tick
+    assert [tick for tick, _ in tick_phases] == list(range(1, n_ticks + 1))
+    assert all(list(phases) == TICK_PHASES for _, phases in tick_phases)
+    assert sum(phases["tick_trucks"] for _, phases in tick_phases) == pytest.approx(
+        report["phases"]["tick_trucks"]["seconds"]
+    )
+
+
+def test_profiling_does_not_change_results(setup: MiningSimulator):
+    """Test that profiled and unprofiled runs give the same logs, and that run() only reports when profiling"""
+    sim = setup
+    assert sim.run(verbose=False) is None
+
+    profiled_sim = MiningSimulator(n_trucks=50, m_stations=2, stop_time_hr=5, seed=3)
+    profiled_sim.run(verbose=False, profile=True)
+    for truck, profiled_truck in zip(sim.mining_trucks, profiled_sim.mining_trucks):
+        assert truck._data_log_list == profiled_truck._data_log_list
+
+
+@pytest.mark.parametrize("engine", ["event", "vector"])
+def test_engine_profile(engine):
+    """Test that event and vector engine ticks are timed as a single phase"""
+    sim = MiningSimulator(n_trucks=20, m_stations=2, stop_time_hr=2, engine=engine)
+    report = sim.run(verbose=False, profile=True)
+
+    assert list(report["phases"]) == ["engine_tick"]
+    assert report["phases"]["engine_tick"]["calls"] == sim.current_tick
+
+
+@pytest.mark.parametrize("metrics", ["log", "online"])
+def test_analysis_profile(metrics, tmp_path, monkeypatch):
+    """Test that analysis phases are timed separately from the ticks"""
+    monkeypatch.chdir(tmp_path)
+    sim = MiningSimulator(n_trucks=20, m_stations=2, stop_time_hr=2, metrics=metrics)
+    sim.run(verbose=False)
+    profiler = sim.enable_profiling()
+    sim.analyze_simulation_logs()
+
+    report = profiler.report()
+    assert report["ticks"]["count"] == 0
+    assert "analysis_truck_stats" in report["phases"]
+    assert all(x["tick_pct"] is None and x["calls"] == 1 for x in report["phases"].values())
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from mining_sim.realtime import RealTimeRunner, Subscription
+from mining_sim.simulator import MiningSimulator
+
+logger = logging.getLogger(__name__)
+
+
+async def collect(subscription: Subscription) -> list[dict]:
+    return [update async for update in subscription]
+
+
+def run_with_subscribers(runner: RealTimeRunner, *subscriptions, until_tick=None) -> list[list[dict]]:
+    async def main():
+        results = await asyncio.gather(runner.run(until_tick), *(collect(x) for x in subscriptions))
+        return results[1:]
+
+    return asyncio.run(main())
+
+
+def flatten(updates: list[dict]) -> tuple[list, dict]:
+    """All transitions and the final queue lengths of a stream of updates"""
+    transitions, queue_lengths = [], {}
+    for update in updates:
+        transitions.extend(update["transitions"])
+        queue_lengths.update(update["queue_lengths"])
+    return transitions, queue_lengths
+
+
+@pytest.fixture
+def setup():
+    """Setup function for real-time test cases"""
+    return MiningSimulator(n_trucks=40, m_stations=3, stop_time_hr=10, seed=7)
+
+
+@pytest.mark.parametrize("engine", ["tick", "event", "vector"])
+def test_updates_match_simulation(engine):
+    """Test that a blocking subscriber receives one update per tick, consistent with the simulation"""
+    sim = MiningSimulator(n_trucks=40, m_stations=3, stop_time_hr=10, seed=7, engine=engine)
+    runner = RealTimeRunner(sim)
+    (updates,) = run_with_subscribers(runner, runner.subscribe(max_pending=2, policy="block"))
+
+    assert [x["tick"] for x in updates] == list(range(0, sim.current_tick + 1))
+    for update in updates:
+        assert all(tick == update["tick"] for tick, *_ in update["transitions"])
+    assert updates[0]["queue_lengths"] == {0: 0, 1: 0, 2: 0}
+    transitions, queue_lengths = flatten(updates)
+    assert queue_lengths == {x.idx: x.get_wait_time() for x in sim.unloading_stations}
+    # Replaying the transitions gives the truck states at the end of the run
+    states = {x.idx: x.get_state().value for x in sim.mining_trucks}
+    final_states = {}
+    for _, truck, previous, new in transitions:
+        assert final_states.get(truck, previous) == previous
+        final_states[truck] = new
+    assert all(states[truck] == state for truck, state in final_states.items())
+    assert sim.tracer is None
+
+
+def test_slow_subscribers_do_not_stall(setup: MiningSimulator):
+    """Test that coalescing and latest subscribers get merged updates without missing state"""
+    runner = RealTimeRunner(setup)
+    reference = runner.subscribe(max_pending=1, policy="block")
+    coalesced = runner.subscribe(max_pending=3, policy="coalesce")
+    latest = runner.subscribe(max_pending=3, policy="latest")
+
+    async def main():
+        # Slow subscribers only start reading after the run
+        expected = asyncio.create_task(collect(reference))
+        await runner.run()
+        return await expected, await collect(coalesced), await collect(latest)
+
+    expected, coalesced_updates, latest_updates = asyncio.run(main())
+    assert len(coalesced_updates) == 3 and len(latest_updates) <= 3
+    assert coalesced.coalesced == len(expected) - 3
+    assert flatten(coalesced_updates) == flatten(expected)
+    assert flatten(latest_updates)[1] == flatten(expected)[1]
+    assert latest_updates[-1]["tick"] == expected[-1]["tick"]
+
+
+def test_paced_run(setup: MiningSimulator):
+    """Test that a paced run takes the scheduled wall clock time"""
+    runner = RealTimeRunner(setup, speedup=30000)  # 10 ms per tick
+    start = time.monotonic()
+    run_with_subscribers(runner, runner.subscribe(), until_tick=9)
+    assert time.monotonic() - start >= 0.1
+    assert setup.current_tick == 10
+
+
+def test_invalid_arguments(setup: MiningSimulator):
+    """Test that invalid runner and subscription arguments are rejected"""
+    with pytest.raises(ValueError):
+        RealTimeRunner(setup, speedup=0)
+    runner = RealTimeRunner(setup)
+    with pytest.raises(ValueError):
+        runner.subscribe(policy="drop")
+    with pytest.raises(ValueError):
+        runner.subscribe(max_pending=0)
+    setup.enable_tracing()
+    with pytest.raises(ValueError):
+        asyncio.run(runner.run())
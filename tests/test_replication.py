@@ -0,0 +1,83 @@
+import logging
+import math
+
+import numpy as np
+import pytest
+
+from mining_sim.replication import RunningStats, is_precise, run_replications
+from mining_sim.sweep import make_sweep_configs, run_config
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def setup():
+    """Setup function for replication test cases: a small configuration"""
+    return {"n_trucks": 30, "m_stations": 2, "stop_time_hr": 6, "base_seed": 3}
+
+
+def test_running_stats():
+    """Test that running stats match the mean and standard deviation of all values"""
+    values = np.random.default_rng(0).normal(10, 2, size=50)
+    stats = RunningStats(["x"])
+    assert math.isnan(stats.half_width("x"))
+    for value in values:
+        stats.update({"x": value})
+
+    assert stats.mean("x") == pytest.approx(values.mean())
+    assert stats.std("x") == pytest.approx(values.std(ddof=1))
+    results = stats.to_results()["x"]
+    assert results["ci_high"] - results["ci_low"] == pytest.approx(2 * stats.half_width("x"))
+    assert is_precise(stats, ["x"], rel_precision=0.1)
+    assert not is_precise(stats, ["x"], rel_precision=0.01)
+    assert is_precise(stats, ["x"], rel_precision=0.01, abs_precision={"x": 1.0})
+
+
+def test_replications_stop_at_precision(setup):
+    """Test that replications stop at the first replicate where the target precision is reached"""
+    results = run_replications(**setup, rel_precision=0.1, min_replicates=3, max_replicates=30)
+
+    assert results["converged"]
+    n = results["replicates"]
+    configs = make_sweep_configs([30], [2], n_replicates=n, base_seed=3, stop_time_hr=6)
+    assert [x["seed"] for x in results["runs"]] == [x["seed"] for x in configs]
+    # Stopped at the first precise replicate
+    stats = RunningStats()
+    for run in results["runs"][:-1]:
+        stats.update(run)
+    assert n == 3 or not is_precise(stats, rel_precision=0.1)
+    stats.update(results["runs"][-1])
+    assert is_precise(stats, rel_precision=0.1)
+    efficiency = results["metrics"]["Efficiency_pct"]
+    assert efficiency["mean"] == pytest.approx(np.mean([x["Efficiency_pct"] for x in results["runs"]]))
+    assert efficiency["half_width"] <= 0.1 * efficiency["mean"]
+
+
+def test_replications_independent_of_workers(setup):
+    """Test that a process pool uses the same replicates and gives the same results as a sequential run"""
+    sequential = run_replications(**setup, rel_precision=0.1, min_replicates=3, max_replicates=30)
+    parallel = run_replications(**setup, rel_precision=0.1, min_replicates=3, max_replicates=30, max_workers=4)
+
+    assert parallel["replicates"] == sequential["replicates"]
+    assert parallel["metrics"] == sequential["metrics"]
+    expected = run_config(make_sweep_configs([30], [2], base_seed=3, stop_time_hr=6)[0])
+    assert parallel["runs"][0]["Efficiency_pct"] == expected["Efficiency_pct"]
+
+
+def test_replications_max_replicates(setup):
+    """Test that replications stop at max_replicates when the precision cannot be reached"""
+    results = run_replications(**setup, rel_precision=0, min_replicates=3, max_replicates=4)
+    assert not results["converged"]
+    assert results["replicates"] == 4
+
+
+def test_invalid_replications(setup):
+    """Test that invalid replication arguments are rejected"""
+    with pytest.raises(ValueError):
+        run_replications(**setup, targets=["throughput"])
+    with pytest.raises(ValueError):
+        run_replications(**setup, min_replicates=2)
+    with pytest.raises(ValueError):
+        run_replications(**setup, min_replicates=5, max_replicates=4)
+    with pytest.raises(ValueError):
+        run_replications(**setup, confidence=95)
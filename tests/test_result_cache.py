@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from mining_sim.simulator import MiningSimulator
+from mining_sim.sweep import make_sweep_configs, run_config
+from mining_sim.utility.result_cache import ResultCache, cache_key
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def setup(tmp_path):
+    """Setup function for result cache test cases: an empty cache"""
+    return ResultCache(str(tmp_path / "cache"))
+
+
+def _simulate(cache, **kwargs):
+    options = {"n_trucks": 40, "m_stations": 2, "stop_time_hr": 12, "max_time_hr": 12, "seed": 3, **kwargs}
+    sim = MiningSimulator(**options, cache=cache)
+    sim.run(verbose=False)
+    return sim
+
+
+@pytest.mark.parametrize("metrics", ["log", "online"])
+@pytest.mark.parametrize("engine", ["tick", "event", "vector"])
+def test_cache_hit_matches_run(setup: ResultCache, engine, metrics):
+    """Test that a cached run restores the summary and final tick without simulating"""
+    first = _simulate(setup, engine=engine, metrics=metrics)
+    second = _simulate(setup, engine=engine, metrics=metrics)
+
+    assert not first.from_cache and second.from_cache
+    assert second.summarize() == first.summarize()
+    assert second.current_tick == first.current_tick
+    assert (setup.hits, setup.misses) == (1, 1)
+
+
+def test_cache_key(setup: ResultCache):
+    """Test that runs differing by any argument that changes the results have different keys"""
+    sim = MiningSimulator(n_trucks=40, m_stations=2, seed=3, cache=setup)
+    keys = {cache_key(sim.cache_config)}
+    for changes in [{"seed": 4}, {"n_trucks": 41}, {"m_stations": 3}, {"stop_time": 1}, {"engine": "vector"}]:
+        keys.add(cache_key({**sim.cache_config, **changes}))
+    assert len(keys) == 6
+    assert MiningSimulator(n_trucks=40, m_stations=2, seed=3, queue_backend="locked").cache_config == sim.cache_config
+
+    # Unseeded runs are not cached
+    _simulate(setup, seed=np.random.default_rng(3))
+    _simulate(setup, seed=None)
+    assert setup.size() == 0
+
+
+def test_cached_logs(tmp_path):
+    """Test that a cache keeping the logs restores them, and treats entries without logs as misses"""
+    _simulate(ResultCache(str(tmp_path)))
+    cache = ResultCache(str(tmp_path), include_logs=True)
+    first = _simulate(cache)
+    second = _simulate(cache)
+
+    assert not first.from_cache and second.from_cache
+    assert second.truck_log.lengths == first.truck_log.lengths
+    for name in first.truck_log.columns:
+        for truck in range(40):
+            np.testing.assert_array_equal(
+                second.truck_log.get_column(name, truck), first.truck_log.get_column(name, truck)
+            )
+    np.testing.assert_array_equal(
+        second.station_log.get_column("wait_time", 1), first.station_log.get_column("wait_time", 1)
+    )
+
+
+def test_analysis_from_cache(setup: ResultCache, tmp_path, monkeypatch):
+    """Test that the stats files of a cached run are the same as those of the analyzed logs"""
+    monkeypatch.chdir(tmp_path)
+    stats = []
+    for cache in (None, setup, setup):
+        sim = _simulate(cache)
+        sim.analyze_simulation_logs()
+        with open("results/station_stats.json") as f, open("results/truck_stats.json") as g:
+            stats.append((json.load(f), json.load(g)))
+    assert sim.from_cache
+    assert stats[2] == stats[1] == stats[0]
+
+
+def test_lru_eviction(setup: ResultCache):
+    """Test that the least recently used entries are evicted once the cache is too large"""
+    sims = [_simulate(setup, seed=seed) for seed in range(3)]
+    entry_size = setup.size() / 3
+    setup.max_bytes = int(3.5 * entry_size)
+    keys = [cache_key(x.cache_config) for x in sims]
+    os.utime(setup._file(keys[0], ".json"), (1, 1))
+    os.utime(setup._file(keys[1], ".json"), (2, 2))
+    assert setup.get(keys[0]) is not None  # Most recently used now
+
+    _simulate(setup, seed=3)
+    assert setup.size() <= setup.max_bytes
+    assert setup.get(keys[1]) is None
+    assert setup.get(keys[0]) is not None and setup.get(keys[2]) is not None
+    setup.clear()
+    assert setup.size() == 0
+
+
+def test_incomplete_entry_is_a_miss(setup: ResultCache):
+    """Test that an entry whose data file was removed (e.g. by another process evicting it) is simulated again"""
+    sim = _simulate(setup)
+    os.remove(setup._file(cache_key(sim.cache_config), ".metrics.npz"))
+    again = _simulate(setup)
+    assert not again.from_cache
+    assert _simulate(setup).from_cache
+
+
+def test_batch_runners_share_cache(tmp_path, monkeypatch):
+    """Test that sweep tasks in several processes use the cache of MINING_SIM_CACHE and return the same results"""
+    monkeypatch.setenv("MINING_SIM_CACHE", str(tmp_path))
+    configs = make_sweep_configs([20, 40], [1, 2], n_replicates=2, stop_time_hr=6) * 3
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(run_config, configs))
+    cached = [run_config(x) for x in configs]
+
+    for result in results + cached:
+        result.pop("runtime_s")
+    assert results == cached
+    assert len(list(tmp_path.glob("*/*.json"))) == len(configs) // 3
+
+
+def test_runs_with_side_outputs_are_not_cached(setup: ResultCache, tmp_path):
+    """Test that traced, profiled and checkpointed runs are simulated, so that their outputs are written"""
+    _simulate(setup)
+    options = {"n_trucks": 40, "m_stations": 2, "stop_time_hr": 12, "max_time_hr": 12, "seed": 3, "cache": setup}
+
+    sim = MiningSimulator(**options)
+    tracer = sim.enable_tracing()
+    sim.run(verbose=False)
+    assert not sim.from_cache and len(tracer.events()) > 0
+
+    sim = MiningSimulator(**options)
+    report = sim.run(verbose=False, profile=True)
+    assert not sim.from_cache and report["ticks"]["count"] > 0
+
+    path = tmp_path / "sim.ckpt"
+    sim = MiningSimulator(**options)
+    sim.run(verbose=False, checkpoint_path=str(path), checkpoint_interval_hr=4)
+    assert not sim.from_cache and path.exists()
+    assert setup.hits == 0
@@ -1,6 +1,12 @@
 import logging
+import os
+import subprocess
+import sys
+
+import numpy as np
 import pytest
 
+from mining_sim.enums.sim_enums import TruckState
 from mining_sim.simulator import MiningSimulator, find_station_info_by_id
 
 logger = logging.getLogger(__name__)
@@ -84,3 +90,106 @@ def test_simulation_tick(setup):
     for truck in sim.mining_trucks:
         logger.debug(f"Truck ID: {truck.idx} , Tick: {truck.current_tick}")
         assert truck.current_tick == SIM_STOP
+
+
+@pytest.mark.parametrize("engine", ["event", "vector"])
+@pytest.mark.parametrize("n_trucks, m_stations", [(10, 4), (60, 2), (200, 3)])
+def test_engine_matches_tick_engine(engine, n_trucks, m_stations):
+    """Test that the event and vector engines produce the same node logs as the tick engine for the same seed"""
+    sims = []
+    for sim_engine in ["tick", engine]:
+        sim = MiningSimulator(n_trucks=n_trucks, m_stations=m_stations, stop_time_hr=10, engine=sim_engine, seed=7)
+        for _ in range(200):
+            sim.tick()
+        sim.sync_nodes()
+        sims.append(sim)
+
+    tick_sim, engine_sim = sims
+    for tick_truck, engine_truck in zip(tick_sim.mining_trucks, engine_sim.mining_trucks):
+        assert engine_truck.current_tick == tick_truck.current_tick
+        assert engine_truck.get_state() == tick_truck.get_state()
+        assert engine_truck._remaining_time_in_state == tick_truck._remaining_time_in_state
+        assert engine_truck._data_log_list == tick_truck._data_log_list
+
+    for tick_station, engine_station in zip(tick_sim.unloading_stations, engine_sim.unloading_stations):
+        assert engine_station.current_tick == tick_station.current_tick
+        assert engine_station.get_wait_time() == tick_station.get_wait_time()
+        assert list(engine_station.unload_queue) == list(tick_station.unload_queue)
+        assert engine_station._data_log_list == tick_station._data_log_list
+
+
+def test_truck_activity_sets():
+    """Test that the tick engine's truck index sets follow the truck states"""
+    sim = MiningSimulator(n_trucks=100, m_stations=2, stop_time_hr=10, seed=1)
+    for _ in range(120):
+        sim.tick()
+        moving, arriving, queued = [], [], set()
+        for truck in sim.mining_trucks:
+            if truck.get_state() != TruckState.Unloading:
+                moving.append(truck.idx)
+            elif truck.unload_queued:
+                queued.add(truck.idx)
+            else:
+                arriving.append(truck.idx)
+        assert sim._moving_trucks == moving
+        assert sim._arriving_trucks == arriving
+        assert sim._queued_trucks == queued
+
+
+@pytest.mark.parametrize("engine", ["tick", "event", "vector"])
+def test_simulation_seed(engine):
+    """Test that simulations are reproducible per instance, independent of other simulations"""
+    sim_a = MiningSimulator(n_trucks=20, m_stations=2, stop_time_hr=5, engine=engine, seed=3)
+    sim_b = MiningSimulator(n_trucks=20, m_stations=2, stop_time_hr=5, engine=engine, seed=np.random.default_rng(3))
+    sim_c = MiningSimulator(n_trucks=20, m_stations=2, stop_time_hr=5, engine=engine, seed=4)
+
+    # Interleave ticks of the simulations
+    for _ in range(100):
+        for sim in [sim_a, sim_b, sim_c]:
+            sim.tick()
+
+    logs = [[truck._data_log_list for truck in sim.mining_trucks] for sim in [sim_a, sim_b, sim_c]]
+    assert logs[0] == logs[1]
+    assert logs[0] != logs[2]
+
+
+def test_vector_views_cannot_tick():
+    """Test that the trucks and stations of the vector engine are only moved forward by the engine"""
+    sim = MiningSimulator(n_trucks=3, m_stations=1, engine="vector")
+    with pytest.raises(RuntimeError):
+        sim.mining_trucks[0].tick()
+    with pytest.raises(RuntimeError):
+        sim.unloading_stations[0].tick()
+
+
+def test_unknown_engine():
+    """Test that an unknown engine name is rejected"""
+    with pytest.raises(ValueError):
+        MiningSimulator(n_trucks=1, m_stations=1, engine="unknown")
+
+
+@pytest.mark.parametrize("metrics", ["log", "online"])
+def test_summarize(metrics):
+    """Test that the summary is the same from logs and online metrics"""
+    online = MiningSimulator(n_trucks=20, m_stations=3, stop_time_hr=12, seed=2, metrics="online")
+    online.run(verbose=False)
+    sim = MiningSimulator(n_trucks=20, m_stations=3, stop_time_hr=12, seed=2, metrics=metrics)
+    sim.run(verbose=False)
+    assert sim.summarize() == online.summarize()
+
+
+def test_simulation_does_not_import_pandas():
+    """Test that importing, running and summarizing a simulation does not load the analysis layer (pandas)"""
+    code = (
+        "import sys\n"
+        "import mining_sim\n"
+        "sim = mining_sim.MiningSimulator(n_trucks=10, m_stations=2, stop_time_hr=5, seed=1)\n"
+        "sim.run(verbose=False)\n"
+        "sim.summarize()\n"
+        "print(sorted(x for x in sys.modules if x.split('.')[0] in ('pandas', 'pyarrow', 'mining_sim')))\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    modules = result.stdout.strip()
+    assert "pandas" not in modules and "pyarrow" not in modules
+    assert "mining_sim.utility.analysis" not in modules
@@ -0,0 +1,84 @@
+import logging
+
+import numpy as np
+import pytest
+
+from mining_sim.enums.sim_enums import TruckState
+from mining_sim.simulator import MiningSimulator
+from mining_sim.utility.metrics import TruckMetrics
+from mining_sim.utility.steady_state import SteadyStateDetector
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def setup():
+    """Setup function for steady-state test cases: arguments of a lightly loaded simulation"""
+    return {"n_trucks": 100, "m_stations": 6, "stop_time_hr": 24 * 7, "max_time_hr": 24 * 7, "seed": 3}
+
+
+@pytest.mark.parametrize("engine", ["tick", "event", "vector"])
+def test_warmup_excluded_from_metrics(setup, engine):
+    """Test that the metrics are reset at the end of the warm-up, identically with every engine"""
+    sim = MiningSimulator(**setup, engine=engine, metrics="online", steady_state=SteadyStateDetector())
+    sim.run(verbose=False)
+    reference = MiningSimulator(**setup, engine="vector", metrics="online", steady_state=SteadyStateDetector())
+    reference.run(verbose=False)
+
+    warmup_tick = sim.steady_state.warmup_tick
+    assert warmup_tick is not None and warmup_tick % 12 == 0
+    assert sim.current_tick == sim.stop_time + 1
+    assert (sim.truck_metrics.ticks == sim.current_tick - warmup_tick).all()
+    assert sim.summarize() == reference.summarize()
+    assert sim.steady_state.report() == reference.steady_state.report()
+
+
+def test_metrics_reset_keeps_truck_state(setup):
+    """Test that resetting truck metrics gives the metrics of the logs after the reset tick"""
+    sim = MiningSimulator(**setup)
+    sim.run(verbose=False)
+    columns = sim.truck_log.columns
+    lengths = sim.truck_log.lengths
+    ids = np.repeat(np.arange(sim.num_trucks), lengths)
+    ticks = np.concatenate([np.arange(x) for x in lengths])
+    states = np.concatenate([columns["state"][i, :x] for i, x in enumerate(lengths)])
+
+    metrics = TruckMetrics(sim.num_trucks)
+    before = ticks < 120
+    metrics.record_log(ids[before], ticks[before], states[before])
+    metrics.reset()
+    metrics.record_log(ids[~before], ticks[~before], states[~before])
+
+    # Each truck continues the state it had at the reset: a trip in progress is counted when it ends
+    unloading = states == TruckState.Unloading.value
+    unload_ends = np.r_[False, ~unloading[1:] & unloading[:-1] & (ids[1:] == ids[:-1])]
+    assert (metrics.ticks == np.asarray(lengths) - 120).all()
+    assert metrics.time_unloading.sum() + metrics.time_queued.sum() == unloading[~before].sum()
+    assert metrics.unloads.sum() == unload_ends[~before].sum()
+
+
+def test_stop_when_stable(setup):
+    """Test that the run ends once the estimates are stable, and that the KPIs match the estimates"""
+    detector = SteadyStateDetector(stop_when_stable=True, min_steady_hr=24)
+    sim = MiningSimulator(**setup, engine="vector", metrics="online", steady_state=detector)
+    sim.run(verbose=False)
+
+    report = detector.report()
+    assert detector.stable_tick == sim.current_tick < sim.stop_time
+    assert report["batches"] >= 24
+    for name in ("utilization", "throughput"):
+        assert report[f"{name}_half_width"] <= 0.05 * report[f"{name}_mean"]
+    # The run stopped at a batch boundary, so the station KPIs are the means of the batches
+    assert sim.summarize()["average_wait_time"] == pytest.approx(np.mean(detector.series["queue_length"]))
+
+
+def test_invalid_steady_state(setup):
+    """Test that invalid steady-state arguments are rejected"""
+    with pytest.raises(ValueError):
+        MiningSimulator(**setup, metrics="log", steady_state=SteadyStateDetector())
+    with pytest.raises(ValueError):
+        SteadyStateDetector(batch_hr=0)
+    with pytest.raises(ValueError):
+        SteadyStateDetector(min_batches=2)
+    with pytest.raises(ValueError):
+        SteadyStateDetector(abs_precision={"throughput_pct": 1})
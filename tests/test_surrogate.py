@@ -0,0 +1,87 @@
+import logging
+import math
+
+import numpy as np
+import pytest
+
+from mining_sim.optimize import find_min_stations
+from mining_sim.surrogate import calibrate, finite_source_queue, predict, screen, screen_configs
+from mining_sim.sweep import make_sweep_configs
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def setup():
+    """Setup function for surrogate test cases: an SLA"""
+    return {"sla": {"Queued_pct": 2.0, "average_wait_time": 0.5}}
+
+
+def _full_finite_source_queue(n_trucks, m_stations, think_ticks=48, service_ticks=1):
+    """M/M/m//N mean queue computed over all states"""
+    k = np.arange(n_trucks + 1)
+    log_ratio = np.log((n_trucks - k[:-1]) * service_ticks) - np.log(np.minimum(k[1:], m_stations) * think_ticks)
+    log_p = np.r_[0.0, np.cumsum(log_ratio)]
+    p = np.exp(log_p - log_p.max())
+    return float(np.dot(np.maximum(k - m_stations, 0), p) / p.sum())
+
+
+@pytest.mark.parametrize("n_trucks, m_stations", [(1, 1), (10, 1), (100, 2), (500, 10), (5000, 90), (5000, 120)])
+def test_finite_source_queue(n_trucks, m_stations):
+    """Test that the queue computed around the mode matches the full birth-death solution"""
+    assert finite_source_queue(n_trucks, m_stations) == pytest.approx(
+        _full_finite_source_queue(n_trucks, m_stations), rel=1e-9, abs=1e-12
+    )
+
+
+def test_predict():
+    """Test that predictions are consistent and monotone in the load"""
+    predicted = predict(500, 10)
+    assert predicted["Queued_pct"] == pytest.approx(100 * predicted["average_wait_time"] * 10 / 500)
+    assert 0 < predicted["utilization"] <= 1
+
+    queued = [predict(500, m)["Queued_pct"] for m in range(5, 20)]
+    assert all(a > b for a, b in zip(queued, queued[1:]))
+    # Saturated stations: the excess trucks queue
+    assert predict(1000, 5)["average_wait_time"] == pytest.approx((1000 - 5 * 49) / 5, rel=0.01)
+    with pytest.raises(ValueError):
+        predict(0, 1)
+
+
+def test_screen(setup):
+    """Test that configurations far from the SLA are decided and the others must be simulated"""
+    assert screen(500, 5, setup["sla"]) is False
+    assert screen(500, 20, setup["sla"]) is True
+    decided = [screen(n, 1, setup["sla"], margin=0.5) for n in range(10, 60)]
+    assert decided[0] is True and decided[-1] is False and None in decided
+    # A smaller margin decides more configurations
+    assert decided.count(None) > [screen(n, 1, setup["sla"], margin=0.1) for n in range(10, 60)].count(None)
+    with pytest.raises(ValueError):
+        screen(500, 10, {"max_wait_time": 5})
+
+
+def test_screen_configs(setup):
+    """Test that only undecided sweep tasks are kept, with all their replicates"""
+    configs = make_sweep_configs(list(range(10, 60, 5)), [1], n_replicates=2)
+    kept = screen_configs(configs, setup["sla"])
+    assert 0 < len(kept) < len(configs)
+    assert all(screen(x["n_trucks"], x["m_stations"], setup["sla"]) is None for x in kept)
+    assert len(kept) % 2 == 0
+
+
+def test_calibrate():
+    """Test that the correction fitted on short steady-state runs is close to the default and predictive"""
+    results = calibrate([(100, 2), (200, 4), (300, 6)], stop_time_hr=72)
+    assert 0.3 < results["correction"] < 0.8
+    for result in results["results"]:
+        assert math.isclose(result["predicted_Queued_pct"], result["Queued_pct"], rel_tol=0.35)
+
+
+def test_screened_search_matches(setup):
+    """Test that screening candidates with the surrogate gives the same answer with fewer runs"""
+    simulated = find_min_stations(500, **setup, stop_time_hr=72)
+    screened = find_min_stations(500, **setup, stop_time_hr=72, screen_margin=0.5)
+
+    assert screened["answer"] == simulated["answer"]
+    assert screened["runs"] < simulated["runs"]
+    assert screened["runs"] + screened["screened"] == len(screened["evaluations"])
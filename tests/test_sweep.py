@@ -0,0 +1,49 @@
+import logging
+
+import pytest
+
+from mining_sim.sweep import aggregate_sweep_results, make_sweep_configs, parse_int_values, run_config, run_sweep
+
+logger = logging.getLogger(__name__)
+
+
+def test_make_sweep_configs():
+    """Test that the sweep grid uses the same replicate seeds for every configuration"""
+    configs = make_sweep_configs([10, 20], [1, 2, 3], n_replicates=2, base_seed=5, stop_time_hr=4)
+
+    assert len(configs) == 2 * 3 * 2
+    assert len({x["seed"] for x in configs}) == 2
+    assert {x["seed"] for x in configs if x["replicate"] == 0} == {configs[0]["seed"]}
+    assert make_sweep_configs([10], [1], n_replicates=2, base_seed=5)[1]["seed"] == configs[1]["seed"]
+
+
+@pytest.mark.parametrize("engine", ["tick", "event", "vector"])
+def test_run_config_is_reproducible(engine):
+    """Test that a sweep task gives the same results when run twice"""
+    config = make_sweep_configs([30], [2], base_seed=1, stop_time_hr=6, engine=engine)[0]
+    first, second = run_config(config), run_config(config)
+    first.pop("runtime_s")
+    second.pop("runtime_s")
+
+    assert first == second
+
+
+def test_run_sweep_matches_sequential_runs():
+    """Test that results from the process pool match running each task in this process"""
+    configs = make_sweep_configs([20, 40], [1, 3], n_replicates=2, stop_time_hr=6)
+    results_df = run_sweep(configs, max_workers=2)
+
+    assert len(results_df) == len(configs)
+    for config, (_, row) in zip(configs, results_df.iterrows()):
+        expected = run_config(config)
+        for key in ["n_trucks", "m_stations", "seed", "Efficiency_pct", "average_wait_time"]:
+            assert row[key] == expected[key]
+
+    aggregated = aggregate_sweep_results(results_df)
+    assert len(aggregated) == 4
+    assert (aggregated["replicates"] == 2).all()
+
+
+def test_parse_int_values():
+    """Test parsing of values and inclusive ranges from the command line"""
+    assert parse_int_values(["5", "10:20:5", "1:3"]) == [5, 10, 15, 20, 1, 2, 3]
@@ -0,0 +1,110 @@
+import logging
+import sys
+
+import numpy as np
+import pytest
+
+from mining_sim.simulator import MiningSimulator
+from mining_sim.utility.tracing import TraceEvent, Tracer, main, read_trace, render_event, trace_to_df
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture
+def setup():
+    """Setup function for tracing test cases"""
+    sim = MiningSimulator(n_trucks=30, m_stations=2, stop_time_hr=6, seed=8)
+
+    return sim
+
+
+def run_traced(sim: MiningSimulator, **kwargs) -> np.ndarray:
+    tracer = sim.enable_tracing(**kwargs)
+    sim.run(verbose=False)
+    return tracer.events()
+
+
+def test_transitions_match_logs(setup: MiningSimulator):
+    """Test that state transition events match the state changes in the truck logs"""
+    sim = setup
+    events = run_traced(sim)
+    transitions = events[events["event"] == TraceEvent.StateTransition]
+
+    for truck in sim.mining_trucks:
+        states = np.array([x["state"] for x in truck._data_log_list])
+        ticks = np.array([x["tick"] for x in truck._data_log_list])
+        changed = np.flatnonzero(states[1:] != states[:-1]) + 1
+        truck_transitions = transitions[(transitions["truck"] == truck.idx) & (transitions["tick"] <= ticks[-1])]
+        # A state logged at tick t was entered at the end of tick t
+        assert truck_transitions["tick"].tolist() == ticks[changed].tolist()
+
+
+def test_queue_events(setup: MiningSimulator):
+    """Test that every assigned truck is enqueued and dequeued at its station"""
+    events = trace_to_df(run_traced(setup))
+    assigned = events[events["event"] == "Assignment"]
+    enqueued = events[events["event"] == "Enqueue"]
+    dequeued = events[events["event"] == "Dequeue"]
+
+    assert len(assigned) > 0
+    assert (
+        assigned[["tick", "truck", "station"]].values.tolist() == enqueued[["tick", "truck", "station"]].values.tolist()
+    )
+    assert (dequeued["arg0"] >= 0).all()
+    assert len(dequeued) <= len(enqueued)
+
+
+@pytest.mark.parametrize("engine", ["event", "vector"])
+def test_engine_traces_match(engine):
+    """Test that all engines emit the same events for the same seed"""
+    traces = []
+    for sim_engine in ["tick", engine]:
+        events = run_traced(MiningSimulator(n_trucks=60, m_stations=3, stop_time_hr=8, engine=sim_engine, seed=2))
+        traces.append(sorted(events.tolist()))
+
+    assert traces[0] == traces[1]
+
+
+def test_ring_buffer():
+    """Test that the ring buffer keeps the most recent events"""
+    tracer = Tracer(capacity=4)
+    for tick in range(10):
+        tracer.emit(tick, TraceEvent.Assignment, truck=tick, station=0)
+
+    assert tracer.n_events == 10
+    assert tracer.dropped == 6
+    assert tracer.events()["tick"].tolist() == [6, 7, 8, 9]
+
+    assert tracer.drain()["tick"].tolist() == [6, 7, 8, 9]
+    tracer.emit(10, TraceEvent.Assignment, truck=10, station=0)
+    assert tracer.events()["tick"].tolist() == [10]
+
+
+def test_trace_file(setup: MiningSimulator, tmp_path, capsys, monkeypatch):
+    """Test that a filtered trace streamed to a file can be read back and rendered"""
+    path = str(tmp_path / "trace.bin")
+    run_traced(setup, capacity=2, path=path, trucks={3})
+    setup.disable_tracing()
+
+    events = read_trace(path)
+    assert len(events) > 2
+    assert set(events["truck"].tolist()) == {3}
+    assert render_event(events[0]).endswith("Truck-ID-3: AtMine -> OnRoad_ToUnload")
+
+    monkeypatch.setattr(sys, "argv", ["tracing", path, "--event", "StateTransition", "--limit", "2"])
+    main()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("T=") and "Truck-ID-3: AtMine -> OnRoad_ToUnload" in lines[0]
+    assert lines[-1] == f"{np.count_nonzero(events['event'] == TraceEvent.StateTransition)} events"
+
+
+def test_run_flushes_trace_file(tmp_path):
+    """Test that run() writes the buffered events to the trace file without disabling tracing"""
+    path = str(tmp_path / "trace.bin")
+    sim = MiningSimulator(n_trucks=30, m_stations=2, stop_time_hr=6, seed=8)
+    tracer = sim.enable_tracing(capacity=1 << 20, path=path)
+    sim.run(verbose=False)
+    expected = run_traced(MiningSimulator(n_trucks=30, m_stations=2, stop_time_hr=6, seed=8))
+
+    assert sim.tracer is tracer
+    np.testing.assert_array_equal(read_trace(path), expected)
@@ -1,8 +1,11 @@
 import pytest
 import logging
+import tracemalloc
 
-from mining_sim.nodes.truck import MiningTruck
+from mining_sim.nodes.truck import MiningTruck, TRUCK_MEMORY_BUDGET
 from mining_sim.enums.sim_enums import TruckState
+from mining_sim.utility.log_store import LogStore
+from mining_sim.utility.rng import MiningDurationSampler
 
 logger = logging.getLogger(__name__)
 
@@ -77,3 +80,21 @@ def test_truck_tick(setup):
 
 
 # NOTE: Add remaining test cases for truck class below:
+
+
+def test_truck_memory_budget():
+    """Test that trucks are slotted and stay within the per truck memory budget"""
+    n_trucks = 5000
+    store = LogStore(n_trucks, MiningTruck.log_columns, capacity=1)
+    sampler = MiningDurationSampler(0)
+    sampler.next()
+
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    trucks = [MiningTruck(idx, log_store=store, sampler=sampler) for idx in range(n_trucks)]
+    bytes_per_truck = (tracemalloc.get_traced_memory()[0] - start) / n_trucks
+    tracemalloc.stop()
+
+    logger.info(f"{bytes_per_truck:.1f} bytes per truck")
+    assert not hasattr(trucks[0], "__dict__")
+    assert bytes_per_truck <= TRUCK_MEMORY_BUDGET
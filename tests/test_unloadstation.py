@@ -1,7 +1,11 @@
 import logging
+import threading
+import tracemalloc
+
 import pytest
 
-from mining_sim.nodes.unloadstation import UnloadingStation
+from mining_sim.nodes.unloadstation import UnloadingStation, UnloadQueue, LockedUnloadQueue, STATION_MEMORY_BUDGET
+from mining_sim.utility.log_store import LogStore
 
 logger = logging.getLogger(__name__)
 
@@ -47,4 +51,82 @@ def test_station_tick(setup: UnloadingStation):
     assert station
 
 
+@pytest.mark.parametrize("queue_cls", [UnloadQueue, LockedUnloadQueue])
+def test_unload_queue(queue_cls):
+    """Test function for FIFO order, peek and iteration of the unload queue backends"""
+    unload_queue = queue_cls(station_id=3)
+    assert unload_queue.empty()
+    assert unload_queue.peek() is None
+    assert unload_queue.get_truck() is None
+
+    unload_queue.put_truck(7)
+    unload_queue.put_trucks([0, 4])
+    assert unload_queue.queue_size() == len(unload_queue) == 3
+    assert list(unload_queue) == [7, 0, 4]
+
+    # Peeking does not remove the truck from the queue
+    assert unload_queue.peek() == 7
+    assert unload_queue.queue_size() == 3
+
+    assert [unload_queue.get_truck() for _ in range(4)] == [7, 0, 4, None]
+    assert unload_queue.empty()
+
+
+def test_locked_unload_queue_threads():
+    """Test function to verify no trucks are lost when several threads use a locked queue"""
+    station = UnloadingStation(station_id=0, queue_backend="locked")
+    n_threads, n_trucks = 4, 1000
+
+    def producer(offset):
+        for truck in range(offset, offset + n_trucks):
+            station.unload_queue.put_truck(truck)
+
+    threads = [threading.Thread(target=producer, args=(i * n_trucks,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert station.get_wait_time() == n_threads * n_trucks
+    dequeued = [station.tick() for _ in range(n_threads * n_trucks)]
+    assert sorted(dequeued) == list(range(n_threads * n_trucks))
+    assert station.get_wait_time() == 0
+
+
+def test_locked_unload_queue_reads_take_lock():
+    """Test function to verify that reads of a locked queue wait for a writer holding the lock"""
+    queue = LockedUnloadQueue(station_id=0)
+    for read in (len, LockedUnloadQueue.queue_size, LockedUnloadQueue.empty, LockedUnloadQueue.peek):
+        results = []
+        with queue._lock:
+            reader = threading.Thread(target=lambda: results.append(read(queue)))
+            reader.start()
+            reader.join(timeout=0.05)
+            assert reader.is_alive() and not results
+        reader.join()
+        assert len(results) == 1
+
+
+def test_unknown_queue_backend():
+    """Test function to verify unknown queue backends are rejected"""
+    with pytest.raises(ValueError):
+        UnloadingStation(station_id=0, queue_backend="unknown")
+
+
 # NOTE: Add remaining test cases for station class below:
+
+
+def test_station_memory_budget():
+    """Test that stations are slotted and idle stations stay within the per station memory budget"""
+    m_stations = 5000
+    store = LogStore(m_stations, UnloadingStation.log_columns, capacity=1)
+
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    stations = [UnloadingStation(idx, log_store=store) for idx in range(m_stations)]
+    bytes_per_station = (tracemalloc.get_traced_memory()[0] - start) / m_stations
+    tracemalloc.stop()
+
+    logger.info(f"{bytes_per_station:.1f} bytes per station")
+    assert not hasattr(stations[0], "__dict__")
+    assert bytes_per_station <= STATION_MEMORY_BUDGET
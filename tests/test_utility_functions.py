@@ -1 +1,120 @@
-# NOTE: Add unit tests for utility functions here
+import json
+import logging
+
+import pandas as pd
+import pytest
+
+from mining_sim.simulator import MiningSimulator
+from mining_sim.utility.analysis import (
+    compute_cumulative_truck_stats,
+    compute_fleet_truck_metrics,
+    compute_truck_metrics,
+    convert_fleet_log_to_df,
+    convert_log_to_df,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def reference_process_truck(truck_df: pd.DataFrame) -> pd.DataFrame:
+    """Original row by row implementation of process_truck, kept as the reference behaviour"""
+    time_mining, time_onroad, time_unloading, time_queued = 0, 0, 0, 0
+    mining_trips, unloads, roundtrips = 0, 0, 0
+    truck_df = truck_df.sort_values(["tick"]).copy()
+    for column in [
+        "Time_Mining",
+        "Time_OnRoad",
+        "Time_Unloading",
+        "Time_Queued",
+        "Mining_Trips_Completed",
+        "Unloads_Completed",
+        "Roundtrips_Completed",
+    ]:
+        truck_df[column] = 0
+    prev_state = "None"
+    for i, row in truck_df.iterrows():
+        if row["state"] == "AtMine":
+            time_mining += 1
+        elif "OnRoad" in row["state"]:
+            time_onroad += 1
+        elif row["state"] == "Unloading":
+            if prev_state == "Unloading":
+                time_queued += 1
+            else:
+                time_unloading += 1
+
+        if prev_state == "AtMine" and "OnRoad" in row["state"]:
+            mining_trips += 1
+        elif prev_state == "Unloading" and "OnRoad" in row["state"]:
+            unloads += 1
+        elif "OnRoad" in prev_state and row["state"] == "AtMine":
+            roundtrips += 1
+
+        prev_state = row["state"]
+        truck_df.at[i, "Time_Mining"] = time_mining
+        truck_df.at[i, "Time_OnRoad"] = time_onroad
+        truck_df.at[i, "Time_Unloading"] = time_unloading
+        truck_df.at[i, "Time_Queued"] = time_queued
+        truck_df.at[i, "Mining_Trips_Completed"] = mining_trips
+        truck_df.at[i, "Unloads_Completed"] = unloads
+        truck_df.at[i, "Roundtrips_Completed"] = roundtrips
+
+    return truck_df
+
+
+def reference_truck_stats(df_list: list[pd.DataFrame]) -> dict:
+    """Original per truck computation of the truck_stats.json contents"""
+    last_tick_df = pd.DataFrame([df.loc[df["tick"].idxmax()] for df in df_list])
+    total_time = (
+        last_tick_df["Time_Mining"]
+        + last_tick_df["Time_OnRoad"]
+        + last_tick_df["Time_Unloading"]
+        + last_tick_df["Time_Queued"]
+    )
+    last_tick_df["Total_Time"] = total_time
+    last_tick_df["Mining_pct"] = (last_tick_df["Time_Mining"] / total_time) * 100
+    last_tick_df["OnRoad_pct"] = (last_tick_df["Time_OnRoad"] / total_time) * 100
+    last_tick_df["Unloading_pct"] = (last_tick_df["Time_Unloading"] / total_time) * 100
+    last_tick_df["Queued_pct"] = (last_tick_df["Time_Queued"] / total_time) * 100
+    last_tick_df["Efficiency_pct"] = ((total_time - last_tick_df["Time_Queued"]) / total_time) * 100
+    columns = ["id", "Mining_pct", "OnRoad_pct", "Unloading_pct", "Queued_pct", "Efficiency_pct"]
+    stats_df = last_tick_df[columns + ["Time_Unloading", "Total_Time"]]
+    return json.loads(json.dumps(stats_df.set_index("id").to_dict(orient="index")))
+
+
+@pytest.fixture(scope="module")
+def truck_logs():
+    """Truck logs from a short, congested simulation run"""
+    sim = MiningSimulator(n_trucks=40, m_stations=2, stop_time_hr=12, seed=11)
+    for _ in range(sim.stop_time):
+        sim.tick()
+
+    return sim.mining_trucks
+
+
+def test_compute_truck_metrics_matches_reference(truck_logs):
+    """Test that the vectorized truck metrics are identical to the row by row implementation"""
+    df_list = convert_log_to_df(truck_logs)
+    expected = [reference_process_truck(df) for df in df_list]
+    actual = compute_truck_metrics(df_list)
+
+    assert len(actual) == len(expected)
+    for actual_df, expected_df in zip(actual, expected):
+        expected_df["state"] = expected_df["state"].astype(actual_df["state"].dtype)
+        pd.testing.assert_frame_equal(actual_df, expected_df)
+
+
+def test_truck_stats_match_reference(truck_logs, tmp_path, monkeypatch):
+    """Test that truck_stats.json is identical for the list and fleet analysis paths"""
+    monkeypatch.chdir(tmp_path)
+    expected = reference_truck_stats([reference_process_truck(df) for df in convert_log_to_df(truck_logs)])
+
+    compute_cumulative_truck_stats(compute_truck_metrics(convert_log_to_df(truck_logs)), output_file="list.json")
+    compute_cumulative_truck_stats(
+        compute_fleet_truck_metrics(convert_fleet_log_to_df(truck_logs)), output_file="fleet.json"
+    )
+
+    with open("list.json") as f:
+        assert json.load(f) == expected
+    with open("fleet.json") as f:
+        assert json.load(f) == expected